@@ -1,23 +1,35 @@
 import streamlit as st
-import yfinance as yf
 import datetime
+import os
+import time
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 
 from black_scholes import BlackScholes
-from binomial_tree import BinomialTree
+from binomial_tree import BinomialTree, BinomialLattice
+from finite_difference import FiniteDifference
 from monte_carlo import MonteCarlo
+from pricing_cache import pricing_cache, market_data_cache, model_key
+from market_data import MarketDataLoader, default_provider
+from heston import calibrate
+import instrumentation
 
-def get_last_price(ticker):
+# Niveau disque optionnel : les résultats survivent au redémarrage du processus
+if os.environ.get("OPTION_PRICER_CACHE"):
+    pricing_cache.disk_path = os.environ["OPTION_PRICER_CACHE"]
+
+def fetch_last_price(ticker):
     try:
-        data = yf.Ticker(ticker)
-        last_price = data.history(period="1d")['Close'].iloc[-1]
-        return round(last_price, 2)
-    except:
+        return round(default_provider().last_price(ticker), 2)
+    except Exception as e:
+        st.sidebar.caption(f"Erreur de récupération du prix : {e}")
         return -1
 
+def get_last_price(ticker):
+    return market_data_cache.get_or_compute(("last_price", ticker), lambda: fetch_last_price(ticker), cache_if=lambda price: price != -1)
+
 def calculate_T(maturity_date):
     today = datetime.datetime.today()
     maturity = datetime.datetime.strptime(maturity_date, "%Y-%m-%d")
@@ -29,141 +41,276 @@ st.title("📈 Outil de Pricing d'Options")
 
 st.sidebar.header("Paramètres")
 
-method = st.sidebar.selectbox("Méthode de Pricing", ("Black-Scholes", "Binomial Tree", "Monte Carlo"))
-type_option = st.sidebar.selectbox("Type d'Option", ("Européenne", "Américaine"))
-ticker = st.sidebar.text_input("Ticker (ex: AAPL)", value="AAPL").upper()
-spot_price = get_last_price(ticker)
-if spot_price and spot_price != -1:
-    st.sidebar.success(f"Prix spot actuel : {spot_price} USD")
-elif spot_price == -1:
-    st.sidebar.error("Impossible de récupérer le prix spot.")
-    spot_price = st.sidebar.number_input("Entrez le prix spot manuellement", value=100.0)
+# Instrumentation opt-in : tant que la case n'est pas cochée, chaque point de mesure ne coûte qu'un test.
+# Collecteur propre à la session : les reruns des autres utilisateurs ne touchent pas à ses mesures.
+if "instrumentation" not in st.session_state:
+    st.session_state["instrumentation"] = instrumentation.Collector(enabled=instrumentation.is_enabled())
+instrumentation.use(st.session_state["instrumentation"])
+with st.sidebar.expander("⏱️ Instrumentation"):
+    instrument = st.checkbox("Mesurer les performances", value=instrumentation.is_enabled())
+    profile_cpu = st.checkbox("Profil cProfile", value=False, disabled=not instrument)
+    profile_memory = st.checkbox("Allocations (tracemalloc)", value=False, disabled=not instrument)
+profiler = None
+if instrument:
+    instrumentation.enable()
+    instrumentation.reset()
+    rerun_start = time.perf_counter()
+    if profile_cpu or profile_memory:
+        profiler = instrumentation.capture(profile=profile_cpu, memory=profile_memory).start()
 else:
-    st.sidebar.error("Impossible de récupérer le prix spot.")
-
-K = st.sidebar.number_input("Strike (prix d'exercice)", value=spot_price if spot_price else 100.0)
-maturity_date = st.sidebar.date_input("Échéance", value=datetime.date.today() + datetime.timedelta(days=90))
-T = calculate_T(maturity_date.strftime("%Y-%m-%d"))
-sigma = st.sidebar.number_input("Volatilite (ex: 0.2 pour 20%)", value=0.2, step=0.01)
-r = st.sidebar.number_input("Taux sans risque (ex: 0.05 pour 5%)", value=0.05, step=0.01)
-
-if method == "Black-Scholes":
-    if type_option == "Américaine":
-        st.warning("Black-Scholes ne supporte que les options européennes. Pricing en européen forcé.")
-    model_call = BlackScholes(S=spot_price, K=K, T=T, r=r, sigma=sigma, option_type="call")
-    model_put = BlackScholes(S=spot_price, K=K, T=T, r=r, sigma=sigma, option_type="put")
-elif method == "Binomial Tree":
-    model_call = BinomialTree(S=spot_price, K=K, T=T, r=r, sigma=sigma, N=100, option_type="call", american=(type_option=="Américaine"))
-    model_put = BinomialTree(S=spot_price, K=K, T=T, r=r, sigma=sigma, N=100, option_type="put", american=(type_option=="Américaine"))
-elif method == "Monte Carlo":
-    if type_option == "Américaine":
-        st.warning("Monte Carlo standard ne supporte que les options européennes. Pricing en européen forcé.")
-    model_call = MonteCarlo(S=spot_price, K=K, T=T, r=r, sigma=sigma, simulations=100000, option_type="call")
-    model_put = MonteCarlo(S=spot_price, K=K, T=T, r=r, sigma=sigma, simulations=100000, option_type="put")
-
-# --- Cartes Stylées pour Prix ---
-st.markdown("""
-<style>
-.card {
-    padding: 1rem;
-    border-radius: 10px;
-    color: white;
-    font-weight: bold;
-    font-size: 1.5rem;
-    margin-bottom: 1rem;
-    text-align: center;
-}
-.card-blue {
-    background-color: #007BFF;
-}
-.card-green {
-    background-color: #28A745;
-}
-</style>
-""", unsafe_allow_html=True)
-
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown(f"""
-    <div class='card card-blue'>
-        Prix Call : {model_call.price():.4f} USD
-    </div>
-    """, unsafe_allow_html=True)
+    instrumentation.disable()
 
-with col2:
-    st.markdown(f"""
-    <div class='card card-green'>
-        Prix Put : {model_put.price():.4f} USD
-    </div>
-    """, unsafe_allow_html=True)
+# Le profil est arrêté même si le rerun est interrompu (widget modifié, st.stop, exception) :
+# sinon le verrou de capture resterait pris et cProfile/tracemalloc actifs pour toutes les sessions
+try:
+    method = st.sidebar.selectbox("Méthode de Pricing", ("Black-Scholes", "Binomial Tree", "Différences finies", "Monte Carlo"))
+    type_option = st.sidebar.selectbox("Type d'Option", ("Européenne", "Américaine"))
+    ticker = st.sidebar.text_input("Ticker (ex: AAPL)", value="AAPL").upper()
+    with instrumentation.timer("app.spot"):
+        spot_price = get_last_price(ticker)
+    if spot_price and spot_price != -1:
+        st.sidebar.success(f"Prix spot actuel : {spot_price} USD")
+    elif spot_price == -1:
+        st.sidebar.error("Impossible de récupérer le prix spot.")
+        spot_price = st.sidebar.number_input("Entrez le prix spot manuellement", value=100.0)
+    else:
+        st.sidebar.error("Impossible de récupérer le prix spot.")
+
+    K = st.sidebar.number_input("Strike (prix d'exercice)", value=spot_price if spot_price else 100.0)
+    maturity_date = st.sidebar.date_input("Échéance", value=datetime.date.today() + datetime.timedelta(days=90))
+    T = calculate_T(maturity_date.strftime("%Y-%m-%d"))
+    sigma = st.sidebar.number_input("Volatilite (ex: 0.2 pour 20%)", value=0.2, step=0.01)
+    r = st.sidebar.number_input("Taux sans risque (ex: 0.05 pour 5%)", value=0.05, step=0.01)
 
-# --- Tableau des Greeks ---
-
-greeks_data = {
-    "Greek": ["Delta", "Gamma", "Vega", "Theta", "Rho"],
-    "Call": [
-        round(model_call.delta(), 4),
-        round(model_call.gamma(), 6),
-        round(model_call.vega(), 4),
-        round(model_call.theta(), 4),
-        round(model_call.rho(), 4),
-    ],
-    "Put": [
-        round(model_put.delta(), 4),
-        round(model_put.gamma(), 6),
-        round(model_put.vega(), 4),
-        round(model_put.theta(), 4),
-        round(model_put.rho(), 4),
-    ]
-}
-
-df_greeks = pd.DataFrame(greeks_data)
-st.subheader("Greeks")
-st.table(df_greeks.set_index("Greek"))
-
-# --- Graphiques interactifs avec Plotly ---
-
-st.subheader("📊 Evolution Prix et Greeks selon le Spot")
-
-S_range = np.linspace(0.5 * spot_price, 1.5 * spot_price, 50)
-prices_call, prices_put, deltas, gammas, vegas, thetas, rhos = [], [], [], [], [], [], []
-
-for S in S_range:
     if method == "Black-Scholes":
-        temp_call = BlackScholes(S=S, K=K, T=T, r=r, sigma=sigma, option_type="call")
-        temp_put = BlackScholes(S=S, K=K, T=T, r=r, sigma=sigma, option_type="put")
+        if type_option == "Américaine":
+            st.warning("Black-Scholes ne supporte que les options européennes. Pricing en européen forcé.")
+        model_call = BlackScholes(S=spot_price, K=K, T=T, r=r, sigma=sigma, option_type="call")
+        model_put = BlackScholes(S=spot_price, K=K, T=T, r=r, sigma=sigma, option_type="put")
     elif method == "Binomial Tree":
-        temp_call = BinomialTree(S=S, K=K, T=T, r=r, sigma=sigma, N=100, option_type="call", american=(type_option=="Américaine"))
-        temp_put = BinomialTree(S=S, K=K, T=T, r=r, sigma=sigma, N=100, option_type="put", american=(type_option=="Américaine"))
+        N_steps = st.sidebar.number_input("Nombre de pas de l'arbre", min_value=10, max_value=10000, value=1000, step=100)
+        model_call = BinomialTree(S=spot_price, K=K, T=T, r=r, sigma=sigma, N=N_steps, option_type="call", american=(type_option=="Américaine"))
+        model_put = BinomialTree(S=spot_price, K=K, T=T, r=r, sigma=sigma, N=N_steps, option_type="put", american=(type_option=="Américaine"))
+    elif method == "Différences finies":
+        space_steps = st.sidebar.number_input("Pas d'espace (log-spot)", min_value=50, max_value=4000, value=400, step=50)
+        time_steps = st.sidebar.number_input("Pas de temps", min_value=10, max_value=4000, value=200, step=50)
+        model_call = FiniteDifference(S=spot_price, K=K, T=T, r=r, sigma=sigma, option_type="call", american=(type_option=="Américaine"), space_steps=space_steps, time_steps=time_steps)
+        model_put = FiniteDifference(S=spot_price, K=K, T=T, r=r, sigma=sigma, option_type="put", american=(type_option=="Américaine"), space_steps=space_steps, time_steps=time_steps)
+    elif method == "Monte Carlo":
+        american = type_option == "Américaine"
+        if american:
+            st.info("Options américaines évaluées par Longstaff-Schwartz (moindres carrés).")
+        # Longstaff-Schwartz : Greeks par bumps sur les mêmes tirages, d'où moins de trajectoires
+        mc_paths = 20000 if american else 100000
+        variance_labels = {"Aucune": None, "Antithétique": "antithetic", "Variable de contrôle": "control_variate", "Sobol": "sobol", "Halton": "halton"}
+        variance_reduction = variance_labels[st.sidebar.selectbox("Réduction de variance", tuple(variance_labels), index=3)]
+        model_call = MonteCarlo(S=spot_price, K=K, T=T, r=r, sigma=sigma, simulations=mc_paths, option_type="call", variance_reduction=variance_reduction, american=american)
+        model_put = MonteCarlo(S=spot_price, K=K, T=T, r=r, sigma=sigma, simulations=mc_paths, option_type="put", variance_reduction=variance_reduction, american=american)
+
+    # --- Cartes Stylées pour Prix ---
+    st.markdown("""
+    <style>
+    .card {
+        padding: 1rem;
+        border-radius: 10px;
+        color: white;
+        font-weight: bold;
+        font-size: 1.5rem;
+        margin-bottom: 1rem;
+        text-align: center;
+    }
+    .card-blue {
+        background-color: #007BFF;
+    }
+    .card-green {
+        background-color: #28A745;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    with instrumentation.timer("app.headline"):
+        if method == "Binomial Tree":
+            # Call et put partagent le même arbre : un seul passage pour les deux payoffs
+            american_tree = type_option == "Américaine"
+            lattice_key = ("BinomialLattice", float(spot_price), float(K), float(T), float(r), float(sigma), int(N_steps), american_tree)
+            lattice_results = pricing_cache.get_or_compute(lattice_key, lambda: BinomialLattice(S=spot_price, T=T, r=r, sigma=sigma, N=N_steps).greeks(K, ("call", "put"), american=american_tree))
+            results_call = {g: float(v[0]) for g, v in lattice_results["call"].items()}
+            results_put = {g: float(v[0]) for g, v in lattice_results["put"].items()}
+        else:
+            results_call = pricing_cache.price_and_greeks(model_call)
+            results_put = pricing_cache.price_and_greeks(model_put)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown(f"""
+        <div class='card card-blue'>
+            Prix Call : {results_call['price']:.4f} USD
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(f"""
+        <div class='card card-green'>
+            Prix Put : {results_put['price']:.4f} USD
+        </div>
+        """, unsafe_allow_html=True)
+
+    if method == "Monte Carlo":
+        with instrumentation.timer("app.standard_error"):
+            error_call = pricing_cache.get_or_compute(model_key(model_call, "standard_error"), model_call.standard_error)
+            error_put = pricing_cache.get_or_compute(model_key(model_put, "standard_error"), model_put.standard_error)
+        st.caption(f"Erreur standard Monte Carlo : Call ± {error_call:.4f} | Put ± {error_put:.4f}")
+
+    # --- Tableau des Greeks ---
+
+    greeks_data = {
+        "Greek": ["Delta", "Gamma", "Vega", "Theta", "Rho"],
+        "Call": [
+            round(results_call['delta'], 4),
+            round(results_call['gamma'], 6),
+            round(results_call['vega'], 4),
+            round(results_call['theta'], 4),
+            round(results_call['rho'], 4),
+        ],
+        "Put": [
+            round(results_put['delta'], 4),
+            round(results_put['gamma'], 6),
+            round(results_put['vega'], 4),
+            round(results_put['theta'], 4),
+            round(results_put['rho'], 4),
+        ]
+    }
+
+    df_greeks = pd.DataFrame(greeks_data)
+    st.subheader("Greeks")
+    st.table(df_greeks.set_index("Greek"))
+
+    # --- Graphiques interactifs avec Plotly ---
+
+    st.subheader("📊 Evolution Prix et Greeks selon le Spot")
+
+    S_range = np.linspace(0.5 * spot_price, 1.5 * spot_price, 50)
+
+    # Chaque moteur évalue toute la grille en un appel : formule fermée broadcastée, un seul arbre
+    # étendu pour tous les spots, une seule grille EDP, ou les mêmes trajectoires Monte Carlo pour chaque point
+    if method == "Monte Carlo" and american:
+        grid_call = MonteCarlo(S=spot_price, K=K, T=T, r=r, sigma=sigma, simulations=3000, option_type="call", american=True, exercise_dates=20)
+        grid_put = MonteCarlo(S=spot_price, K=K, T=T, r=r, sigma=sigma, simulations=3000, option_type="put", american=True, exercise_dates=20)
     else:
-        temp_call = MonteCarlo(S=S, K=K, T=T, r=r, sigma=sigma, simulations=3000, option_type="call")
-        temp_put = MonteCarlo(S=S, K=K, T=T, r=r, sigma=sigma, simulations=3000, option_type="put")
-
-    prices_call.append(temp_call.price())
-    prices_put.append(temp_put.price())
-    deltas.append(temp_call.delta())
-    gammas.append(temp_call.gamma())
-    vegas.append(temp_call.vega())
-    thetas.append(temp_call.theta())
-    rhos.append(temp_call.rho())
-
-fig_price = go.Figure()
-fig_price.add_trace(go.Scatter(x=S_range, y=prices_call, mode='lines', name='Call Price'))
-fig_price.add_trace(go.Scatter(x=S_range, y=prices_put, mode='lines', name='Put Price'))
-fig_price.update_layout(title="Évolution des prix des options", xaxis_title="Prix Spot", yaxis_title="Prix de l'option")
-st.plotly_chart(fig_price, use_container_width=True)
-
-fig_greeks = go.Figure()
-fig_greeks.add_trace(go.Scatter(x=S_range, y=deltas, mode='lines', name='Delta'))
-fig_greeks.add_trace(go.Scatter(x=S_range, y=gammas, mode='lines', name='Gamma'))
-fig_greeks.add_trace(go.Scatter(x=S_range, y=vegas, mode='lines', name='Vega'))
-fig_greeks.add_trace(go.Scatter(x=S_range, y=thetas, mode='lines', name='Theta'))
-fig_greeks.add_trace(go.Scatter(x=S_range, y=rhos, mode='lines', name='Rho'))
-fig_greeks.update_layout(title="Greeks selon le prix spot", xaxis_title="Prix Spot", yaxis_title="Valeur")
-st.plotly_chart(fig_greeks, use_container_width=True)
+        grid_call, grid_put = model_call, model_put
+
+    with instrumentation.timer("app.sweep"):
+        sweep_call = pricing_cache.evaluate_grid(grid_call, S=S_range)
+        prices_call = sweep_call["price"]
+        prices_put = pricing_cache.evaluate_grid(grid_put, S=S_range)["price"]
+    deltas, gammas, vegas, thetas, rhos = (sweep_call[g] for g in ("delta", "gamma", "vega", "theta", "rho"))
+
+    fig_price = go.Figure()
+    fig_price.add_trace(go.Scatter(x=S_range, y=prices_call, mode='lines', name='Call Price'))
+    fig_price.add_trace(go.Scatter(x=S_range, y=prices_put, mode='lines', name='Put Price'))
+    fig_price.update_layout(title="Évolution des prix des options", xaxis_title="Prix Spot", yaxis_title="Prix de l'option")
+    st.plotly_chart(fig_price, use_container_width=True)
+
+    fig_greeks = go.Figure()
+    fig_greeks.add_trace(go.Scatter(x=S_range, y=deltas, mode='lines', name='Delta'))
+    fig_greeks.add_trace(go.Scatter(x=S_range, y=gammas, mode='lines', name='Gamma'))
+    fig_greeks.add_trace(go.Scatter(x=S_range, y=vegas, mode='lines', name='Vega'))
+    fig_greeks.add_trace(go.Scatter(x=S_range, y=thetas, mode='lines', name='Theta'))
+    fig_greeks.add_trace(go.Scatter(x=S_range, y=rhos, mode='lines', name='Rho'))
+    fig_greeks.update_layout(title="Greeks selon le prix spot", xaxis_title="Prix Spot", yaxis_title="Valeur")
+    st.plotly_chart(fig_greeks, use_container_width=True)
+
+    # --- Surfaces des Greeks ---
+
+    st.subheader("🗺️ Surfaces des Greeks (Call)")
+
+    if method == "Monte Carlo" and american:
+        st.info("Surfaces non disponibles pour Longstaff-Schwartz (Greeks par bumps, trop coûteux sur une grille).")
+    else:
+        if method == "Monte Carlo":
+            surface_model = MonteCarlo(S=spot_price, K=K, T=T, r=r, sigma=sigma, simulations=10000, option_type="call", variance_reduction=variance_reduction)
+        elif method == "Binomial Tree":
+            surface_model = BinomialTree(S=spot_price, K=K, T=T, r=r, sigma=sigma, N=min(N_steps, 200), option_type="call", american=(type_option=="Américaine"))
+        elif method == "Différences finies":
+            surface_model = FiniteDifference(S=spot_price, K=K, T=T, r=r, sigma=sigma, option_type="call", american=(type_option=="Américaine"), space_steps=min(space_steps, 200), time_steps=min(time_steps, 100))
+        else:
+            surface_model = model_call
+        surface_greek = st.selectbox("Greek affiché", ("price", "delta", "gamma", "vega", "theta", "rho"), index=1)
+        S_axis = np.linspace(0.5 * spot_price, 1.5 * spot_price, 40)
+        sigma_axis = np.linspace(0.05, 0.8, 25)
+        T_axis = np.linspace(1/365, 2, 25)
+        with instrumentation.timer("app.surfaces"):
+            surface_vol = pricing_cache.evaluate_grid(surface_model, S=S_axis[:, None], sigma=sigma_axis[None, :])[surface_greek]
+            surface_maturity = pricing_cache.evaluate_grid(surface_model, S=S_axis[:, None], T=T_axis[None, :])[surface_greek]
+
+        col_vol, col_maturity = st.columns(2)
+        with col_vol:
+            fig_vol = go.Figure(go.Surface(x=sigma_axis, y=S_axis, z=surface_vol))
+            fig_vol.update_layout(title=f"{surface_greek} : spot × volatilité", scene=dict(xaxis_title="Volatilité", yaxis_title="Prix Spot", zaxis_title=surface_greek))
+            st.plotly_chart(fig_vol, use_container_width=True)
+        with col_maturity:
+            fig_maturity = go.Figure(go.Surface(x=T_axis, y=S_axis, z=surface_maturity))
+            fig_maturity.update_layout(title=f"{surface_greek} : spot × maturité", scene=dict(xaxis_title="Maturité (années)", yaxis_title="Prix Spot", zaxis_title=surface_greek))
+            st.plotly_chart(fig_maturity, use_container_width=True)
+
+
+    # --- Smile de marché et calibration Heston ---
+
+    st.subheader("😊 Smile de volatilité (Heston)")
+
+    if st.checkbox("Calibrer le modèle de Heston sur la chaîne du ticker", value=False):
+        max_expiries = st.slider("Nombre d'échéances", 1, 8, 4)
+        chains, chain_errors = market_data_cache.get_or_compute(
+            ("chains", ticker, max_expiries), lambda: MarketDataLoader(default_provider()).fetch_chains([ticker], max_expiries=max_expiries),
+            cache_if=lambda result: not result[0].empty)
+        try:
+            with instrumentation.timer("app.heston"):
+                calibration = calibrate(chains, spot_price, r)
+        except (ValueError, KeyError) as e:
+            st.warning(f"Calibration impossible : {e}")
+        else:
+            params = calibration["params"]
+            st.caption(f"{len(calibration['quotes'])} cotations calibrées en {calibration['elapsed'] * 1000:.0f} ms "
+                       f"({calibration['evaluations']} évaluations) — RMSE vol implicite : {calibration['rmse_iv'] * 100:.2f} %"
+                       + ("" if calibration["feller"] else " — condition de Feller non respectée"))
+            st.dataframe(pd.DataFrame([params]).rename(columns={"kappa": "κ", "theta": "θ", "xi": "ξ", "rho": "ρ"}).round(4))
+            fig_smile = go.Figure()
+            for expiry, quotes in calibration["quotes"].sort_values("strike").groupby("expiry"):
+                fig_smile.add_trace(go.Scatter(x=quotes["strike"], y=quotes["market_iv"], mode="markers", name=f"{expiry} marché"))
+                fig_smile.add_trace(go.Scatter(x=quotes["strike"], y=quotes["model_iv"], mode="lines", name=f"{expiry} Heston"))
+            fig_smile.update_layout(xaxis_title="Strike", yaxis_title="Volatilité implicite")
+            st.plotly_chart(fig_smile, use_container_width=True)
+finally:
+    if profiler is not None:
+        profiler.stop()
+
 
+# --- Panneau Performance (dernier rerun) ---
 
+if instrument:
+    instrumentation.record("app.rerun", time.perf_counter() - rerun_start)
+    report = instrumentation.snapshot()
+    with st.expander("⏱️ Performance", expanded=False):
+        timers = pd.DataFrame.from_dict(report["timers"], orient="index").sort_values("total", ascending=False)
+        timers[["total", "mean", "max"]] *= 1000
+        st.markdown("**Temps (ms, inclusifs)**")
+        st.dataframe(timers.rename(columns={"calls": "appels", "total": "total (ms)", "mean": "moyenne (ms)", "max": "max (ms)"}).round(2))
+        col_counters, col_caches = st.columns(2)
+        with col_counters:
+            st.markdown("**Compteurs**")
+            st.dataframe(pd.Series(report["counters"], name="valeur", dtype=float))
+        with col_caches:
+            st.markdown("**Caches**")
+            st.dataframe(pd.DataFrame.from_dict(report["caches"], orient="index"))
+        if "capture_skipped" in report:
+            st.info("Profil non capturé : une autre session est déjà en cours de profilage.")
+        if "profile" in report:
+            st.markdown("**cProfile (temps cumulé)**")
+            st.code(report["profile"])
+        if "allocations" in report:
+            st.markdown(f"**Allocations** — pic : {report['peak_memory'] / 1e6:.1f} Mo")
+            st.dataframe(pd.DataFrame(report["allocations"]))
 
 # Pied de page
 st.markdown("---")
@@ -0,0 +1,117 @@
+import argparse
+import json
+import time
+import numpy as np
+import pandas as pd
+
+from contracts import ENGINES, GREEKS, ContractBook, price_contracts
+
+DEFAULTS = {"engine": "black_scholes", "exercise": "european", "quantity": 1.0}
+
+
+def read_positions(path, chunk_size):
+    # Lecture par blocs : la mémoire reste bornée quelle que soit la taille du book
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ColumnarWriter:
+    def __init__(self, path):
+        self.path = path
+        self._parquet = None
+        self._first = True
+
+    def write(self, frame):
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            frame.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def price_chunk(chunk, steps=200, paths=10000, seed=None):
+    for column, default in DEFAULTS.items():
+        if column not in chunk:
+            chunk[column] = default
+    chunk["engine"] = chunk["engine"].str.lower()
+    chunk["option_type"] = chunk["option_type"].str.lower()
+    engine = chunk["engine"].to_numpy()
+    unknown = set(np.unique(engine)) - set(ENGINES)
+    if unknown:
+        raise ValueError(f"engine must be one of {ENGINES}, got {sorted(unknown)}")
+    results = price_contracts(ContractBook.from_frame(chunk), engine, steps=steps, paths=paths, seed=seed)
+
+    out = chunk.copy()
+    quantity = chunk["quantity"].to_numpy(dtype=np.float64)
+    for g in GREEKS:
+        out[g] = results[g]
+        out[f"position_{g}"] = quantity * results[g]
+    return out
+
+
+def run(input_path, output_path, chunk_size=100000, steps=200, paths=10000, seed=None, summary_path=None):
+    writer = ColumnarWriter(output_path)
+    totals = {}
+    rows = 0
+    start = time.perf_counter()
+    try:
+        for chunk in read_positions(input_path, chunk_size):
+            priced = price_chunk(chunk, steps=steps, paths=paths, seed=seed)
+            writer.write(priced)
+            rows += len(priced)
+            exposures = priced.groupby("engine")[[f"position_{g}" for g in GREEKS]].sum()
+            for engine, row in exposures.iterrows():
+                bucket = totals.setdefault(engine, dict.fromkeys(GREEKS, 0.0))
+                for g in GREEKS:
+                    bucket[g] += float(row[f"position_{g}"])
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        "rows": rows,
+        "elapsed": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else float("inf"),
+        "by_engine": totals,
+        "portfolio": {g: sum(bucket[g] for bucket in totals.values()) for g in GREEKS},
+    }
+    if summary_path:
+        with open(summary_path, "w") as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Revalorisation batch d'un portefeuille d'options (CSV ou Parquet)")
+    parser.add_argument("input", help="Fichier de positions (.csv ou .parquet)")
+    parser.add_argument("output", help="Fichier de résultats (.csv ou .parquet)")
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    parser.add_argument("--steps", type=int, default=200, help="Nombre de pas de l'arbre binomial")
+    parser.add_argument("--paths", type=int, default=10000, help="Nombre de trajectoires Monte Carlo")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--summary", default=None, help="Fichier JSON du risque agrégé")
+    args = parser.parse_args()
+
+    summary = run(args.input, args.output, chunk_size=args.chunk_size, steps=args.steps, paths=args.paths,
+                  seed=args.seed, summary_path=args.summary)
+    print(f"{summary['rows']} lignes en {summary['elapsed']:.2f} s ({summary['rows_per_second']:.0f} lignes/s)")
+    print("Risque agrégé du portefeuille :")
+    for g, value in summary["portfolio"].items():
+        print(f"  {g:<6}: {value:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+import scipy
+
+from black_scholes import BlackScholes, black_scholes_batch
+from binomial_tree import BinomialTree, binomial_batch
+from finite_difference import FiniteDifference
+from monte_carlo import MonteCarlo, monte_carlo_batch
+
+S0, RATE, VOLATILITY = 100.0, 0.05, 0.2
+MONEYNESS = {"ATM": 1.0, "ITM": 0.9, "OTM": 1.1}  # strike / spot pour un call ; inversé pour un put
+MATURITIES = {"short": 0.1, "long": 2.0}
+CONTRACTS = (("call", False), ("put", True))  # call européen (référence BS), put américain (référence arbre fin)
+
+PROFILES = {
+    "quick": dict(steps=(100, 1000), grids=((200, 100),), paths=(10_000, 100_000), batch_size=10_000,
+                  tree_batch=256, reference_steps=2000, lsm_paths=(10_000,), repeat=3, budget=1.0),
+    "full": dict(steps=(100, 1000, 10000), grids=((200, 100), (800, 400)),
+                 paths=(10_000, 100_000, 1_000_000, 10_000_000), batch_size=1_000_000, tree_batch=1024,
+                 reference_steps=10000, lsm_paths=(10_000, 100_000), repeat=5, budget=5.0),
+}
+
+
+def scenarios():
+    for moneyness, ratio in MONEYNESS.items():
+        for maturity, T in MATURITIES.items():
+            for option_type, american in CONTRACTS:
+                K = S0 * (ratio if option_type == "call" else 2 - ratio)
+                yield {"scenario": f"{moneyness}-{maturity}", "option_type": option_type,
+                       "exercise": "american" if american else "european", "K": K, "T": T}
+
+
+def reference_price(case, steps):
+    # Analytique en européen ; BBS extrapolé (BBSR) sur un arbre fin en américain
+    if case["exercise"] == "european":
+        return BlackScholes(S0, case["K"], case["T"], RATE, VOLATILITY, case["option_type"]).price()
+    return BinomialTree(S0, case["K"], case["T"], RATE, VOLATILITY, N=steps, option_type=case["option_type"],
+                        american=True, method="bbs", richardson=True).price()
+
+
+def time_call(fn, repeat, budget):
+    # Au plus `repeat` exécutions, arrêtées dès que `budget` secondes sont consommées ; le minimum
+    # est le chiffre de référence, la médiane donne une idée du bruit
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < repeat:
+        t0 = time.perf_counter()
+        value = fn()
+        timings.append(time.perf_counter() - t0)
+        if time.perf_counter() - start > budget:
+            break
+    return value, {"seconds": min(timings), "median": statistics.median(timings), "runs": len(timings)}
+
+
+def engine_cases(case, profile, seed, workers):
+    # (moteur, mode, taille, nombre d'éléments évalués, fonction renvoyant (prix, erreur standard))
+    K, T, option_type = case["K"], case["T"], case["option_type"]
+    american = case["exercise"] == "american"
+    is_call = option_type == "call"
+
+    if not american:
+        def bs_single():
+            model = BlackScholes(S0, K, T, RATE, VOLATILITY, option_type)
+            [getattr(model, g)() for g in ("delta", "gamma", "vega", "theta", "rho")]
+            return model.price(), None
+        yield "black_scholes", "single", "1", 1, bs_single
+        n = profile["batch_size"]
+        yield "black_scholes", "batch", str(n), n, \
+            lambda: (float(black_scholes_batch(np.full(n, S0), K, T, RATE, VOLATILITY, is_call)["price"][0]), None)
+
+    for N in profile["steps"]:
+        yield "binomial", "single", f"N={N}", 1, \
+            lambda N=N: (BinomialTree(S0, K, T, RATE, VOLATILITY, N=N, option_type=option_type,
+                                      american=american).greeks()["price"], None)
+    n = profile["tree_batch"]
+    yield "binomial", "batch", f"N=200x{n}", n, \
+        lambda: (float(binomial_batch(np.full(n, S0), K, T, RATE, VOLATILITY, is_call, N=200,
+                                      american=american)["price"][0]), None)
+
+    for space_steps, time_steps in profile["grids"]:
+        yield "finite_difference", "single", f"{space_steps}x{time_steps}", 1, \
+            lambda s=space_steps, t=time_steps: (FiniteDifference(S0, K, T, RATE, VOLATILITY, option_type, american,
+                                                                  space_steps=s, time_steps=t).greeks()["price"], None)
+
+    if american:
+        # Longstaff-Schwartz : une régression sur toutes les trajectoires, ni flux par blocs ni processus
+        for paths in profile["lsm_paths"]:
+            yield "monte_carlo", "longstaff_schwartz", f"paths={paths}", paths, \
+                lambda paths=paths: MonteCarlo(S0, K, T, RATE, VOLATILITY, simulations=paths, option_type=option_type,
+                                               american=True, seed=seed).price_with_error()
+        return
+    for paths in profile["paths"]:
+        model = lambda paths=paths: MonteCarlo(S0, K, T, RATE, VOLATILITY, simulations=paths, option_type=option_type,
+                                               seed=seed)
+        # Flux par blocs de taille fixe : la mémoire reste bornée jusqu'à 1e7 trajectoires
+        yield "monte_carlo", "single", f"paths={paths}", paths, \
+            lambda model=model: _mc_result(model().price_streaming(chunk_size=100_000))
+        yield "monte_carlo", "parallel", f"paths={paths}", paths, \
+            lambda model=model: _mc_result(model().price_parallel(workers=workers, chunk_size=100_000))
+    n = profile["tree_batch"]
+    yield "monte_carlo", "batch", f"paths=10000x{n}", n, \
+        lambda: (float(monte_carlo_batch(np.full(n, S0), K, T, RATE, VOLATILITY, is_call, simulations=10_000,
+                                         seed=seed)["price"][0]), None)
+
+
+def _mc_result(result):
+    return result["price"], result["standard_errors"]["price"]
+
+
+def run(profile="quick", seed=42, workers=None, engines=None, log=print):
+    settings = PROFILES[profile]
+    workers = workers or os.cpu_count()
+    results = []
+    for case in scenarios():
+        reference = reference_price(case, settings["reference_steps"])
+        for engine, mode, size, items, fn in engine_cases(case, settings, seed, workers):
+            if engines and engine not in engines:
+                continue
+            (price, standard_error), timing = time_call(fn, settings["repeat"], settings["budget"])
+            record = {
+                "id": "/".join((engine, mode, case["scenario"], f"{case['option_type']}-{case['exercise']}", size)),
+                "engine": engine, "mode": mode, "scenario": case["scenario"], "option_type": case["option_type"],
+                "exercise": case["exercise"], "size": size, "items": items, **timing,
+                "per_item": timing["seconds"] / items, "price": float(price), "reference": reference,
+                "error": float(price) - reference, "standard_error": standard_error,
+            }
+            results.append(record)
+            if log:
+                log(f"{record['id']:<60} {timing['seconds'] * 1000:>10.2f} ms   erreur {record['error']:+.2e}")
+    return {"metadata": environment(profile, seed, workers), "results": results}
+
+
+def environment(profile, seed, workers):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "profile": profile,
+        "seed": seed,
+        "workers": workers,
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(report, baseline, time_tolerance=0.3, error_tolerance=1e-6, min_seconds=1e-3):
+    # Régression : plus lent que la base de plus de time_tolerance (relatif) et d'au moins min_seconds
+    # (les cas sub-milliseconde sont dominés par le bruit), ou erreur absolue dégradée de plus de
+    # error_tolerance. Les cas absents de la base sont ignorés.
+    previous = {record["id"]: record for record in baseline["results"]}
+    regressions = []
+    for record in report["results"]:
+        base = previous.get(record["id"])
+        if base is None:
+            continue
+        slower = record["seconds"] - base["seconds"]
+        if record["seconds"] > base["seconds"] * (1 + time_tolerance) and slower > min_seconds:
+            regressions.append({"id": record["id"], "kind": "time", "baseline": base["seconds"],
+                                "current": record["seconds"], "ratio": record["seconds"] / base["seconds"]})
+        if abs(record["error"]) > abs(base["error"]) + error_tolerance:
+            regressions.append({"id": record["id"], "kind": "error", "baseline": base["error"],
+                                "current": record["error"]})
+    return regressions
+
+
+def write_report(report, json_path=None, csv_path=None):
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    if csv_path:
+        pd.DataFrame(report["results"]).to_csv(csv_path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reproductible des moteurs de pricing (temps et précision)")
+    parser.add_argument("--profile", choices=tuple(PROFILES), default="quick")
+    parser.add_argument("--engine", action="append", choices=("black_scholes", "binomial", "finite_difference",
+                                                               "monte_carlo"), help="Restreint à ce moteur (répétable)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None, help="Processus pour le mode parallèle Monte Carlo")
+    parser.add_argument("--json", default=None, help="Fichier JSON des résultats")
+    parser.add_argument("--csv", default=None, help="Fichier CSV des résultats")
+    parser.add_argument("--baseline", default=None, help="Résultats JSON de référence pour détecter les régressions")
+    parser.add_argument("--save-baseline", action="store_true", help="Écrit les résultats dans --baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.3)
+    parser.add_argument("--error-tolerance", type=float, default=1e-6)
+    args = parser.parse_args()
+    if args.save_baseline and not args.baseline:
+        parser.error("--save-baseline requires --baseline")
+
+    report = run(args.profile, seed=args.seed, workers=args.workers, engines=args.engine)
+    write_report(report, args.json, args.csv)
+    if not args.baseline:
+        return 0
+    if args.save_baseline:
+        write_report(report, json_path=args.baseline)
+        print(f"Base de référence enregistrée dans {args.baseline}")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.time_tolerance, args.error_tolerance)
+    for regression in regressions:
+        if regression["kind"] == "time":
+            print(f"⚠️ {regression['id']} : {regression['ratio']:.2f}x plus lent que la base")
+        else:
+            print(f"⚠️ {regression['id']} : erreur {regression['current']:+.2e} (base {regression['baseline']:+.2e})")
+    print(f"{len(regressions)} régression(s) par rapport à {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,98 +1,476 @@
 import math
+import numpy as np
+from scipy.special import gammaln
+
+import instrumentation
+
+METHODS = ("crr", "leisen_reimer", "bbs")
+
+
+def _peizer_pratt(z, n):
+    # Inversion de Peizer-Pratt (méthode 2) utilisée par Leisen-Reimer
+    return 0.5 + np.sign(z) * 0.5 * np.sqrt(1 - np.exp(-(z / (n + 1 / 3 + 0.1 / (n + 1))) ** 2 * (n + 1 / 6)))
+
+
+def lattice_parameters(S, K, dt, r, sigma, N, method="crr"):
+    # (u, d, p) par ligne. Leisen-Reimer centre l'arbre sur le strike (N impair recommandé) ;
+    # "bbs" garde la géométrie CRR et ne change que le dernier pas.
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    growth = np.exp(r * dt)
+    if method == "leisen_reimer":
+        T = N * dt
+        vol_sqrt_T = sigma * np.sqrt(T)
+        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / vol_sqrt_T
+        d2 = d1 - vol_sqrt_T
+        p = _peizer_pratt(d2, N)
+        u = growth * _peizer_pratt(d1, N) / p
+        d = (growth - p * u) / (1 - p)
+        return u, d, p
+    u = np.exp(sigma * np.sqrt(dt))
+    d = 1 / u
+    return u, d, (growth - d) / (u - d)
+
+
+@instrumentation.timed("binomial.roll_back")
+def roll_back(S, K, dt, r, sigma, is_call, N, american=False, capture=False, extra_steps=0, method="crr"):
+    # Induction arrière sur un lot d'arbres : chaque ligne a ses propres S, K, dt, r, sigma et type
+    # (is_call booléen ou signe +1/-1). Les paramètres scalaires ne sont pas répétés : avec S, dt, r et
+    # sigma communs (CRR), les prix des noeuds sont calculés une fois pour toutes les lignes.
+    # extra_steps démarre l'arbre avant t=0 : le niveau extra_steps couvre alors une plage de spots.
+    S, K, dt, r, sigma, is_call = (np.atleast_1d(np.asarray(x, dtype=np.float64)) for x in (S, K, dt, r, sigma, is_call))
+    rows = np.broadcast_shapes(S.shape, K.shape, dt.shape, r.shape, sigma.shape, is_call.shape)[0]
+    N = N + extra_steps
+    instrumentation.count("binomial.trees", rows)
+    S, K, dt, r, sigma = S[:, None], K[:, None], dt[:, None], r[:, None], sigma[:, None]
+    sign = np.where(is_call > 0, 1.0, -1.0)[:, None]
+    u, d, p = lattice_parameters(S, K, dt, r, sigma, N, method)
+    up_move = 1 / d
+    discount = np.exp(-r * dt)
+    pu = discount * p
+    pd = discount * (1 - p)
+
+    # Un seul buffer de N+1 valeurs par arbre, réduit sur place à chaque pas
+    j = np.arange(N + 1)
+    asset_prices = S * np.exp(j * np.log(u) + (N - j) * np.log(d))
+    values = np.empty((rows, N + 1))
+    scratch = np.empty_like(values)
+    np.subtract(asset_prices, K, out=values)
+    values *= sign
+    np.maximum(values, 0.0, out=values)
+
+    first = N - 1
+    if method == "bbs" and N > 1:
+        # Dernier pas remplacé par Black-Scholes sur dt : supprime l'oscillation due au payoff non lisse
+        from black_scholes import black_scholes_batch
+        a = asset_prices[:, :N]
+        a *= up_move
+        values[:, :N] = black_scholes_batch(a, K, dt, r, sigma, sign > 0)["price"]
+        if american:
+            np.maximum(values[:, :N], sign * (a - K), out=values[:, :N])
+        first = N - 2
+
+    captured = {}
+    if capture and first == N - 2 and extra_steps <= N - 1 <= extra_steps + 2:
+        captured[N - 1 - extra_steps] = values[:, :N].copy()
+    for i in range(first, -1, -1):
+        v = values[:, :i + 1]
+        s = scratch[:, :i + 1]
+        np.multiply(values[:, 1:i + 2], pu, out=s)
+        v *= pd
+        v += s
+        if american:
+            # S * u^j * d^(i-j) = (prix au niveau i+1) / d : mise à jour incrémentale
+            a = asset_prices[:, :i + 1]
+            a *= up_move
+            np.subtract(a, K, out=s)
+            s *= sign
+            np.maximum(v, s, out=v)
+        if capture and extra_steps <= i <= extra_steps + 2:
+            captured[i - extra_steps] = v.copy()
+
+    if capture:
+        return values[:, 0], captured
+    return values[:, 0]
+
+
+def lattice_greeks(S, u, d, dt, V0, captured):
+    # Delta, gamma et theta lus sur les noeuds des pas 1 et 2 (u * d != 1 pour Leisen-Reimer)
+    V_d, V_u = captured[1].T
+    V_dd, V_ud, V_uu = captured[2].T
+    S_u, S_d = S * u, S * d
+    S_uu, S_ud, S_dd = S_u * u, S_u * d, S_d * d
+    delta_up = (V_uu - V_ud) / (S_uu - S_ud)
+    delta_down = (V_ud - V_dd) / (S_ud - S_dd)
+    delta = (V_u - V_d) / (S_u - S_d)
+    gamma = (delta_up - delta_down) / (0.5 * (S_uu - S_dd))
+    # Le noeud central du pas 2 n'est au spot initial qu'en CRR : V_ud est ramené en S par Taylor
+    # avant la différence en temps
+    shift = S_ud - S
+    return {
+        "price": V0,
+        "delta": delta,
+        "gamma": gamma,
+        "theta": (V_ud - delta * shift - 0.5 * gamma * shift ** 2 - V0) / (2 * dt) / 365,
+    }
+
+
+def richardson(fine, coarse, N, N_coarse, order=1):
+    # Extrapolation à deux points en supposant une erreur en C / N^order
+    weight_fine, weight_coarse = float(N) ** order, float(N_coarse) ** order
+    return (weight_fine * fine - weight_coarse * coarse) / (weight_fine - weight_coarse)
+
+
+def convergence_order(method, american=False):
+    # Leisen-Reimer converge en 1/N^2 en européen ; la frontière d'exercice ramène tout à l'ordre 1
+    return 2 if method == "leisen_reimer" and not american else 1
+
+
+def binomial_batch(S, K, T, r, sigma, is_call=True, N=200, american=False, block=64, method="crr", extrapolate=False):
+    # Prix et Greeks d'un lot de contrats : 5 arbres par contrat (base, sigma ±, r ±) par passage,
+    # par blocs de contrats pour que le buffer reste en cache
+    S, K, T, r, sigma, is_call = (np.ravel(x) for x in np.broadcast_arrays(S, K, T, r, sigma, np.asarray(is_call, dtype=bool)))
+    S, K, T, r, sigma = (np.asarray(x, dtype=np.float64) for x in (S, K, T, r, sigma))
+    if method == "leisen_reimer" and N % 2 == 0:
+        N += 1
+    results = {name: np.empty(len(S)) for name in ("price", "delta", "gamma", "vega", "theta", "rho")}
+    for start in range(0, len(S), block):
+        rows = slice(start, start + block)
+        block_results = _binomial_block(S[rows], K[rows], T[rows], r[rows], sigma[rows], is_call[rows], N, american, method)
+        if extrapolate:
+            N_coarse = _coarse_steps(N, method)
+            coarse = _binomial_block(S[rows], K[rows], T[rows], r[rows], sigma[rows], is_call[rows], N_coarse, american, method)
+            order = convergence_order(method, american)
+            block_results = {name: richardson(values, coarse[name], N, N_coarse, order)
+                             for name, values in block_results.items()}
+        for name, values in block_results.items():
+            results[name][rows] = values
+    return results
+
+
+def _coarse_steps(N, method):
+    # L'erreur CRR/BBS oscille selon la parité de N (et Leisen-Reimer exige N impair) : la grille
+    # grossière garde la parité de N, sinon l'extrapolation combine deux branches d'oscillation
+    coarse = N // 2
+    return coarse + 1 if coarse % 2 != N % 2 else coarse
+
+
+def _binomial_block(S, K, T, r, sigma, is_call, N, american, method="crr"):
+    epsilon = 0.01
+    n = len(S)
+    tile = lambda x: np.tile(x, 5)
+    row_sigma = np.concatenate([sigma, sigma + epsilon, sigma - epsilon, sigma, sigma])
+    row_r = np.concatenate([r, r, r, r + epsilon, r - epsilon])
+    dt = T / N
+    root, captured = roll_back(tile(S), tile(K), tile(dt), row_r, row_sigma, tile(is_call), N,
+                               american=american, capture=True, method=method)
+
+    base = slice(0, n)
+    u, d, _ = lattice_parameters(S, K, dt, r, sigma, N, method)
+    results = lattice_greeks(S, u, d, dt, root[base], {level: values[base] for level, values in captured.items()})
+    results["vega"] = (root[n:2 * n] - root[2 * n:3 * n]) / (2 * epsilon) / 100
+    results["rho"] = (root[3 * n:4 * n] - root[4 * n:]) / (2 * epsilon) / 100
+    return results
+
 
 class BinomialTree:
-    def __init__(self, S, K, T, r, sigma, N, option_type="call", american=False):
+    def __init__(self, S, K, T, r, sigma, N, option_type="call", american=False, method="crr", richardson=False):
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}")
         self.S = S
         self.K = K
         self.T = T
         self.r = r
         self.sigma = sigma
-        self.N = N
+        # Leisen-Reimer n'est défini que pour un nombre de pas impair
+        self.N = N + 1 if method == "leisen_reimer" and N % 2 == 0 else N
         self.option_type = option_type.lower()
         self.american = american
+        self.method = method
+        self.richardson = richardson
+
+        self.dt = T / self.N
+        u, d, p = lattice_parameters(S, K, self.dt, r, sigma, self.N, method)
+        self.u, self.d, self.p = float(u), float(d), float(p)
+        self.discount = math.exp(-r * self.dt)
+        self._lattice = None
+        self._bumped = None
+
+    def _backward_induction(self, sigma=None, r=None, capture=False, extra_steps=0):
+        if self.option_type not in ("call", "put"):
+            raise ValueError("option_type must be 'call' or 'put'")
+        # Chaque ligne est un arbre (sigma, r) : les scénarios bumpés partagent le même passage
+        sigma = np.atleast_1d(np.asarray(self.sigma if sigma is None else sigma, dtype=np.float64))
+        r = np.atleast_1d(np.asarray(self.r if r is None else r, dtype=np.float64))
+        sigma, r = np.broadcast_arrays(sigma, r)
+        return roll_back(self.S, self.K, self.dt, r, sigma, self.option_type == "call", self.N,
+                         american=self.american, capture=capture, extra_steps=extra_steps, method=self.method)
+
+    def _coarse_tree(self):
+        return BinomialTree(S=self.S, K=self.K, T=self.T, r=self.r, sigma=self.sigma, N=_coarse_steps(self.N, self.method),
+                            option_type=self.option_type, american=self.american, method=self.method)
+
+    def _extrapolate(self, fine, coarse):
+        order = convergence_order(self.method, self.american)
+        N_coarse = _coarse_steps(self.N, self.method)
+        return {name: richardson(value, coarse[name], self.N, N_coarse, order) for name, value in fine.items()}
+
+    def _lattice_greeks(self):
+        # Delta, gamma et theta lus sur les noeuds des pas 1 et 2 d'une seule induction
+        if self._lattice is None:
+            root, captured = self._backward_induction(capture=True)
+            greeks = lattice_greeks(self.S, self.u, self.d, self.dt, root[0], {level: v[0] for level, v in captured.items()})
+            self._lattice = {name: float(value) for name, value in greeks.items()}
+            if self.richardson:
+                coarse = self._coarse_tree()._lattice_greeks()
+                self._lattice = {name: float(v) for name, v in self._extrapolate(self._lattice, coarse).items()}
+        return self._lattice
+
+    def _bumped_greeks(self):
+        # Vega et rho : les 4 arbres bumpés sont évalués dans un seul passage vectorisé
+        if self._bumped is None:
+            epsilon = 0.01
+            sigmas = [self.sigma + epsilon, self.sigma - epsilon, self.sigma, self.sigma]
+            rates = [self.r, self.r, self.r + epsilon, self.r - epsilon]
+            v_up, v_down, r_up, r_down = self._backward_induction(sigma=sigmas, r=rates)
+            self._bumped = {
+                "vega": float((v_up - v_down) / (2 * epsilon) / 100),
+                "rho": float((r_up - r_down) / (2 * epsilon) / 100),
+            }
+            if self.richardson:
+                coarse = self._coarse_tree()._bumped_greeks()
+                self._bumped = {name: float(v) for name, v in self._extrapolate(self._bumped, coarse).items()}
+        return self._bumped
+
+    @classmethod
+    def evaluate_book(cls, book, N=200):
+        # Book en colonnes (contracts.ContractBook) : binomial_batch par style d'exercice
+        from contracts import price_contracts
+        return price_contracts(book, "binomial", steps=N)
+
+    def evaluate_grid(self, S=None, sigma=None, T=None):
+        # Prix et Greeks sur une grille (spot, vol, maturité) broadcastable. Pour chaque maturité,
+        # un seul arbre étendu est parcouru : ses noeuds à t=0 couvrent la plage de spots, chaque
+        # vol (et ses bumps pour vega/rho) est une ligne du même buffer.
+        S, sigma, T = np.broadcast_arrays(*(np.asarray(default if x is None else x, dtype=np.float64)
+                                            for x, default in ((S, self.S), (sigma, self.sigma), (T, self.T))))
+        if self.method == "leisen_reimer" or self.richardson:
+            # La géométrie Leisen-Reimer dépend du spot, et l'extrapolation amplifierait l'erreur
+            # d'interpolation entre noeuds : pas d'arbre étendu partagé, un arbre par point
+            results = binomial_batch(S.ravel(), self.K, T.ravel(), self.r, sigma.ravel(), self.option_type == "call",
+                                     N=self.N, american=self.american, method=self.method, extrapolate=self.richardson)
+            return {name: values.reshape(S.shape) for name, values in results.items()}
+        results = {name: np.empty(S.shape) for name in ("price", "delta", "gamma", "vega", "theta", "rho")}
+        for T_value in np.unique(T):
+            in_T = T == T_value
+            sigmas = np.unique(sigma[in_T])
+            tree = BinomialTree(S=self.S, K=self.K, T=T_value, r=self.r, sigma=self.sigma, N=self.N,
+                                option_type=self.option_type, american=self.american, method=self.method)
+            rows = tree._grid_rows(sigmas, S[in_T].min(), S[in_T].max())
+            for k, sigma_value in enumerate(sigmas):
+                mask = in_T & (sigma == sigma_value)
+                log_S = np.log(S[mask])
+                for name, (log_spots, values) in rows.items():
+                    results[name][mask] = np.interp(log_S, log_spots[k], values[k])
+        return results
+
+    def _grid_rows(self, sigmas, S_min, S_max):
+        epsilon = 0.01
+        s = len(sigmas)
+        row_sigmas = np.concatenate([sigmas, sigmas + epsilon, sigmas - epsilon, sigmas, sigmas])
+        row_rates = np.concatenate([np.full(3 * s, self.r), np.full(s, self.r + epsilon), np.full(s, self.r - epsilon)])
+        # Assez de pas supplémentaires pour que la ligne la moins volatile couvre [S_min, S_max]
+        step = row_sigmas.min() * math.sqrt(self.dt)
+        span = max(math.log(S_max / self.S), math.log(self.S / S_min), 0.0)
+        extra = 2 * math.ceil(span / step / 2) + 2
+
+        _, captured = self._backward_induction(sigma=row_sigmas, r=row_rates, capture=True, extra_steps=extra)
+        u = np.exp(row_sigmas * math.sqrt(self.dt))[:, None]
+        log_spot = lambda level: np.log(self.S) + np.log(u) * (2.0 * np.arange(level + 1) - level)
+        spots0, spots1, spots2 = (np.exp(log_spot(extra + i)) for i in range(3))
+        V0, V1, V2 = captured[0], captured[1], captured[2]
+
+        delta = (V1[:, 1:] - V1[:, :-1]) / (spots1[:, 1:] - spots1[:, :-1])
+        delta_up = (V2[:, 2:] - V2[:, 1:-1]) / (spots2[:, 2:] - spots2[:, 1:-1])
+        delta_down = (V2[:, 1:-1] - V2[:, :-2]) / (spots2[:, 1:-1] - spots2[:, :-2])
+        gamma = (delta_up - delta_down) / (0.5 * (spots2[:, 2:] - spots2[:, :-2]))
+        theta = (V2[:, 1:-1] - V0) / (2 * self.dt) / 365
+
+        log_spots = np.log(spots0)
+        base, sig_up, sig_down, r_up, r_down = (slice(i * s, (i + 1) * s) for i in range(5))
+        interp = lambda rows: np.array([np.interp(log_spots[k], log_spots[j], V0[j]) for k, j in
+                                        zip(range(s), range(rows.start, rows.stop))])
+        vega = (interp(sig_up) - interp(sig_down)) / (2 * epsilon) / 100
+        rho = (interp(r_up) - interp(r_down)) / (2 * epsilon) / 100
+        grid = log_spots[base]
+        return {
+            "price": (grid, V0[base]),
+            "delta": (grid, delta[base]),
+            "gamma": (grid, gamma[base]),
+            "vega": (grid, vega),
+            "theta": (grid, theta[base]),
+            "rho": (grid, rho),
+        }
+
+    def price(self):
+        if self._lattice is not None:
+            return self._lattice["price"]
+        price = float(self._backward_induction()[0])
+        if self.richardson:
+            price = float(self._extrapolate({"price": price}, {"price": self._coarse_tree().price()})["price"])
+        return price
+
+    def greeks(self):
+        return {**self._lattice_greeks(), **self._bumped_greeks()}
+
+    def delta(self):
+        return self._lattice_greeks()["delta"]
+
+    def gamma(self):
+        return self._lattice_greeks()["gamma"]
+
+    def theta(self):
+        return self._lattice_greeks()["theta"]
+
+    def vega(self):
+        return self._bumped_greeks()["vega"]
+
+    def rho(self):
+        return self._bumped_greeks()["rho"]
+
+
+class BinomialLattice:
+    # Arbre CRR partagé : u, d, p, l'actualisation par pas et les prix terminaux ne dépendent que de
+    # (S, T, r, sigma, N). Tous les strikes et les deux payoffs sont réduits dans un seul passage 2-D.
+    def __init__(self, S, T, r, sigma, N):
+        self.S = S
+        self.T = T
+        self.r = r
+        self.sigma = sigma
+        self.N = N
 
         self.dt = T / N
         self.u = math.exp(sigma * math.sqrt(self.dt))
         self.d = 1 / self.u
         self.p = (math.exp(r * self.dt) - self.d) / (self.u - self.d)
         self.discount = math.exp(-r * self.dt)
+        self.terminal_prices = S * np.exp(math.log(self.u) * (2.0 * np.arange(N + 1) - N))
 
-    def price(self):
-        asset_prices = [self.S * (self.u ** j) * (self.d ** (self.N - j)) for j in range(self.N + 1)]
-        
-        if self.option_type == "call":
-            option_values = [max(price - self.K, 0) for price in asset_prices]
-        elif self.option_type == "put":
-            option_values = [max(self.K - price, 0) for price in asset_prices]
-        else:
-            raise ValueError("option_type must be 'call' or 'put'")
-        
-        for i in range(self.N - 1, -1, -1):
-            option_values = [
-                self.discount * (self.p * option_values[j+1] + (1 - self.p) * option_values[j])
-                for j in range(i + 1)
-            ]
-            if self.american:
-                asset_prices = [self.S * (self.u ** j) * (self.d ** (i - j)) for j in range(i + 1)]
-                if self.option_type == "call":
-                    option_values = [max(option_values[j], asset_prices[j] - self.K) for j in range(i + 1)]
-                else:
-                    option_values = [max(option_values[j], self.K - asset_prices[j]) for j in range(i + 1)]
-
-        return option_values[0]
+    def _rows(self, strikes, option_types):
+        strikes = np.atleast_1d(np.asarray(strikes, dtype=np.float64))
+        option_types = [option_types] if isinstance(option_types, str) else list(option_types)
+        for option_type in option_types:
+            if option_type not in ("call", "put"):
+                raise ValueError("option_type must be 'call' or 'put'")
+        # Lignes : chaque type d'option répété sur tous les strikes
+        K = np.tile(strikes, len(option_types))[:, None]
+        sign = np.repeat([1.0 if t == "call" else -1.0 for t in option_types], len(strikes))[:, None]
+        return strikes, option_types, K, sign
 
-    def delta(self):
-        S_up = self.S * self.u
-        S_down = self.S * self.d
+    def _weights(self, steps):
+        # Probabilités binomiales actualisées : la valeur européenne est un produit scalaire avec le payoff
+        k = np.arange(steps + 1)
+        log_weights = (gammaln(steps + 1) - gammaln(k + 1) - gammaln(steps - k + 1)
+                       + k * math.log(self.p) + (steps - k) * math.log(1 - self.p) + steps * math.log(self.discount))
+        return np.exp(log_weights)
 
-        if self.option_type == "call":
-            payoff_up = max(S_up - self.K, 0)
-            payoff_down = max(S_down - self.K, 0)
-        else:
-            payoff_up = max(self.K - S_up, 0)
-            payoff_down = max(self.K - S_down, 0)
+    @instrumentation.timed("binomial.lattice")
+    def _evaluate(self, K, sign, american, capture=False):
+        # Sans dividende et avec r >= 0, le call américain n'est jamais exercé avant l'échéance :
+        # seules les lignes put américaines ont besoin de l'induction arrière complète
+        induction = np.full(len(K), american) & ((sign[:, 0] < 0) | (self.r < 0))
+        instrumentation.count("binomial.closed_form_rows", int((~induction).sum()))
+        root = np.empty(len(K))
+        captured = {1: np.empty((len(K), 2)), 2: np.empty((len(K), 3))}
+        if induction.any():
+            # Même induction arrière que les lots d'arbres, S, dt, r et sigma scalaires partagés par les lignes
+            rolled = roll_back(self.S, K[induction, 0], self.dt, self.r, self.sigma, sign[induction, 0], self.N,
+                               american=True, capture=capture)
+            root[induction], rolled = rolled if capture else (rolled, {})
+            for level in (1, 2) if capture else ():
+                captured[level][induction] = rolled[level]
+        closed = ~induction
+        if closed.any():
+            N = self.N
+            payoffs = np.maximum(sign[closed] * (self.terminal_prices - K[closed]), 0.0)
+            root[closed] = payoffs @ self._weights(N)
+            if capture:
+                for level in (1, 2):
+                    weights = self._weights(N - level)
+                    captured[level][closed] = np.stack([payoffs[:, j:j + N - level + 1] @ weights
+                                                        for j in range(level + 1)], axis=1)
+        return root, captured
 
-        return (payoff_up - payoff_down) / (S_up - S_down)
+    def price(self, strikes, option_types="call", american=False):
+        strikes, option_types, K, sign = self._rows(strikes, option_types)
+        root, _ = self._evaluate(K, sign, american)
+        prices = root.reshape(len(option_types), len(strikes))
+        return {t: prices[k] for k, t in enumerate(option_types)}
 
-    def gamma(self):
-        S_upup = self.S * self.u * self.u
-        S_updown = self.S * self.u * self.d
-        S_downdown = self.S * self.d * self.d
-
-        if self.option_type == "call":
-            payoff_upup = max(S_upup - self.K, 0)
-            payoff_updown = max(S_updown - self.K, 0)
-            payoff_downdown = max(S_downdown - self.K, 0)
-        else:
-            payoff_upup = max(self.K - S_upup, 0)
-            payoff_updown = max(self.K - S_updown, 0)
-            payoff_downdown = max(self.K - S_downdown, 0)
+    def greeks(self, strikes, option_types="call", american=False):
+        # Delta, gamma, theta sur les noeuds des pas 1 et 2 ; vega et rho via quatre arbres bumpés,
+        # chacun évalué une fois pour tous les strikes
+        strikes, option_types, K, sign = self._rows(strikes, option_types)
+        root, captured = self._evaluate(K, sign, american, capture=True)
+        V_d, V_u = captured[1].T
+        V_dd, V_ud, V_uu = captured[2].T
+        S_u, S_d = self.S * self.u, self.S * self.d
+        S_uu, S_dd = S_u * self.u, S_d * self.d
+        delta_up = (V_uu - V_ud) / (S_uu - self.S)
+        delta_down = (V_ud - V_dd) / (self.S - S_dd)
+        results = {
+            "price": root,
+            "delta": (V_u - V_d) / (S_u - S_d),
+            "gamma": (delta_up - delta_down) / (0.5 * (S_uu - S_dd)),
+            "theta": (V_ud - root) / (2 * self.dt) / 365,
+        }
 
-        delta_up = (payoff_upup - payoff_updown) / (self.S * (self.u - self.d))
-        delta_down = (payoff_updown - payoff_downdown) / (self.S * (self.u - self.d))
+        epsilon = 0.01
+        bumped = {}
+        for name, sigma, r in (("sigma_up", self.sigma + epsilon, self.r), ("sigma_down", self.sigma - epsilon, self.r),
+                               ("r_up", self.sigma, self.r + epsilon), ("r_down", self.sigma, self.r - epsilon)):
+            bumped[name] = BinomialLattice(self.S, self.T, r, sigma, self.N)._evaluate(K, sign, american)[0]
+        results["vega"] = (bumped["sigma_up"] - bumped["sigma_down"]) / (2 * epsilon) / 100
+        results["rho"] = (bumped["r_up"] - bumped["r_down"]) / (2 * epsilon) / 100
 
-        return (delta_up - delta_down) / (0.5 * (S_upup - S_downdown))
+        shape = (len(option_types), len(strikes))
+        return {t: {name: values.reshape(shape)[k] for name, values in results.items()} for k, t in enumerate(option_types)}
 
-    def theta(self):
-        bt_now = self.price()
-        bt_future = BinomialTree(S=self.S, K=self.K, T=self.T - 2*self.dt, r=self.r, sigma=self.sigma, N=self.N-2, option_type=self.option_type, american=self.american)
-        bt_future_price = bt_future.price()
-        theta_annual = (bt_future_price - bt_now) / (2 * self.dt)
-        return theta_annual / 365  
 
-    def vega(self):
-        epsilon = 0.01  
-        bt_plus = BinomialTree(S=self.S, K=self.K, T=self.T, r=self.r, sigma=self.sigma + epsilon, N=self.N, option_type=self.option_type, american=self.american)
-        bt_minus = BinomialTree(S=self.S, K=self.K, T=self.T, r=self.r, sigma=self.sigma - epsilon, N=self.N, option_type=self.option_type, american=self.american)
+MODES = (("crr", False), ("crr", True), ("bbs", False), ("bbs", True), ("leisen_reimer", False), ("leisen_reimer", True))
 
-        vega_raw = (bt_plus.price() - bt_minus.price()) / (2 * epsilon)
-        return vega_raw / 100  
 
-    def rho(self):
-        epsilon = 0.01  
-        bt_plus = BinomialTree(S=self.S, K=self.K, T=self.T, r=self.r + epsilon, sigma=self.sigma, N=self.N, option_type=self.option_type, american=self.american)
-        bt_minus = BinomialTree(S=self.S, K=self.K, T=self.T, r=self.r - epsilon, sigma=self.sigma, N=self.N, option_type=self.option_type, american=self.american)
+def convergence_table(S, K, T, r, sigma, option_type="put", american=False, steps=(25, 50, 100, 200, 400, 800),
+                      modes=MODES, reference=None):
+    # Erreur et temps de calcul en fonction de N pour chaque mode (méthode, Richardson). Référence :
+    # Black-Scholes en européen, sinon BBS extrapolé (BBSR) sur un arbre très fin.
+    import time
+    if reference is None:
+        if american:
+            reference = BinomialTree(S, K, T, r, sigma, N=10000, option_type=option_type, american=True,
+                                     method="bbs", richardson=True).price()
+        else:
+            from black_scholes import BlackScholes
+            reference = BlackScholes(S, K, T, r, sigma, option_type=option_type).price()
+    rows = []
+    for method, extrapolate in modes:
+        for N in steps:
+            start = time.perf_counter()
+            tree = BinomialTree(S, K, T, r, sigma, N=N, option_type=option_type, american=american,
+                                method=method, richardson=extrapolate)
+            price = tree.price()
+            elapsed = time.perf_counter() - start
+            rows.append({"method": method, "richardson": extrapolate, "N": tree.N, "price": price,
+                         "error": price - reference, "seconds": elapsed})
+    return reference, rows
 
-        rho_raw = (bt_plus.price() - bt_minus.price()) / (2 * epsilon)
-        return rho_raw / 100 
 
+if __name__ == "__main__":
+    for american in (False, True):
+        reference, rows = convergence_table(100, 100, 1.0, 0.05, 0.2, option_type="put", american=american)
+        print(f"Put {'américain' if american else 'européen'} S=K=100, T=1, r=5%, vol=20% : référence {reference:.6f}")
+        print(f"{'méthode':<14}{'Richardson':>11}{'N':>6}{'prix':>12}{'erreur':>12}{'temps (ms)':>12}")
+        for row in rows:
+            print(f"{row['method']:<14}{str(row['richardson']):>11}{row['N']:>6}{row['price']:>12.6f}"
+                  f"{row['error']:>12.2e}{row['seconds'] * 1000:>12.2f}")
+        print()
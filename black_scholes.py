@@ -1,5 +1,50 @@
 import math
-from scipy.stats import norm
+import numpy as np
+from scipy.special import ndtr
+
+import instrumentation
+
+INV_SQRT_2PI = 1.0 / math.sqrt(2 * math.pi)
+
+
+def black_scholes_batch(S, K, T, r, sigma, is_call=True):
+    # Toutes les entrées sont broadcastables : un seul passage calcule prix et Greeks
+    S, K, T, r, sigma = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (S, K, T, r, sigma)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), S.shape)
+    instrumentation.count("black_scholes.contracts", S.size)
+
+    sqrt_T = np.sqrt(T)
+    vol_sqrt_T = sigma * sqrt_T
+    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / vol_sqrt_T
+    d2 = d1 - vol_sqrt_T
+
+    Nd1 = ndtr(d1)
+    Nd2 = ndtr(d2)
+    pdf_d1 = INV_SQRT_2PI * np.exp(-0.5 * d1 * d1)
+    disc_K = K * np.exp(-r * T)
+
+    # Put via parité : N(-x) = 1 - N(x)
+    call_price = S * Nd1 - disc_K * Nd2
+    price = np.where(is_call, call_price, call_price - S + disc_K)
+    delta = np.where(is_call, Nd1, Nd1 - 1)
+    gamma = pdf_d1 / (S * vol_sqrt_T)
+    vega = S * pdf_d1 * sqrt_T / 100
+    term1 = -(S * pdf_d1 * sigma) / (2 * sqrt_T)
+    carry = r * disc_K * np.where(is_call, -Nd2, 1 - Nd2)
+    theta = (term1 + carry) / 365
+    rho = K * T * np.exp(-r * T) * np.where(is_call, Nd2, Nd2 - 1) / 100
+
+    return {
+        "price": price,
+        "delta": delta,
+        "gamma": gamma,
+        "vega": vega,
+        "theta": theta,
+        "rho": rho,
+        "d1": d1,
+        "d2": d2,
+    }
+
 
 class BlackScholes:
     def __init__(self, S, K, T, r, sigma, option_type="call"):
@@ -9,46 +54,39 @@ class BlackScholes:
         self.r = r
         self.sigma = sigma
         self.option_type = option_type.lower()
-        
-        self.d1 = (math.log(self.S / self.K) + (self.r + 0.5 * self.sigma ** 2) * self.T) / (self.sigma * math.sqrt(self.T))
-        self.d2 = self.d1 - self.sigma * math.sqrt(self.T)
-        
-    def price(self):
-        if self.option_type == "call":
-            return self.S * norm.cdf(self.d1) - self.K * math.exp(-self.r * self.T) * norm.cdf(self.d2)
-        elif self.option_type == "put":
-            return self.K * math.exp(-self.r * self.T) * norm.cdf(-self.d2) - self.S * norm.cdf(-self.d1)
-        else:
+        if self.option_type not in ("call", "put"):
             raise ValueError("option_type must be 'call' or 'put'")
-    
+
+        self._results = black_scholes_batch(S, K, T, r, sigma, self.option_type == "call")
+        self.d1 = float(self._results["d1"])
+        self.d2 = float(self._results["d2"])
+
+    def price(self):
+        return float(self._results["price"])
+
     def delta(self):
-        if self.option_type == "call":
-            return norm.cdf(self.d1)
-        elif self.option_type == "put":
-            return norm.cdf(self.d1) - 1
-    
+        return float(self._results["delta"])
+
     def gamma(self):
-        return norm.pdf(self.d1) / (self.S * self.sigma * math.sqrt(self.T))
-    
+        return float(self._results["gamma"])
+
     def vega(self):
-        return (self.S * norm.pdf(self.d1) * math.sqrt(self.T)) / 100  
-    
+        return float(self._results["vega"])
+
     def theta(self):
-        term1 = -(self.S * norm.pdf(self.d1) * self.sigma) / (2 * math.sqrt(self.T))
-        if self.option_type == "call":
-            term2 = -self.r * self.K * math.exp(-self.r * self.T) * norm.cdf(self.d2)
-            theta_annual = term1 + term2
-        elif self.option_type == "put":
-            term2 = self.r * self.K * math.exp(-self.r * self.T) * norm.cdf(-self.d2)
-            theta_annual = term1 + term2
-        
-        return theta_annual / 365  
-    
-    def rho(self):
-        if self.option_type == "call":
-            return self.K * self.T * math.exp(-self.r * self.T) * norm.cdf(self.d2)/100
-        elif self.option_type == "put":
-            return -self.K * self.T * math.exp(-self.r * self.T) * norm.cdf(-self.d2)/100
+        return float(self._results["theta"])
 
+    def rho(self):
+        return float(self._results["rho"])
 
+    @classmethod
+    def evaluate_book(cls, book):
+        # Book en colonnes (contracts.ContractBook) : un appel vectorisé ; les lignes américaines passent par l'arbre
+        from contracts import price_contracts
+        return price_contracts(book, "black_scholes")
 
+    def evaluate_grid(self, S=None, sigma=None, T=None):
+        # Grille broadcastable (ex. S[:, None] et sigma[None, :]) évaluée en un seul appel
+        results = black_scholes_batch(self.S if S is None else S, self.K, self.T if T is None else T, self.r,
+                                      self.sigma if sigma is None else sigma, self.option_type == "call")
+        return {name: results[name] for name in ("price", "delta", "gamma", "vega", "theta", "rho")}
@@ -0,0 +1,210 @@
+import os
+import numpy as np
+import pandas as pd
+
+from black_scholes import BlackScholes, black_scholes_batch
+from binomial_tree import BinomialTree, binomial_batch
+from finite_difference import FiniteDifference
+from monte_carlo import MonteCarlo, monte_carlo_batch
+
+GREEKS = ("price", "delta", "gamma", "vega", "theta", "rho")
+ENGINES = ("black_scholes", "binomial", "finite_difference", "monte_carlo")
+FLOAT_FIELDS = ("S", "K", "T", "r", "sigma", "quantity")
+FLAG_FIELDS = ("is_call", "american")
+
+
+# Une colonne contiguë par champ (struct-of-arrays), chacune dans son propre .npy mappable. Un seul
+# enregistrement à sous-tableaux (n,) verrait son itemsize, un entier 32 bits, déborder vers 43M contrats.
+DTYPES = {**{name: np.float64 for name in FLOAT_FIELDS}, **{name: np.bool_ for name in FLAG_FIELDS}}
+
+
+def _flags(values, true_label):
+    # Libellés ("call"/"put", "american"/"european", colonnes pandas object comprises) ou booléens
+    values = np.asarray(values)
+    if values.dtype.kind in "USO":
+        return np.char.lower(values.astype(str)) == true_label
+    return values.astype(bool)
+
+
+class _Column:
+    # Colonne d'un ContractBook : vue sur le tampon, sans copie
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, book, owner=None):
+        return self if book is None else book.columns[self.name]
+
+
+class _Field:
+    # Champ d'une ContractView : lu à la demande dans la colonne du book
+    __slots__ = ("name", "cast")
+
+    def __init__(self, name, cast=float):
+        self.name = name
+        self.cast = cast
+
+    def __get__(self, view, owner=None):
+        return self if view is None else self.cast(view.book.columns[self.name][view.index])
+
+
+class ContractBook:
+    # Book de contrats en colonnes : S, K, T, r, sigma, quantité, type (is_call) et style (american).
+    # 50 octets par contrat, contre plusieurs centaines pour un objet moteur et son __dict__.
+    S, K, T, r, sigma, quantity, is_call, american = (_Column(name) for name in FLOAT_FIELDS + FLAG_FIELDS)
+
+    def __init__(self, S, K, T, r, sigma, option_type="call", american=False, quantity=1.0):
+        floats = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=np.float64)) for x in (S, K, T, r, sigma, quantity)))
+        n = floats[0].size
+        self.columns = {name: np.ascontiguousarray(values.ravel()) for name, values in zip(FLOAT_FIELDS, floats)}
+        self.columns["is_call"] = np.ascontiguousarray(np.broadcast_to(_flags(option_type, "call"), n))
+        self.columns["american"] = np.ascontiguousarray(np.broadcast_to(_flags(american, "american"), n))
+
+    @classmethod
+    def from_columns(cls, columns):
+        # Adopte des colonnes existantes (tableaux ou np.memmap) sans copie
+        missing = set(DTYPES) - set(columns)
+        if missing:
+            raise ValueError(f"missing contract fields {sorted(missing)}")
+        sizes = {len(columns[name]) for name in DTYPES}
+        if len(sizes) != 1:
+            raise ValueError(f"contract fields have different lengths {sorted(sizes)}")
+        book = cls.__new__(cls)
+        book.columns = {name: columns[name] for name in DTYPES}
+        return book
+
+    @classmethod
+    def from_frame(cls, frame):
+        # Mêmes colonnes que batch_pricer ; exercise et quantity sont optionnelles
+        exercise = frame["exercise"].to_numpy() if "exercise" in frame else False
+        quantity = frame["quantity"].to_numpy(dtype=np.float64) if "quantity" in frame else 1.0
+        return cls(*(frame[c].to_numpy(dtype=np.float64) for c in ("S", "K", "T", "r", "sigma")),
+                   option_type=frame["option_type"].to_numpy(), american=exercise, quantity=quantity)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        # Un répertoire, un <champ>.npy par colonne ; mmap_mode="r" : les colonnes restent sur disque
+        # et ne sont lues qu'à l'accès
+        return cls.from_columns({name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+                                 for name in DTYPES})
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name, values in self.columns.items():
+            np.save(os.path.join(path, f"{name}.npy"), np.asarray(values, dtype=DTYPES[name]))
+        return path
+
+    def to_frame(self):
+        frame = pd.DataFrame({name: np.asarray(self.columns[name]) for name in FLOAT_FIELDS[:5]})
+        frame["option_type"] = self.option_type
+        frame["exercise"] = np.where(self.american, "american", "european")
+        frame["quantity"] = np.asarray(self.quantity)
+        return frame
+
+    @property
+    def option_type(self):
+        return np.where(self.is_call, "call", "put")
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.columns.values())
+
+    def arrays(self):
+        # Arguments des fonctions batch des moteurs : black_scholes_batch(**book.arrays())
+        return {name: self.columns[name] for name in ("S", "K", "T", "r", "sigma", "is_call")}
+
+    def __len__(self):
+        return len(self.columns["S"])
+
+    def __getitem__(self, index):
+        # Entier : vue légère sur un contrat ; tranche, masque ou indices : nouveau book (copie)
+        if isinstance(index, (int, np.integer)):
+            n = len(self)
+            if not -n <= index < n:
+                raise IndexError(f"contract index {index} out of range for {n} contracts")
+            return ContractView(self, int(index) % n)
+        columns = {name: self.columns[name][index] for name in FLOAT_FIELDS + FLAG_FIELDS}
+        return ContractBook(*(columns[c] for c in ("S", "K", "T", "r", "sigma")), option_type=columns["is_call"],
+                            american=columns["american"], quantity=columns["quantity"])
+
+    def __iter__(self):
+        return (ContractView(self, i) for i in range(len(self)))
+
+    def __repr__(self):
+        return f"ContractBook({len(self)} contracts, {self.nbytes} bytes)"
+
+    def price(self, engine="black_scholes", steps=200, paths=10000, seed=None):
+        return price_contracts(self, engine, steps=steps, paths=paths, seed=seed)
+
+
+class ContractView:
+    # Un contrat du book, sans __dict__ : mêmes attributs que les moteurs (S, K, T, r, sigma,
+    # option_type, american) pour les codes qui attendent un objet par contrat
+    __slots__ = ("book", "index")
+    S, K, T, r, sigma, quantity = (_Field(name) for name in FLOAT_FIELDS)
+    american = _Field("american", bool)
+
+    def __init__(self, book, index):
+        self.book = book
+        self.index = index
+
+    @property
+    def option_type(self):
+        return "call" if self.book.columns["is_call"][self.index] else "put"
+
+    def model(self, engine="black_scholes", **options):
+        # Objet moteur équivalent ; Black-Scholes ne gère pas l'exercice anticipé : l'arbre prend le relais
+        engine = "binomial" if engine == "black_scholes" and self.american else engine
+        contract = dict(S=self.S, K=self.K, T=self.T, r=self.r, sigma=self.sigma, option_type=self.option_type)
+        if engine == "black_scholes":
+            return BlackScholes(**contract)
+        if engine == "binomial":
+            return BinomialTree(**contract, american=self.american, **options)
+        if engine == "finite_difference":
+            return FiniteDifference(**contract, american=self.american, **options)
+        if engine == "monte_carlo":
+            return MonteCarlo(**contract, american=self.american, **options)
+        raise ValueError(f"engine must be one of {ENGINES}")
+
+    def price(self, engine="black_scholes", **options):
+        return self.model(engine, **options).price()
+
+    def __repr__(self):
+        return (f"ContractView(S={self.S}, K={self.K}, T={self.T}, r={self.r}, sigma={self.sigma}, "
+                f"option_type={self.option_type!r}, american={self.american})")
+
+
+def price_contracts(book, engine="black_scholes", steps=200, paths=10000, seed=None):
+    # Prix et Greeks de tout le book, un appel vectorisé par moteur et par style d'exercice.
+    # engine : un nom pour tout le book ou un tableau de noms par contrat.
+    engine = np.broadcast_to(np.asarray(engine), len(book))
+    unknown = set(np.unique(engine)) - set(ENGINES)
+    if unknown:
+        raise ValueError(f"engine must be one of {ENGINES}, got {sorted(unknown)}")
+    S, K, T, r, sigma, is_call = book.arrays().values()
+    american = np.asarray(book.american)
+    results = {g: np.full(len(book), np.nan) for g in GREEKS}
+
+    def assign(mask, values):
+        for g in GREEKS:
+            results[g][mask] = values[g]
+
+    # Black-Scholes ne gère pas l'exercice anticipé : ces lignes passent par l'arbre
+    bs = (engine == "black_scholes") & ~american
+    if bs.any():
+        assign(bs, black_scholes_batch(S[bs], K[bs], T[bs], r[bs], sigma[bs], is_call[bs]))
+    for style in (False, True):
+        tree = ((engine == "binomial") | ((engine == "black_scholes") & american)) & (american == style)
+        if tree.any():
+            assign(tree, binomial_batch(S[tree], K[tree], T[tree], r[tree], sigma[tree], is_call[tree], N=steps, american=style))
+    mc = (engine == "monte_carlo") & ~american
+    if mc.any():
+        assign(mc, monte_carlo_batch(S[mc], K[mc], T[mc], r[mc], sigma[mc], is_call[mc], simulations=paths, seed=seed))
+    # Pas de version batch : un modèle par contrat, construit depuis la vue
+    for i in np.flatnonzero(((engine == "monte_carlo") & american) | (engine == "finite_difference")):
+        options = dict(simulations=paths, seed=seed) if engine[i] == "monte_carlo" else {}
+        greeks = book[int(i)].model(engine[i], **options).greeks()
+        for g in GREEKS:
+            results[g][i] = greeks[g]
+    return results
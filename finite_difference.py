@@ -0,0 +1,259 @@
+import math
+import time
+import numpy as np
+from scipy.linalg.lapack import dtbtrs
+
+import instrumentation
+
+
+def spot_grid(S_min, S_max, T, sigma, space_steps, width=5.0, center=None):
+    # Grille uniforme en log-spot couvrant [S_min, S_max] plus `width` écarts-types de part et d'autre.
+    # Avec center, le spot tombe exactement sur le noeud du milieu (space_steps pair).
+    spread = width * sigma * math.sqrt(T)
+    if center is None:
+        return np.linspace(math.log(S_min) - spread, math.log(S_max) + spread, space_steps + 1)
+    half = max(math.log(center / S_min), math.log(S_max / center)) + spread
+    return math.log(center) + np.linspace(-half, half, space_steps + 1)
+
+
+def _factor(a, b, c, n):
+    # Élimination de Thomas du haut vers le bas : m_i V_i + a V_{i-1} = e_i. La matrice étant constante
+    # dans le temps, les pivots et les deux matrices bidiagonales sont calculés une fois par pas de temps.
+    m = np.empty(n)
+    m[-1] = b
+    for i in range(n - 2, -1, -1):
+        m[i] = b - c * a / m[i + 1]
+    upper = np.ones((2, n))
+    upper[0, 1:] = c / m[1:]
+    lower = np.empty((2, n))
+    lower[0] = m
+    lower[1, :-1] = a
+    return m, upper, lower
+
+
+def _thomas(a, factors, rhs, low, payoff=None):
+    # Résolution tridiagonale en deux balayages bidiagonaux (LAPACK dtbtrs). Avec payoff, la remontée
+    # applique Brennan-Schwartz : la région d'exercice est en bas de l'ordre des noeuds, on y garde le
+    # payoff tant que la valeur de continuation ne le dépasse pas, puis le reste est linéaire.
+    m, upper, lower = factors
+    e = dtbtrs(upper, rhs[:, None], uplo="U", diag="U")[0][:, 0]
+    if payoff is None:
+        e[0] -= a * low
+        return dtbtrs(lower, e[:, None], uplo="L")[0][:, 0]
+    previous = np.concatenate(([low], payoff[:-1]))
+    continuation = (e - a * previous) / m
+    exercised = continuation <= payoff
+    if exercised.all():
+        return payoff.copy()
+    boundary = int(np.argmin(exercised))
+    values = payoff.copy()
+    tail = e[boundary:]
+    tail[0] -= a * previous[boundary]
+    values[boundary:] = np.maximum(dtbtrs(lower[:, boundary:], tail[:, None], uplo="L")[0][:, 0], payoff[boundary:])
+    return values
+
+
+@instrumentation.timed("finite_difference.solve")
+def crank_nicolson(x, K, T, r, sigma, is_call, american=False, time_steps=200, rannacher_steps=2):
+    # Équation de Black-Scholes en x = ln S et en temps restant tau, schéma de Crank-Nicolson.
+    # Les rannacher_steps premiers pas sont remplacés par deux demi-pas implicites chacun, qui
+    # amortissent les oscillations dues au payoff non dérivable au strike.
+    # Renvoie les valeurs aux noeuds à t=0 et à t=dt (pour theta).
+    instrumentation.count("finite_difference.solves")
+    if is_call:
+        # Exercice anticipé d'un call en haut de la grille : on inverse l'ordre des noeuds pour que
+        # Brennan-Schwartz parte toujours de la région d'exercice
+        V0, V1 = _solve(x[::-1], K, T, r, sigma, american, time_steps, rannacher_steps, 1.0)
+        return V0[::-1], V1[::-1]
+    return _solve(x, K, T, r, sigma, american, time_steps, rannacher_steps, -1.0)
+
+
+def _solve(x, K, T, r, sigma, american, time_steps, rannacher_steps, sign):
+    S = np.exp(x)
+    dx = x[1] - x[0]
+    alpha = 0.5 * sigma ** 2
+    beta = r - alpha
+    # Opérateur L V_i = l V_{i-1} + c V_i + u V_{i+1} (différences centrées, dx signé)
+    l = alpha / dx ** 2 - beta / (2 * dx)
+    center = -2 * alpha / dx ** 2 - r
+    u = alpha / dx ** 2 + beta / (2 * dx)
+
+    payoff = np.maximum(sign * (S - K), 0.0)
+    exercise = payoff[1:-1] if american else None
+
+    def boundary(tau):
+        # Dirichlet aux deux bords : valeur intrinsèque forward (nulle côté hors de la monnaie)
+        edges = np.maximum(sign * (S[[0, -1]] - K * math.exp(-r * tau)), 0.0)
+        return np.maximum(edges, payoff[[0, -1]]) if american else edges
+
+    dt = T / time_steps
+    schedule = [(1.0, 0.5 * dt)] * (2 * min(rannacher_steps, time_steps)) + \
+               [(0.5, dt)] * (time_steps - min(rannacher_steps, time_steps))
+    factors = {}
+    values = payoff.copy()
+    previous = values
+    tau = 0.0
+    for theta, step in schedule:
+        key = (theta, step)
+        if key not in factors:
+            a, b, c = -theta * step * l, 1 - theta * step * center, -theta * step * u
+            factors[key] = (a, c, _factor(a, b, c, len(x) - 2))
+        a, c, factor = factors[key]
+        explicit = (1 - theta) * step
+        rhs = values[1:-1] + explicit * (l * values[:-2] + center * values[1:-1] + u * values[2:])
+        tau += step
+        low, high = boundary(tau)
+        rhs[-1] -= c * high
+        previous = values
+        values = np.empty_like(values)
+        values[0], values[-1] = low, high
+        values[1:-1] = _thomas(a, factor, rhs, low, exercise)
+    return values, previous
+
+
+def grid_greeks(x, V0, V1, dt):
+    # Greeks lus sur la grille, à chaque noeud intérieur : dérivées en log-spot puis changement de variable
+    S = np.exp(x[1:-1])
+    dx = x[1] - x[0]
+    V_x = (V0[2:] - V0[:-2]) / (2 * dx)
+    V_xx = (V0[2:] - 2 * V0[1:-1] + V0[:-2]) / dx ** 2
+    return {
+        "price": V0[1:-1],
+        "delta": V_x / S,
+        "gamma": (V_xx - V_x) / S ** 2,
+        "theta": (V1[1:-1] - V0[1:-1]) / dt / 365,
+    }
+
+
+class FiniteDifference:
+    def __init__(self, S, K, T, r, sigma, option_type="call", american=False, space_steps=400, time_steps=200,
+                 rannacher_steps=2):
+        self.S = S
+        self.K = K
+        self.T = T
+        self.r = r
+        self.sigma = sigma
+        self.option_type = option_type.lower()
+        if self.option_type not in ("call", "put"):
+            raise ValueError("option_type must be 'call' or 'put'")
+        self.american = american
+        # Nombre pair de pas d'espace : le spot est le noeud du milieu
+        self.space_steps = space_steps + space_steps % 2
+        self.time_steps = time_steps
+        self.rannacher_steps = rannacher_steps
+        self._greeks = None
+
+    def _solve(self, x, T=None, sigma=None, r=None):
+        T = self.T if T is None else T
+        return crank_nicolson(x, self.K, T, self.r if r is None else r, self.sigma if sigma is None else sigma,
+                              self.option_type == "call", self.american, self.time_steps, self.rannacher_steps)
+
+    def _grid(self, S_min, S_max, T=None, sigma=None, center=None):
+        T = self.T if T is None else T
+        return spot_grid(min(S_min, self.K), max(S_max, self.K), T, self.sigma if sigma is None else sigma,
+                         self.space_steps, center=center)
+
+    def _curve(self, x, T=None, sigma=None):
+        # Prix et Greeks à tous les noeuds intérieurs ; vega et rho par quatre résolutions bumpées sur la même grille
+        T = self.T if T is None else T
+        sigma = self.sigma if sigma is None else sigma
+        epsilon = 0.01
+        V0, V1 = self._solve(x, T, sigma)
+        results = grid_greeks(x, V0, V1, T / self.time_steps)
+        v_up, v_down, r_up, r_down = (self._solve(x, T, s, rate)[0][1:-1] for s, rate in
+                                      ((sigma + epsilon, None), (sigma - epsilon, None),
+                                       (sigma, self.r + epsilon), (sigma, self.r - epsilon)))
+        results["vega"] = (v_up - v_down) / (2 * epsilon) / 100
+        results["rho"] = (r_up - r_down) / (2 * epsilon) / 100
+        return results
+
+    def greeks(self):
+        if self._greeks is None:
+            x = self._grid(self.S, self.S, center=self.S)
+            curve = self._curve(x)
+            node = self.space_steps // 2 - 1
+            self._greeks = {name: float(values[node]) for name, values in curve.items()}
+        return dict(self._greeks)
+
+    def price_curve(self, S_min=None, S_max=None):
+        # Courbe prix-spot complète (et Greeks) issue d'une seule résolution
+        S_min = 0.5 * self.S if S_min is None else S_min
+        S_max = 1.5 * self.S if S_max is None else S_max
+        x = self._grid(S_min, S_max)
+        V0, V1 = self._solve(x)
+        return np.exp(x[1:-1]), grid_greeks(x, V0, V1, self.T / self.time_steps)
+
+    @classmethod
+    def evaluate_book(cls, book):
+        # Book en colonnes (contracts.ContractBook) : une résolution par contrat
+        from contracts import price_contracts
+        return price_contracts(book, "finite_difference")
+
+    def evaluate_grid(self, S=None, sigma=None, T=None):
+        # Une résolution (et ses quatre bumps) par couple (maturité, vol) ; les spots sont interpolés
+        # sur les noeuds de la grille
+        S, sigma, T = np.broadcast_arrays(*(np.asarray(default if x is None else x, dtype=np.float64)
+                                            for x, default in ((S, self.S), (sigma, self.sigma), (T, self.T))))
+        results = {name: np.empty(S.shape) for name in ("price", "delta", "gamma", "vega", "theta", "rho")}
+        for T_value in np.unique(T):
+            for sigma_value in np.unique(sigma[T == T_value]):
+                mask = (T == T_value) & (sigma == sigma_value)
+                x = self._grid(S[mask].min(), S[mask].max(), T_value, sigma_value + 0.01)
+                curve = self._curve(x, T_value, sigma_value)
+                log_S = np.log(S[mask])
+                for name, values in curve.items():
+                    results[name][mask] = np.interp(log_S, x[1:-1], values)
+        if self.american:
+            # Interpolation linéaire en log(S) : sous le payoff entre deux noeuds de la zone d'exercice
+            sign = 1.0 if self.option_type == "call" else -1.0
+            results["price"] = np.maximum(results["price"], np.maximum(sign * (S - self.K), 0.0))
+        return results
+
+    def price(self):
+        if self._greeks is not None:
+            return self._greeks["price"]
+        x = self._grid(self.S, self.S, center=self.S)
+        return float(self._solve(x)[0][self.space_steps // 2])
+
+    def delta(self):
+        return self.greeks()["delta"]
+
+    def gamma(self):
+        return self.greeks()["gamma"]
+
+    def vega(self):
+        return self.greeks()["vega"]
+
+    def theta(self):
+        return self.greeks()["theta"]
+
+    def rho(self):
+        return self.greeks()["rho"]
+
+
+def benchmark(S, K, T, r, sigma, option_type="put", american=True, grids=((100, 50), (200, 100), (400, 200), (800, 400)),
+              steps=(100, 200, 400, 800, 1600)):
+    # Erreur et temps des différences finies face à l'arbre binomial (CRR et BBS extrapolé),
+    # par rapport à la même référence
+    from binomial_tree import convergence_table
+    reference, rows = convergence_table(S, K, T, r, sigma, option_type=option_type, american=american, steps=steps,
+                                        modes=(("crr", False), ("bbs", True)))
+    table = [{"engine": f"binomial {row['method']}{' + richardson' if row['richardson'] else ''}",
+              "grid": f"N={row['N']}", "price": row["price"], "error": row["error"], "seconds": row["seconds"]}
+             for row in rows]
+    for space_steps, time_steps in grids:
+        start = time.perf_counter()
+        price = FiniteDifference(S, K, T, r, sigma, option_type=option_type, american=american,
+                                 space_steps=space_steps, time_steps=time_steps).price()
+        elapsed = time.perf_counter() - start
+        table.append({"engine": "crank-nicolson", "grid": f"{space_steps}x{time_steps}", "price": price,
+                      "error": price - reference, "seconds": elapsed})
+    return reference, table
+
+
+if __name__ == "__main__":
+    reference, table = benchmark(100, 100, 1.0, 0.05, 0.2)
+    print(f"Put américain S=K=100, T=1, r=5%, vol=20% : référence {reference:.6f}")
+    print(f"{'moteur':<26}{'grille':>12}{'prix':>12}{'erreur':>12}{'temps (ms)':>12}")
+    for row in table:
+        print(f"{row['engine']:<26}{row['grid']:>12}{row['price']:>12.6f}{row['error']:>12.2e}{row['seconds'] * 1000:>12.2f}")
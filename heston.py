@@ -0,0 +1,327 @@
+import argparse
+import datetime
+import math
+import time
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares
+
+from black_scholes import black_scholes_batch
+from implied_volatility import implied_volatility
+import instrumentation
+
+PARAMETERS = ("v0", "kappa", "theta", "xi", "rho")
+LOWER_BOUNDS = (1e-4, 1e-3, 1e-4, 1e-3, -0.999)
+UPPER_BOUNDS = (4.0, 20.0, 4.0, 5.0, 0.999)
+
+
+def characteristic_function(u, T, r, v0, kappa, theta, xi, rho):
+    # Fonction caractéristique de ln(S_T / S) sous la mesure risque-neutre, formulation "little trap"
+    # d'Albrecher et al. : pas de discontinuité du logarithme complexe, même pour T long
+    iu = 1j * u
+    beta = kappa - rho * xi * iu
+    d = np.sqrt(beta ** 2 + xi ** 2 * (iu + u ** 2))
+    g = (beta - d) / (beta + d)
+    decay = np.exp(-d * T)
+    C = iu * r * T + kappa * theta / xi ** 2 * ((beta - d) * T - 2 * np.log((1 - g * decay) / (1 - g)))
+    D = (beta - d) / xi ** 2 * (1 - decay) / (1 - g * decay)
+    return np.exp(C + D * v0)
+
+
+def cumulants(T, r, v0, kappa, theta, xi, rho):
+    # Deux premiers cumulants de ln(S_T / S) (Fang et Oosterlee, 2008) : centre et largeur de l'intervalle COS
+    decay = math.exp(-kappa * T)
+    c1 = r * T + (1 - decay) * (theta - v0) / (2 * kappa) - 0.5 * theta * T
+    c2 = (xi * T * kappa * decay * (v0 - theta) * (8 * kappa * rho - 4 * xi)
+          + kappa * rho * xi * (1 - decay) * (16 * theta - 8 * v0)
+          + 2 * theta * kappa * T * (-4 * kappa * rho * xi + xi ** 2 + 4 * kappa ** 2)
+          + xi ** 2 * ((theta - 2 * v0) * decay ** 2 + theta * (6 * decay - 7) + 2 * v0)
+          + 8 * kappa ** 2 * (v0 - theta) * (1 - decay)) / (8 * kappa ** 3)
+    return c1, abs(c2)
+
+
+def cos_prices(S, strikes, T, r, v0, kappa, theta, xi, rho, is_call=True, terms=256, truncation=12.0):
+    # Méthode COS pour une maturité : une seule évaluation de la fonction caractéristique (terms points)
+    # sert tous les strikes. On valorise le put (coefficients bornés, stable en queue) puis le call par parité.
+    strikes = np.atleast_1d(np.asarray(strikes, dtype=np.float64))
+    x = np.log(S / strikes)
+    c1, c2 = cumulants(T, r, v0, kappa, theta, xi, rho)
+    width = truncation * math.sqrt(c2)
+    # Intervalle commun en y = ln(S_T / K) pour tous les strikes
+    a = min(x.min() + c1 - width, -1e-8)
+    b = max(x.max() + c1 + width, 1e-8)
+    k = np.arange(terms)
+    w = k * math.pi / (b - a)
+    phi = characteristic_function(w, T, r, v0, kappa, theta, xi, rho)
+
+    # Coefficients du payoff put K (1 - e^y)^+ sur [a, 0]
+    chi = (np.cos(w * a) - np.exp(a) - w * np.sin(w * a)) / (1 + w ** 2)
+    psi = np.empty(terms)
+    psi[0] = -a
+    psi[1:] = -np.sin(w[1:] * a) / w[1:]
+    weights = phi * 2 / (b - a) * (psi - chi)
+    weights[0] *= 0.5
+
+    discount = math.exp(-r * T)
+    put = np.maximum(strikes * discount * np.real(np.exp(1j * np.outer(x - a, w)) @ weights), 0.0)
+    instrumentation.count("heston.strikes", len(strikes))
+    return np.where(is_call, put + S - strikes * discount, put)
+
+
+@instrumentation.timed("heston.chain")
+def heston_prices(S, K, T, r, v0, kappa, theta, xi, rho, is_call=True, terms=256):
+    # Chaîne complète : une transformée par maturité distincte, tous les strikes de cette maturité à la fois
+    K, T, is_call = np.broadcast_arrays(np.asarray(K, dtype=np.float64), np.asarray(T, dtype=np.float64),
+                                        np.asarray(is_call, dtype=bool))
+    prices = np.empty(K.shape)
+    maturities, groups = np.unique(T, return_inverse=True)
+    groups = groups.reshape(K.shape)
+    for i, maturity in enumerate(maturities):
+        rows = groups == i
+        prices[rows] = cos_prices(S, K[rows], maturity, r, v0, kappa, theta, xi, rho, is_call[rows], terms)
+    return prices
+
+
+class QEScheme:
+    # Schéma Quadratic-Exponential d'Andersen (2008) : variance tirée selon un carré de gaussienne décalée
+    # (psi <= 1.5) ou une loi mixte masse en 0 / exponentielle (psi > 1.5), qui reste positive sans troncature.
+    # Log-spot par discrétisation centrale (gamma1 = gamma2 = 1/2) conditionnellement aux deux variances.
+    PSI_CRITICAL = 1.5
+
+    def __init__(self, dt, r, kappa, theta, xi, rho):
+        self.theta = theta
+        self.decay = math.exp(-kappa * dt)
+        self.s2_variance = xi ** 2 * self.decay * (1 - self.decay) / kappa
+        self.s2_constant = theta * xi ** 2 * (1 - self.decay) ** 2 / (2 * kappa)
+        self.K0 = r * dt - rho * kappa * theta * dt / xi
+        self.K1 = 0.5 * dt * (kappa * rho / xi - 0.5) - rho / xi
+        self.K2 = 0.5 * dt * (kappa * rho / xi - 0.5) + rho / xi
+        self.K3 = 0.5 * dt * (1 - rho ** 2)
+
+    def step(self, V, Z_variance, U, Z_spot):
+        # Renvoie la variance au pas suivant et l'incrément de ln S
+        m = self.theta + (V - self.theta) * self.decay
+        psi = (V * self.s2_variance + self.s2_constant) / m ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inverse = 2 / psi
+            b2 = np.maximum(inverse - 1 + np.sqrt(inverse) * np.sqrt(np.maximum(inverse - 1, 0)), 0)
+            quadratic = m / (1 + b2) * (np.sqrt(b2) + Z_variance) ** 2
+            p = (psi - 1) / (psi + 1)
+            exponential = np.where(U <= p, 0.0, np.log((1 - p) / (1 - U)) * m / (1 - p))
+        V_next = np.where(psi <= self.PSI_CRITICAL, quadratic, exponential)
+        increment = (self.K0 + self.K1 * V + self.K2 * V_next
+                     + np.sqrt(np.maximum(self.K3 * (V + V_next), 0)) * Z_spot)
+        return V_next, increment
+
+
+def heston_monte_carlo(S, strikes, T, r, v0, kappa, theta, xi, rho, option_type="call", steps=100,
+                       simulations=100000, seed=None):
+    # Validation du pricer de Fourier : tous les strikes sur les mêmes trajectoires QE
+    rng = np.random.default_rng(seed)
+    instrumentation.count("heston.paths", simulations)
+    scheme = QEScheme(T / steps, r, kappa, theta, xi, rho)
+    V = np.full(simulations, float(v0))
+    log_S = np.full(simulations, math.log(S))
+    for _ in range(steps):
+        V, increment = scheme.step(V, rng.standard_normal(simulations), rng.random(simulations),
+                                   rng.standard_normal(simulations))
+        log_S += increment
+    strikes = np.atleast_1d(np.asarray(strikes, dtype=np.float64))[:, None]
+    sign = 1.0 if option_type == "call" else -1.0
+    discounted = math.exp(-r * T) * np.maximum(sign * (np.exp(log_S) - strikes), 0)
+    return {"price": discounted.mean(axis=1),
+            "standard_error": discounted.std(axis=1, ddof=1) / math.sqrt(simulations)}
+
+
+class Heston:
+    def __init__(self, S, K, T, r, v0, kappa, theta, xi, rho, option_type="call", terms=256):
+        self.S = S
+        self.K = K
+        self.T = T
+        self.r = r
+        self.v0 = v0
+        self.kappa = kappa
+        self.theta = theta
+        self.xi = xi
+        self.rho = rho
+        self.option_type = option_type.lower()
+        if self.option_type not in ("call", "put"):
+            raise ValueError("option_type must be 'call' or 'put'")
+        self.terms = terms
+        self._greeks = None
+
+    @property
+    def parameters(self):
+        return {name: getattr(self, name) for name in PARAMETERS}
+
+    def _price_at(self, S=None, T=None, r=None, v0=None, strikes=None):
+        params = dict(self.parameters, v0=self.v0 if v0 is None else v0)
+        return cos_prices(self.S if S is None else S, self.K if strikes is None else strikes,
+                          self.T if T is None else T, self.r if r is None else r, **params,
+                          is_call=self.option_type == "call", terms=self.terms)
+
+    def price(self):
+        return float(self._price_at()[0])
+
+    def price_strikes(self, strikes):
+        # Toute une grille de strikes en une transformée
+        return self._price_at(strikes=strikes)
+
+    def implied_volatility(self, strikes=None):
+        # Smile implicite Black-Scholes du modèle
+        strikes = np.atleast_1d(self.K if strikes is None else strikes)
+        return implied_volatility(self._price_at(strikes=strikes), self.S, strikes, self.T, self.r,
+                                  is_call=self.option_type == "call")
+
+    def greeks(self):
+        # Différences finies sur le pricer COS (déterministe, donc sans bruit) ; vega par 1 % de la
+        # volatilité instantanée sqrt(v0), theta par jour, rho par 1 % de taux
+        if self._greeks is None:
+            bump = 0.01 * self.S
+            price = self.price()
+            up, down = float(self._price_at(S=self.S + bump)[0]), float(self._price_at(S=self.S - bump)[0])
+            vol = math.sqrt(self.v0)
+            vol_bump = min(0.01, 0.5 * vol)
+            vega = (self._price_at(v0=(vol + vol_bump) ** 2)[0] - self._price_at(v0=(vol - vol_bump) ** 2)[0]) / (2 * vol_bump)
+            T_minus = max(self.T - 1 / 365, 1 / 365)
+            theta = (self._price_at(T=T_minus)[0] - price) / (self.T - T_minus) if self.T > T_minus else 0.0
+            rho = (self._price_at(r=self.r + 0.01)[0] - self._price_at(r=self.r - 0.01)[0]) / 0.02
+            self._greeks = {"price": price, "delta": (up - down) / (2 * bump),
+                            "gamma": (up - 2 * price + down) / bump ** 2, "vega": float(vega) / 100,
+                            "theta": float(theta) / 365, "rho": float(rho) / 100}
+        return dict(self._greeks)
+
+    def delta(self):
+        return self.greeks()["delta"]
+
+    def gamma(self):
+        return self.greeks()["gamma"]
+
+    def vega(self):
+        return self.greeks()["vega"]
+
+    def theta(self):
+        return self.greeks()["theta"]
+
+    def rho(self):
+        return self.greeks()["rho"]
+
+
+def chain_quotes(chain, S, r, today=None, moneyness=(0.7, 1.3), min_price=0.01):
+    # Instantané de chaîne (colonnes market_data.CHAIN_COLUMNS) -> cotations exploitables : mid (ou
+    # dernier prix), options hors de la monnaie seulement (les plus liquides, et un seul point par strike),
+    # volatilité implicite et vega Black-Scholes pour pondérer les écarts de prix en écarts de vol
+    today = today or datetime.date.today()
+    quotes = chain.copy()
+    expiry = pd.to_datetime(quotes["expiry"]).dt.date
+    quotes["T"] = [max((e - today).days / 365, 1 / 365) for e in expiry]
+    mid = (quotes["bid"] + quotes["ask"]) / 2
+    quotes["market_price"] = mid.where(mid > 0, quotes["lastPrice"])
+    is_call = quotes["option_type"].eq("call")
+    otm = np.where(is_call, quotes["strike"] >= S, quotes["strike"] < S)
+    ratio = quotes["strike"] / S
+    keep = otm & ratio.between(*moneyness) & (quotes["market_price"] > min_price)
+    quotes = quotes[keep].reset_index(drop=True)
+    is_call = quotes["option_type"].eq("call").to_numpy()
+    K, T, price = (quotes[c].to_numpy(dtype=np.float64) for c in ("strike", "T", "market_price"))
+    quotes["market_iv"] = implied_volatility(price, S, K, T, r, is_call=is_call)
+    quotes = quotes[np.isfinite(quotes["market_iv"])].reset_index(drop=True)
+    quotes["vega"] = black_scholes_batch(S, quotes["strike"].to_numpy(), quotes["T"].to_numpy(), r,
+                                         quotes["market_iv"].to_numpy(), quotes["option_type"].eq("call").to_numpy())["vega"] * 100
+    return quotes
+
+
+def calibrate(chain, S, r, today=None, initial=None, terms=128, max_nfev=200, quotes=None):
+    # Moindres carrés bornés sur toute la chaîne : chaque évaluation des résidus valorise toutes les
+    # cotations (une transformée COS par maturité). Résidus = écart de prix / vega, soit l'écart de
+    # volatilité implicite au premier ordre, sans inversion Black-Scholes dans la boucle.
+    quotes = chain_quotes(chain, S, r, today) if quotes is None else quotes
+    if len(quotes) < len(PARAMETERS):
+        raise ValueError(f"need at least {len(PARAMETERS)} usable quotes, got {len(quotes)}")
+    K, T, price, vega = (quotes[c].to_numpy(dtype=np.float64) for c in ("strike", "T", "market_price", "vega"))
+    is_call = quotes["option_type"].eq("call").to_numpy()
+    weight = 1 / np.maximum(vega, 1e-3 * S)
+
+    if initial is None:
+        atm = quotes.loc[(quotes["strike"] / S - 1).abs().idxmin(), "market_iv"]
+        initial = {"v0": atm ** 2, "kappa": 2.0, "theta": atm ** 2, "xi": 0.5, "rho": -0.5}
+    start = np.clip([initial[name] for name in PARAMETERS], LOWER_BOUNDS, UPPER_BOUNDS)
+
+    def residuals(x):
+        return (heston_prices(S, K, T, r, *x, is_call=is_call, terms=terms) - price) * weight
+
+    started = time.perf_counter()
+    fit = least_squares(residuals, start, bounds=(LOWER_BOUNDS, UPPER_BOUNDS), x_scale="jac", max_nfev=max_nfev)
+    elapsed = time.perf_counter() - started
+    params = dict(zip(PARAMETERS, map(float, fit.x)))
+    quotes = quotes.copy()
+    quotes["model_price"] = heston_prices(S, K, T, r, **params, is_call=is_call, terms=terms)
+    quotes["model_iv"] = implied_volatility(quotes["model_price"].to_numpy(), S, K, T, r, is_call=is_call)
+    error = quotes["model_iv"] - quotes["market_iv"]
+    return {
+        "params": params,
+        "rmse_iv": float(np.sqrt(np.nanmean(error ** 2))),
+        "feller": 2 * params["kappa"] * params["theta"] >= params["xi"] ** 2,
+        "evaluations": int(fit.nfev),
+        "elapsed": elapsed,
+        "success": bool(fit.success),
+        "quotes": quotes,
+    }
+
+
+def synthetic_chain(S, r, params, expiries, today, moneyness=np.linspace(0.75, 1.25, 21), spread=0.01, seed=None):
+    # Chaîne au format market_data générée par le modèle, avec un bruit de fourchette : sert de démonstration
+    # et de test de retour des paramètres de la calibration
+    rng = np.random.default_rng(seed)
+    frames = []
+    for expiry in expiries:
+        T = max((datetime.date.fromisoformat(expiry) - today).days / 365, 1 / 365)
+        strikes = np.round(S * moneyness, 2)
+        for option_type in ("call", "put"):
+            price = heston_prices(S, strikes, T, r, **params, is_call=option_type == "call")
+            noise = 1 + spread * rng.uniform(-0.5, 0.5, len(strikes))
+            frames.append(pd.DataFrame({"ticker": "SYNTH", "expiry": expiry, "option_type": option_type,
+                                        "strike": strikes, "bid": price * noise * (1 - spread),
+                                        "ask": price * noise * (1 + spread), "lastPrice": price,
+                                        "impliedVolatility": np.nan}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modèle de Heston : pricing COS, validation QE et calibration")
+    parser.add_argument("--spot", type=float, default=100.0)
+    parser.add_argument("--rate", type=float, default=0.03)
+    parser.add_argument("--paths", type=int, default=200000, help="Trajectoires QE pour la validation")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    S, r = args.spot, args.rate
+    true = {"v0": 0.04, "kappa": 1.5, "theta": 0.06, "xi": 0.6, "rho": -0.7}
+    strikes = S * np.linspace(0.7, 1.3, 13)
+
+    cos_prices(S, strikes, 1.0, r, **true)
+    start = time.perf_counter()
+    prices = cos_prices(S, strikes, 1.0, r, **true)
+    cos_time = time.perf_counter() - start
+    mc = heston_monte_carlo(S, strikes, 1.0, r, **true, steps=100, simulations=args.paths, seed=args.seed)
+    print(f"COS : {len(strikes)} strikes en {cos_time * 1e6:.0f} µs ; écart QE (en erreurs standard) : "
+          f"max {np.max(np.abs(prices - mc['price']) / mc['standard_error']):.2f}")
+
+    today = datetime.date.today()
+    expiries = [(today + datetime.timedelta(days=d)).isoformat() for d in (30, 60, 91, 182, 365, 730)]
+    chain = synthetic_chain(S, r, true, expiries, today, seed=args.seed)
+    quotes = chain_quotes(chain, S, r, today)
+    start = time.perf_counter()
+    heston_prices(S, quotes["strike"], quotes["T"], r, **true, is_call=quotes["option_type"].eq("call"), terms=128)
+    print(f"Chaîne : {len(quotes)} cotations, {len(expiries)} maturités, valorisées en "
+          f"{(time.perf_counter() - start) * 1000:.2f} ms")
+    result = calibrate(chain, S, r, today, quotes=quotes)
+    print(f"Calibration : {result['evaluations']} évaluations en {result['elapsed'] * 1000:.0f} ms, "
+          f"RMSE vol implicite {result['rmse_iv'] * 1e4:.1f} pb, condition de Feller "
+          f"{'respectée' if result['feller'] else 'violée'}")
+    for name in PARAMETERS:
+        print(f"  {name:<6} vrai {true[name]:+.4f}   calibré {result['params'][name]:+.4f}")
+
+
+if __name__ == "__main__":
+    main()
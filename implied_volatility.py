@@ -0,0 +1,104 @@
+import math
+import numpy as np
+
+from black_scholes import black_scholes_batch
+from binomial_tree import roll_back
+import instrumentation
+
+SIGMA_MIN = 1e-4
+SIGMA_MAX = 5.0
+
+
+def _initial_guess(price, S, K, T, r, is_call):
+    # Approximation rationnelle de Corrado-Miller, appliquée au call équivalent (parité)
+    disc_K = K * np.exp(-r * T)
+    call = np.where(is_call, price, price + S - disc_K)
+    half_gap = 0.5 * (S - disc_K)
+    radicand = np.maximum((call - half_gap) ** 2 - (S - disc_K) ** 2 / math.pi, 0)
+    guess = math.sqrt(2 * math.pi) / (np.sqrt(T) * (S + disc_K)) * (call - half_gap + np.sqrt(radicand))
+    guess = np.where(np.isfinite(guess) & (guess > SIGMA_MIN), guess, 0.2)
+    return np.clip(guess, SIGMA_MIN, SIGMA_MAX)
+
+
+def _bisection(price, S, K, T, r, is_call, iterations=100):
+    # Repli encadré vectorisé : le prix BS est croissant en sigma sur [SIGMA_MIN, SIGMA_MAX]
+    low = np.full(price.shape, SIGMA_MIN)
+    high = np.full(price.shape, SIGMA_MAX)
+    for _ in range(iterations):
+        mid = 0.5 * (low + high)
+        too_high = black_scholes_batch(S, K, T, r, mid, is_call)["price"] > price
+        high = np.where(too_high, mid, high)
+        low = np.where(too_high, low, mid)
+    return 0.5 * (low + high)
+
+
+@instrumentation.timed("implied_volatility")
+def implied_volatility(price, S, K, T, r, is_call=True, tol=1e-8, max_iter=50):
+    # Inversion vectorisée du prix Black-Scholes sur toute une chaîne : Newton avec vega analytique,
+    # puis bissection pour les points qui ne convergent pas. NaN hors des bornes de non-arbitrage.
+    price, S, K, T, r = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (price, S, K, T, r)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), price.shape)
+    shape = price.shape
+    price, S, K, T, r, is_call = (x.ravel() for x in (price, S, K, T, r, is_call))
+
+    disc_K = K * np.exp(-r * T)
+    lower = np.where(is_call, np.maximum(S - disc_K, 0), np.maximum(disc_K - S, 0))
+    upper = np.where(is_call, S, disc_K)
+    valid = (price > lower) & (price < upper) & (T > 0)
+
+    sigma = np.full(price.shape, np.nan)
+    idx = np.flatnonzero(valid)
+    guess = _initial_guess(price[idx], S[idx], K[idx], T[idx], r[idx], is_call[idx])
+    converged = np.zeros(len(idx), dtype=bool)
+    active = np.arange(len(idx))
+    for _ in range(max_iter):
+        if len(active) == 0:
+            break
+        i = idx[active]
+        results = black_scholes_batch(S[i], K[i], T[i], r[i], guess[active], is_call[i])
+        diff = results["price"] - price[i]
+        vega = results["vega"] * 100
+        step = np.where(vega > 1e-12, diff / np.where(vega > 1e-12, vega, 1.0), np.nan)
+        new_guess = guess[active] - step
+        ok = np.isfinite(new_guess) & (new_guess > SIGMA_MIN) & (new_guess < SIGMA_MAX)
+        guess[active] = np.where(ok, new_guess, guess[active])
+        done = ok & (np.abs(diff) < tol * np.maximum(price[i], 1.0))
+        converged[active[done]] = True
+        # Un pas hors de l'intervalle admissible est renvoyé au repli encadré
+        active = active[ok & ~done]
+
+    sigma[idx] = guess
+    failed = idx[~converged]
+    if len(failed):
+        sigma[failed] = _bisection(price[failed], S[failed], K[failed], T[failed], r[failed], is_call[failed])
+    return sigma.reshape(shape)
+
+
+@instrumentation.timed("american_implied_volatility")
+def american_implied_volatility(price, S, K, T, r, option_type="put", N=200, tol=1e-6):
+    # Cotations américaines : bissection vectorisée sur toute la chaîne, un roll_back de l'arbre CRR
+    # (prix seul) par itération pour tous les points. NaN hors des prix atteignables par l'arbre.
+    price, S, K, T, r = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (price, S, K, T, r)))
+    is_call = np.broadcast_to(np.char.lower(np.asarray(option_type, dtype=str)) == "call", price.shape)
+    shape = price.shape
+    price, S, K, T, r, is_call = (x.ravel() for x in (price, S, K, T, r, is_call))
+    sigma = np.full(price.shape, np.nan)
+    idx = np.flatnonzero(np.isfinite(price) & (T > 0))
+    if len(idx) == 0:
+        return sigma.reshape(shape)
+    S, K, dt, r, is_call, price = S[idx], K[idx], T[idx] / N, r[idx], is_call[idx], price[idx]
+
+    def tree(vol):
+        return roll_back(S, K, dt, r, vol, is_call, N, american=True)
+
+    # CRR : sous |r| sqrt(dt), la probabilité risque-neutre sort de [0, 1] et le prix de l'arbre n'a plus de sens
+    low = np.maximum(SIGMA_MIN, 1.001 * np.abs(r) * np.sqrt(dt))
+    high = np.full(len(idx), SIGMA_MAX)
+    bracketed = (tree(low) <= price) & (price <= tree(high))
+    for _ in range(math.ceil(math.log2((SIGMA_MAX - SIGMA_MIN) / tol))):
+        mid = 0.5 * (low + high)
+        too_high = tree(mid) > price
+        high = np.where(too_high, mid, high)
+        low = np.where(too_high, low, mid)
+    sigma[idx] = np.where(bracketed, 0.5 * (low + high), np.nan)
+    return sigma.reshape(shape)
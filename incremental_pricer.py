@@ -0,0 +1,215 @@
+import inspect
+import math
+import time
+import numpy as np
+
+import instrumentation
+
+GREEKS = ("price", "delta", "gamma", "vega", "theta", "rho")
+SECONDS_PER_YEAR = 365 * 24 * 3600
+ANCHORS = ("S", "sigma", "r", "T", "time")
+
+
+def full_valuation(model):
+    # Prix et Greeks via les méthodes existantes du moteur (greeks() quand il le fournit en un passage)
+    if hasattr(model, "greeks") and not inspect.signature(model.greeks).parameters:
+        greeks = model.greeks()
+        return {g: float(greeks[g]) for g in GREEKS}
+    return {g: float(getattr(model, g)()) for g in GREEKS}
+
+
+def rebuild(model, **changes):
+    # Même moteur, mêmes paramètres (pas, trajectoires, graine...), marché modifié
+    parameters = inspect.signature(type(model).__init__).parameters
+    kwargs = {name: getattr(model, name) for name in parameters if name != "self" and hasattr(model, name)}
+    kwargs.update(changes)
+    return type(model)(**kwargs)
+
+
+class IncrementalBook:
+    # Revalorisation incrémentale d'un book : chaque position garde sa dernière valorisation complète
+    # (prix et Greeks) ; un tick de marché est répercuté par un développement de Taylor d'ordre 2 en
+    # spot et d'ordre 1 en vol, taux et temps, vectorisé sur toutes les positions. Une position est
+    # revalorisée exactement quand l'erreur estimée dépasse error_bound (par contrat, en unités de prix)
+    # ou quand sa dernière valorisation complète a plus de max_age secondes.
+    def __init__(self, error_bound=0.01, max_age=60.0, clock=time.time):
+        self.error_bound = error_bound
+        self.max_age = max_age
+        self.clock = clock
+        self.keys = []
+        self.models = []
+        self.underlyings = []
+        self._names = {}
+        # Tampons à capacité doublée : ajout amorti en O(1), les attributs publics sont des vues sur les n premiers
+        self._size = 0
+        self._codes_buffer = np.empty(0, dtype=np.int64)
+        self._quantity = np.empty(0)
+        self._anchor = {name: np.empty(0) for name in ANCHORS}
+        self._greeks = np.empty((len(GREEKS), 0))
+        self.market = {}
+        self.full_repricings = 0
+        self.taylor_updates = 0
+
+    @property
+    def _codes(self):
+        return self._codes_buffer[:self._size]
+
+    @property
+    def quantity(self):
+        return self._quantity[:self._size]
+
+    @property
+    def anchor(self):
+        return {name: values[:self._size] for name, values in self._anchor.items()}
+
+    @property
+    def greeks(self):
+        return self._greeks[:, :self._size]
+
+    def _reserve(self, count):
+        needed = self._size + count
+        capacity = len(self._quantity)
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity, 16)
+        grow = lambda buffer: np.concatenate([buffer[..., :self._size],
+                                              np.empty(buffer.shape[:-1] + (capacity - self._size,), buffer.dtype)], axis=-1)
+        self._codes_buffer = grow(self._codes_buffer)
+        self._quantity = grow(self._quantity)
+        self._anchor = {name: grow(values) for name, values in self._anchor.items()}
+        self._greeks = grow(self._greeks)
+
+    def add(self, key, model, quantity=1.0, underlying=None):
+        return self.add_many([key], [model], [quantity], [underlying])[0]
+
+    def add_many(self, keys, models, quantities=None, underlyings=None):
+        # Ajout en bloc : une valorisation complète par modèle, une seule écriture dans les tampons
+        keys, models = list(keys), list(models)
+        quantities = [1.0] * len(models) if quantities is None else list(quantities)
+        underlyings = [None] * len(models) if underlyings is None else list(underlyings)
+        if not len(keys) == len(models) == len(quantities) == len(underlyings):
+            raise ValueError("keys, models, quantities and underlyings must have the same length")
+        valuations = [full_valuation(model) for model in models]
+        now = self.clock()
+        self._reserve(len(models))
+        rows = slice(self._size, self._size + len(models))
+        self._codes_buffer[rows] = [self._names.setdefault(u, len(self._names)) for u in underlyings]
+        self._quantity[rows] = quantities
+        for name in ("S", "sigma", "r", "T"):
+            self._anchor[name][rows] = [float(getattr(model, name)) for model in models]
+        self._anchor["time"][rows] = now
+        self._greeks[:, rows] = np.array([[values[g] for g in GREEKS] for values in valuations]).T
+        for model, underlying in zip(models, underlyings):
+            self.market.setdefault(underlying, {"S": float(model.S), "sigma": float(model.sigma), "r": float(model.r)})
+        self.keys += keys
+        self.models += models
+        self.underlyings += underlyings
+        self._size += len(models)
+        self.full_repricings += len(models)
+        return valuations
+
+    def _market_arrays(self, market):
+        for underlying, quote in market.items():
+            self.market.setdefault(underlying, {}).update({k: float(v) for k, v in quote.items()})
+        # Une boucle par sous-jacent, pas par position ; champ absent : la position garde son ancrage
+        arrays = {}
+        for name in ("S", "sigma", "r"):
+            quotes = np.array([self.market.get(u, {}).get(name, np.nan) for u in self._names])
+            values = quotes[self._codes]
+            arrays[name] = np.where(np.isnan(values), self.anchor[name], values)
+        return arrays
+
+    def revalue(self, market=None, now=None):
+        # market : {sous-jacent: {"S": ..., "sigma": ..., "r": ...}} (champs optionnels, None pour les
+        # positions sans sous-jacent). Renvoie les prix et Greeks par position, le P&L agrégé et le masque
+        # des positions revalorisées exactement.
+        now = self.clock() if now is None else now
+        current = self._market_arrays(market or {})
+        price, delta, gamma, vega, theta, rho = self.greeks
+        dS = current["S"] - self.anchor["S"]
+        dsigma = current["sigma"] - self.anchor["sigma"]
+        dr = current["r"] - self.anchor["r"]
+        elapsed = now - self.anchor["time"]
+        days = elapsed / (24 * 3600)
+
+        # Vega et rho pour 1 %, theta par jour : mêmes conventions que les moteurs
+        values = price + delta * dS + 0.5 * gamma * dS ** 2 + vega * dsigma * 100 + theta * days + rho * dr * 100
+
+        # Erreur estimée (heuristique) : terme d'ordre 3 en spot avec la courbure de gamma à l'échelle
+        # sigma * S * sqrt(T), convexité de la vol (vomma ~ vega / sigma) et du taux (~ rho * T)
+        T = np.maximum(self.anchor["T"] - elapsed / SECONDS_PER_YEAR, 1e-8)
+        spot_scale = self.anchor["sigma"] * self.anchor["S"] * np.sqrt(T)
+        error = (0.5 * np.abs(gamma) * dS ** 2 * np.abs(dS) / spot_scale
+                 + np.abs(vega) * 100 * dsigma ** 2 / self.anchor["sigma"]
+                 + np.abs(rho) * 100 * dr ** 2 * T)
+        exact = (error > self.error_bound) | (elapsed > self.max_age)
+
+        results = {"price": values, "delta": delta + gamma * dS, "gamma": gamma.copy(), "vega": vega.copy(),
+                   "theta": theta.copy(), "rho": rho.copy()}
+        for i in np.flatnonzero(exact):
+            self._reprice(i, current["S"][i], current["sigma"][i], current["r"][i], T[i], now)
+            for k, g in enumerate(GREEKS):
+                results[g][i] = self.greeks[k, i]
+        self.taylor_updates += int((~exact).sum())
+        instrumentation.count("incremental.taylor", int((~exact).sum()))
+        instrumentation.count("incremental.full", int(exact.sum()))
+
+        results["error_estimate"] = np.where(exact, 0.0, error)
+        results["exact"] = exact
+        results["value"] = float(self.quantity @ results["price"])
+        return results
+
+    def _reprice(self, i, S, sigma, r, T, now):
+        model = rebuild(self.models[i], S=S, sigma=sigma, r=r, T=T)
+        values = full_valuation(model)
+        self.models[i] = model
+        for name, value in zip(ANCHORS, (S, sigma, r, T, now)):
+            self._anchor[name][i] = value
+        self._greeks[:, i] = [values[g] for g in GREEKS]
+        self.full_repricings += 1
+
+    def reprice_all(self, now=None):
+        # Revalorisation complète de toutes les positions au marché courant (fin de journée, rebase)
+        now = self.clock() if now is None else now
+        current = self._market_arrays({})
+        elapsed = now - self.anchor["time"]
+        T = np.maximum(self.anchor["T"] - elapsed / SECONDS_PER_YEAR, 1e-8)
+        for i in range(len(self.models)):
+            self._reprice(i, current["S"][i], current["sigma"][i], current["r"][i], T[i], now)
+
+    def stats(self):
+        total = self.full_repricings + self.taylor_updates
+        return {"positions": len(self.models), "full_repricings": self.full_repricings,
+                "taylor_updates": self.taylor_updates,
+                "taylor_ratio": self.taylor_updates / total if total else 0.0}
+
+
+if __name__ == "__main__":
+    from binomial_tree import BinomialTree
+
+    rng = np.random.default_rng(0)
+    clock = [0.0]
+    book = IncrementalBook(error_bound=1e-3, max_age=900, clock=lambda: clock[0])
+    strikes = np.linspace(80, 120, 50)
+    for K in strikes:
+        for option_type in ("call", "put"):
+            book.add((option_type, float(K)), BinomialTree(100.0, K, 0.5, 0.03, 0.25, N=400, option_type=option_type,
+                                                           american=option_type == "put"), underlying="XYZ")
+
+    spot, ticks, worst = 100.0, {True: [], False: []}, 0.0
+    for tick in range(200):
+        clock[0] += 5.0
+        spot *= math.exp(0.25 * math.sqrt(5.0 / SECONDS_PER_YEAR) * rng.standard_normal())
+        start = time.perf_counter()
+        results = book.revalue({"XYZ": {"S": spot}})
+        ticks[bool(results["exact"].any())].append(time.perf_counter() - start)
+        if tick % 50 == 49:
+            # Contrôle : écart au prix exact sur les positions mises à jour par Taylor
+            for i in np.flatnonzero(~results["exact"])[:20]:
+                model = rebuild(book.models[i], S=spot, T=book.models[i].T - (clock[0] - book.anchor["time"][i]) / SECONDS_PER_YEAR)
+                worst = max(worst, abs(model.price() - results["price"][i]))
+    print(f"{len(book.models)} positions, 200 ticks : {len(ticks[False])} ticks tout Taylor "
+          f"({np.mean(ticks[False]) * 1e6:.0f} µs en moyenne), {len(ticks[True])} avec revalorisations exactes "
+          f"({np.mean(ticks[True]) * 1000:.1f} ms en moyenne)")
+    print(f"Statistiques : {book.stats()}")
+    print(f"Écart max au prix exact (échantillon) : {worst:.2e}")
@@ -0,0 +1,215 @@
+import contextvars
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+
+class Collector:
+    # Chronos, compteurs et captures d'une session de mesure. Le collecteur courant est porté par une
+    # ContextVar : chaque session Streamlit (un thread par rerun) installe le sien avec use() et ne voit
+    # ni ne réinitialise les mesures des autres.
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.timers = {}
+        self.counters = {}
+        self.captured = {}
+
+
+# Collecteur par défaut (scripts, CLI) : désactivé sauf OPTION_PRICER_INSTRUMENT=1. Désactivé, chaque
+# point de mesure se réduit à la lecture de la ContextVar et au test de ce drapeau.
+_default = Collector(enabled=os.environ.get("OPTION_PRICER_INSTRUMENT", "") not in ("", "0"))
+_current = contextvars.ContextVar("instrumentation_collector", default=_default)
+
+# cProfile et tracemalloc sont globaux au processus : une seule capture à la fois
+_capture_lock = threading.Lock()
+
+
+def use(collector):
+    # Installe le collecteur pour le contexte courant ; renvoie le jeton de ContextVar.reset
+    return _current.set(collector)
+
+
+def current():
+    return _current.get()
+
+
+def is_enabled():
+    return _current.get().enabled
+
+
+def enable():
+    _current.get().enabled = True
+
+
+def disable():
+    _current.get().enabled = False
+
+
+def reset():
+    collector = _current.get()
+    with collector.lock:
+        collector.timers.clear()
+        collector.counters.clear()
+        collector.captured.clear()
+
+
+def record(name, seconds):
+    collector = _current.get()
+    with collector.lock:
+        stats = collector.timers.get(name)
+        if stats is None:
+            collector.timers[name] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+
+def count(name, n=1):
+    collector = _current.get()
+    if not collector.enabled:
+        return
+    with collector.lock:
+        collector.counters[name] = collector.counters.get(name, 0) + n
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name):
+    # Bloc chronométré : with instrumentation.timer("app.sweep"): ...
+    return _Timer(name) if _current.get().enabled else _NULL_TIMER
+
+
+def timed(name):
+    # Décorateur : durée inclusive de chaque appel (les appels imbriqués se recouvrent)
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _current.get().enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+class capture:
+    # Capture optionnelle cProfile et/ou tracemalloc d'un bloc (with, ou start()/stop() quand le bloc
+    # est tout un script) ; le résultat est joint à snapshot() du collecteur courant au démarrage.
+    # Si une autre session capture déjà, celle-ci est ignorée et snapshot() le signale.
+    def __init__(self, profile=True, memory=False, top=25):
+        self.profile = profile
+        self.memory = memory
+        self.top = top
+        self._profiler = None
+        self._collector = None
+        self._locked = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def start(self):
+        self._collector = _current.get()
+        self._locked = _capture_lock.acquire(blocking=False)
+        if not self._locked:
+            return self
+        try:
+            if self.memory:
+                tracemalloc.start()
+            if self.profile:
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+        except BaseException:
+            # Démarrage avorté (autre profileur actif...) : le verrou ne doit pas rester pris
+            if self.memory:
+                tracemalloc.stop()
+            self._profiler = None
+            self._locked = False
+            _capture_lock.release()
+            raise
+        return self
+
+    def stop(self):
+        if not self._locked:
+            results = {"capture_skipped": "another session is already profiling"}
+            with self._collector.lock:
+                self._collector.captured.update(results)
+            return results
+        results = {}
+        try:
+            if self._profiler is not None:
+                self._profiler.disable()
+                stream = io.StringIO()
+                pstats.Stats(self._profiler, stream=stream).sort_stats("cumulative").print_stats(self.top)
+                results["profile"] = stream.getvalue()
+            if self.memory:
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                results["peak_memory"] = peak
+                results["allocations"] = [{"location": str(stat.traceback), "size": stat.size, "count": stat.count}
+                                          for stat in snapshot.statistics("lineno")[:self.top]]
+        finally:
+            self._locked = False
+            _capture_lock.release()
+        with self._collector.lock:
+            self._collector.captured.update(results)
+        return results
+
+
+def snapshot():
+    collector = _current.get()
+    with collector.lock:
+        timers = {name: {"calls": calls, "total": total, "mean": total / calls, "max": longest}
+                  for name, (calls, total, longest) in collector.timers.items()}
+        counters = dict(collector.counters)
+        captured = dict(collector.captured)
+    # Taux de succès des caches sur la période mesurée, à partir des compteurs cache.<nom>.<issue>
+    caches = {}
+    for name, value in counters.items():
+        if name.startswith("cache."):
+            _, cache, outcome = name.split(".", 2)
+            caches.setdefault(cache, {})[outcome] = value
+    for stats in caches.values():
+        lookups = sum(stats.values())
+        stats["hit_rate"] = (lookups - stats.get("misses", 0)) / lookups if lookups else 0.0
+    return {"timers": timers, "counters": counters, "caches": caches, **captured}
@@ -1,15 +1,13 @@
 import math
 import datetime
-import yfinance as yf
 
 from black_scholes import BlackScholes
 from binomial_tree import BinomialTree
 from monte_carlo import MonteCarlo
+from market_data import default_provider
 
 def get_last_price(ticker):
-    data = yf.Ticker(ticker)
-    last_price = data.history(period="1d")['Close'].iloc[-1]
-    return last_price
+    return default_provider().last_price(ticker)
 
 def calculate_T(maturity_date):
     today = datetime.datetime.today()
@@ -1,16 +1,16 @@
 import math
 import datetime
-import yfinance as yf
+import numpy as np
 
 from black_scholes import BlackScholes
 from binomial_tree import BinomialTree
 from monte_carlo import MonteCarlo
+from implied_volatility import american_implied_volatility, implied_volatility
+from market_data import default_provider
 
 def get_last_price(ticker):
     try:
-        data = yf.Ticker(ticker)
-        last_price = data.history(period="1d")['Close'].iloc[-1]
-        return round(last_price, 2)
+        return round(default_provider().last_price(ticker), 2)
     except Exception as e:
         print(f"Erreur lors de la récupération du prix : {e}")
         return None
@@ -26,11 +26,31 @@ def calculate_T(maturity_date):
 
 def get_available_strikes(ticker, maturity_date):
     try:
-        options = yf.Ticker(ticker).option_chain(maturity_date)
-        return sorted(list(set(options.calls['strike'].tolist())))
-    except Exception:
+        chain = default_provider().option_chain(ticker, maturity_date)
+        return sorted(set(chain.loc[chain['option_type'] == "call", 'strike'].tolist()))
+    except Exception as e:
+        print(f"Erreur lors de la récupération de la chaîne : {e}")
         return []
 
+def get_implied_volatility(ticker, maturity_date, K, option_type, S, T, r, american=True):
+    # Volatilité implicite du strike le plus proche, à partir du mid (ou du dernier prix) de la chaîne.
+    # Les options sur actions cotées sont américaines : la cotation est inversée par l'arbre, pas par Black-Scholes.
+    try:
+        chains = default_provider().option_chain(ticker, maturity_date)
+        chain = chains[chains['option_type'] == option_type]
+        mid = (chain['bid'] + chain['ask']) / 2
+        quotes = mid.where(mid > 0, chain['lastPrice']).to_numpy()
+        strikes = chain['strike'].to_numpy()
+        nearest = np.abs(strikes - K).argmin()
+        if american:
+            vol = american_implied_volatility(quotes[nearest], S, strikes[nearest], T, r, option_type=option_type)
+        else:
+            vol = implied_volatility(quotes[nearest], S, strikes[nearest], T, r, is_call=(option_type == "call"))
+        vol = float(vol)
+        return vol if math.isfinite(vol) else None
+    except Exception:
+        return None
+
 def ask_ticker():
     while True:
         ticker = input("Entrez le ticker (ex: AAPL, MSFT) : ").upper()
@@ -82,7 +102,12 @@ def main():
     maturity_date, T = ask_maturity_date(ticker)
     option_type = ask_option_type()
     r = ask_float("Entrez le taux sans risque (ex: 0.05 pour 5%) [Entrée pour 0.05] : ", default=0.05)
-    sigma = ask_float("Entrez la volatilité (ex: 0.2 pour 20%) [Entrée pour 0.2] : ", default=0.2)
+    implied_vol = get_implied_volatility(ticker, maturity_date, K, option_type, S, T, r)
+    if implied_vol:
+        print(f"Volatilité implicite de marché (strike le plus proche) : {implied_vol:.4f}")
+        sigma = ask_float(f"Entrez la volatilité [Entrée pour la vol implicite {implied_vol:.4f}] : ", default=implied_vol)
+    else:
+        sigma = ask_float("Entrez la volatilité (ex: 0.2 pour 20%) [Entrée pour 0.2] : ", default=0.2)
 
     # --- OBJETS MODELES ---
     bs = BlackScholes(S=S, K=K, T=T, r=r, sigma=sigma, option_type=option_type)
@@ -0,0 +1,298 @@
+import contextvars
+import datetime
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+CHAIN_COLUMNS = ["ticker", "expiry", "option_type", "strike", "bid", "ask", "lastPrice", "impliedVolatility"]
+
+
+class MarketDataError(Exception):
+    pass
+
+
+def pooled_session(pool_size=16, retries=2):
+    # Session HTTP partagée : connexions keep-alive réutilisées par tous les threads du chargeur
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=Retry(total=retries, backoff_factor=0.2, status_forcelist=(429, 500, 502, 503, 504)))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class YahooProvider:
+    # Accès Yahoo Finance : une session partagée entre tous les appels (pool de connexions)
+    def __init__(self, session=None):
+        import yfinance as yf
+        self._yf = yf
+        self.session = session
+
+    def _ticker(self, ticker):
+        return self._yf.Ticker(ticker, session=self.session) if self.session is not None else self._yf.Ticker(ticker)
+
+    @instrumentation.timed("market_data.last_price")
+    def last_price(self, ticker):
+        history = self._ticker(ticker).history(period="1d")
+        if history.empty:
+            raise MarketDataError(f"no price history for {ticker}")
+        return float(history["Close"].iloc[-1])
+
+    def last_prices(self, tickers):
+        # Un seul téléchargement groupé pour tous les tickers
+        data = self._yf.download(list(tickers), period="1d", progress=False, group_by="ticker", session=self.session)
+        prices = {}
+        for ticker in tickers:
+            try:
+                close = data[ticker]["Close"] if isinstance(data.columns, pd.MultiIndex) else data["Close"]
+                prices[ticker] = float(close.dropna().iloc[-1])
+            except (KeyError, IndexError):
+                continue
+        return prices
+
+    def expiries(self, ticker):
+        return list(self._ticker(ticker).options)
+
+    @instrumentation.timed("market_data.option_chain")
+    def option_chain(self, ticker, expiry):
+        chain = self._ticker(ticker).option_chain(expiry)
+        return _normalize_chain(ticker, expiry, chain.calls, chain.puts)
+
+    def risk_free_rate(self):
+        # Taux des T-bills 13 semaines (^IRX), coté en pourcentage
+        return self.last_price("^IRX") / 100
+
+
+class FakeProvider:
+    # Fournisseur local déterministe, sans réseau : spots, chaînes Black-Scholes et taux synthétiques
+    def __init__(self, spots=None, rate=0.05, volatility=0.2, expiries=None, today=None):
+        self.spots = spots if spots is not None else {"AAPL": 190.0, "MSFT": 410.0}
+        self.rate = rate
+        self.volatility = volatility
+        self.today = today or datetime.date.today()
+        self._expiries = expiries or [(self.today + datetime.timedelta(days=d)).isoformat() for d in (30, 90, 180)]
+        self.calls = 0
+
+    def last_price(self, ticker):
+        self.calls += 1
+        if ticker not in self.spots:
+            raise MarketDataError(f"unknown ticker {ticker}")
+        return float(self.spots[ticker])
+
+    def expiries(self, ticker):
+        self.calls += 1
+        if ticker not in self.spots:
+            raise MarketDataError(f"unknown ticker {ticker}")
+        return list(self._expiries)
+
+    def option_chain(self, ticker, expiry):
+        from black_scholes import black_scholes_batch
+        S = self.last_price(ticker)
+        T = max((datetime.date.fromisoformat(expiry) - self.today).days / 365, 1 / 365)
+        strikes = np.round(S * np.linspace(0.7, 1.3, 25), 2)
+        frames = {}
+        for option_type in ("call", "put"):
+            price = black_scholes_batch(S, strikes, T, self.rate, self.volatility, option_type == "call")["price"]
+            frames[option_type] = pd.DataFrame({"strike": strikes, "bid": price * 0.99, "ask": price * 1.01,
+                                                "lastPrice": price, "impliedVolatility": self.volatility})
+        return _normalize_chain(ticker, expiry, frames["call"], frames["put"])
+
+    def risk_free_rate(self):
+        return self.rate
+
+
+class SnapshotProvider:
+    # Fournisseur hors ligne : sert les données d'un instantané enregistré
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def last_price(self, ticker):
+        spots = self.snapshot.spots
+        if ticker not in spots:
+            raise MarketDataError(f"{ticker} not in snapshot {self.snapshot.snapshot_id}")
+        return spots[ticker]
+
+    def last_prices(self, tickers):
+        return {t: self.snapshot.spots[t] for t in tickers if t in self.snapshot.spots}
+
+    def expiries(self, ticker):
+        chains = self.snapshot.chains
+        return sorted(chains.loc[chains["ticker"] == ticker, "expiry"].unique())
+
+    def option_chain(self, ticker, expiry):
+        chains = self.snapshot.chains
+        chain = chains[(chains["ticker"] == ticker) & (chains["expiry"] == expiry)]
+        if chain.empty:
+            raise MarketDataError(f"no chain for {ticker} {expiry} in snapshot {self.snapshot.snapshot_id}")
+        return chain.reset_index(drop=True)
+
+    def risk_free_rate(self):
+        if "risk_free" not in self.snapshot.rates:
+            raise MarketDataError("no risk-free rate in snapshot")
+        return self.snapshot.rates["risk_free"]
+
+
+def _normalize_chain(ticker, expiry, calls, puts):
+    frames = []
+    for option_type, frame in (("call", calls), ("put", puts)):
+        frame = frame.copy()
+        frame["ticker"] = ticker
+        frame["expiry"] = expiry
+        frame["option_type"] = option_type
+        for column in CHAIN_COLUMNS:
+            if column not in frame:
+                frame[column] = np.nan
+        frames.append(frame[CHAIN_COLUMNS])
+    return pd.concat(frames, ignore_index=True)
+
+
+class MarketSnapshot:
+    def __init__(self, spots, chains, rates, snapshot_id=None, errors=None):
+        self.spots = spots
+        self.chains = chains if chains is not None else pd.DataFrame(columns=CHAIN_COLUMNS)
+        self.rates = rates
+        self.snapshot_id = snapshot_id or datetime.datetime.now().strftime("%Y%m%dT%H%M%S")
+        self.errors = errors or {}
+
+
+class MarketDataLoader:
+    # Récupère spots et chaînes en parallèle ; les erreurs sont collectées par requête, jamais avalées
+    def __init__(self, provider, max_workers=8):
+        self.provider = provider
+        self.max_workers = max_workers
+
+    def _map(self, fn, items):
+        results, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # Contexte copié : les compteurs des threads vont au collecteur d'instrumentation de l'appelant
+            futures = {item: pool.submit(contextvars.copy_context().run, fn, *(item if isinstance(item, tuple) else (item,)))
+                       for item in items}
+            for item, future in futures.items():
+                try:
+                    results[item] = future.result()
+                except Exception as exc:
+                    logger.warning("market data request %s failed: %s", item, exc)
+                    errors[item] = repr(exc)
+        return results, errors
+
+    def fetch_spots(self, tickers):
+        # Erreurs indexées par (ticker, "spot") : distinctes des erreurs d'échéances et de chaînes du même ticker
+        tickers = list(dict.fromkeys(tickers))
+        spots = {}
+        if hasattr(self.provider, "last_prices"):
+            try:
+                spots = self.provider.last_prices(tickers)
+            except Exception as exc:
+                logger.warning("bulk price download failed, falling back to per-ticker requests: %s", exc)
+                spots = {}
+        missing = [t for t in tickers if t not in spots]
+        extra, errors = self._map(self.provider.last_price, missing) if missing else ({}, {})
+        return {**spots, **extra}, {(ticker, "spot"): error for ticker, error in errors.items()}
+
+    def fetch_chains(self, tickers, expiries=None, max_expiries=None):
+        # expiries=None : toutes les échéances listées pour chaque ticker
+        errors = {}
+        if expiries is None:
+            listed, listing_errors = self._map(self.provider.expiries, tickers)
+            errors = {(ticker, "expiries"): error for ticker, error in listing_errors.items()}
+            requests = [(t, e) for t, dates in listed.items() for e in dates[:max_expiries]]
+        else:
+            requests = [(t, e) for t in tickers for e in expiries]
+        chains, chain_errors = self._map(self.provider.option_chain, requests)
+        errors.update(chain_errors)
+        frame = pd.concat(chains.values(), ignore_index=True) if chains else pd.DataFrame(columns=CHAIN_COLUMNS)
+        return frame, errors
+
+    def snapshot(self, tickers, expiries=None, max_expiries=None):
+        spots, spot_errors = self.fetch_spots(tickers)
+        chains, chain_errors = self.fetch_chains(tickers, expiries, max_expiries)
+        rates = {}
+        try:
+            rates["risk_free"] = self.provider.risk_free_rate()
+        except Exception as exc:
+            logger.warning("risk-free rate request failed: %s", exc)
+            chain_errors["risk_free"] = repr(exc)
+        return MarketSnapshot(spots, chains, rates, errors={**spot_errors, **chain_errors})
+
+
+class SnapshotStore:
+    # Un répertoire par instantané : spots.parquet, chains.parquet, rates.parquet
+    def __init__(self, root):
+        self.root = root
+
+    def save(self, snapshot):
+        path = os.path.join(self.root, snapshot.snapshot_id)
+        os.makedirs(path, exist_ok=True)
+        pd.DataFrame({"ticker": list(snapshot.spots), "spot": list(snapshot.spots.values())}).to_parquet(
+            os.path.join(path, "spots.parquet"), index=False)
+        snapshot.chains.to_parquet(os.path.join(path, "chains.parquet"), index=False)
+        pd.DataFrame({"name": list(snapshot.rates), "rate": list(snapshot.rates.values())}).to_parquet(
+            os.path.join(path, "rates.parquet"), index=False)
+        return path
+
+    def list(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.isfile(os.path.join(self.root, d, "spots.parquet")))
+
+    def load(self, snapshot_id=None):
+        available = self.list()
+        if not available:
+            raise MarketDataError(f"no snapshot in {self.root}")
+        snapshot_id = snapshot_id or available[-1]
+        path = os.path.join(self.root, snapshot_id)
+        spots = pd.read_parquet(os.path.join(path, "spots.parquet"))
+        rates = pd.read_parquet(os.path.join(path, "rates.parquet"))
+        return MarketSnapshot(
+            spots=dict(zip(spots["ticker"], spots["spot"].astype(float))),
+            chains=pd.read_parquet(os.path.join(path, "chains.parquet")),
+            rates=dict(zip(rates["name"], rates["rate"].astype(float))),
+            snapshot_id=snapshot_id,
+        )
+
+
+_default_provider = None
+
+
+def default_provider():
+    # OPTION_PRICER_SNAPSHOT=<répertoire> : pricing entièrement hors ligne sur le dernier instantané
+    global _default_provider
+    if _default_provider is None:
+        root = os.environ.get("OPTION_PRICER_SNAPSHOT")
+        if root:
+            _default_provider = SnapshotProvider(SnapshotStore(root).load(os.environ.get("OPTION_PRICER_SNAPSHOT_ID")))
+        else:
+            _default_provider = YahooProvider(session=pooled_session())
+    return _default_provider
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Enregistre un instantané de marché (spots, chaînes, taux)")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--store", default="snapshots")
+    parser.add_argument("--max-expiries", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--fake", action="store_true", help="Fournisseur local synthétique (sans réseau)")
+    args = parser.parse_args()
+
+    provider = FakeProvider() if args.fake else YahooProvider(session=pooled_session(args.workers))
+    snapshot = MarketDataLoader(provider, max_workers=args.workers).snapshot(args.tickers, max_expiries=args.max_expiries)
+    path = SnapshotStore(args.store).save(snapshot)
+    print(f"Instantané {snapshot.snapshot_id} : {len(snapshot.spots)} spots, {len(snapshot.chains)} cotations -> {path}")
+    for request, error in snapshot.errors.items():
+        print(f"⚠️ {request} : {error}")
+
+
+if __name__ == "__main__":
+    main()
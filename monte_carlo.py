@@ -1,8 +1,142 @@
 import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+from scipy.special import ndtri
+from scipy.stats import qmc
+
+import instrumentation
+
+VARIANCE_REDUCTION_MODES = (None, "antithetic", "control_variate", "sobol", "halton")
+GREEK_NAMES = ("price", "delta", "gamma", "vega", "theta", "rho")
+# Quasi-Monte Carlo en streaming : une observation par bloc, l'erreur standard n'est fiable qu'après
+# quelques réplications brouillées
+MIN_QMC_REPLICATIONS = 8
+
+
+class RunningMoments:
+    # Moyenne et somme des carrés des écarts (Welford / Chan) pour plusieurs quantités à la fois
+    def __init__(self, size):
+        self.count = 0
+        self.mean = np.zeros(size)
+        self.M2 = np.zeros(size)
+
+    def update(self, samples):
+        n = samples.shape[1]
+        if n == 0:
+            return
+        batch_mean = samples.mean(axis=1)
+        batch_M2 = ((samples - batch_mean[:, None]) ** 2).sum(axis=1)
+        self._combine(n, batch_mean, batch_M2)
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.M2)
+
+    def _combine(self, n, mean, M2):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self.M2 = self.M2 + M2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    def variance(self):
+        if self.count < 2:
+            return np.full_like(self.mean, np.nan)
+        return self.M2 / (self.count - 1)
+
+    def standard_error(self):
+        return np.sqrt(self.variance() / self.count)
+
+
+
+def quasi_normals(n, dims=1, sequence="sobol", replications=16, seed=None):
+    # Séquences quasi-aléatoires brouillées, R réplications indépendantes pour estimer l'erreur
+    per_replication = max(1, math.ceil(n / replications))
+    if sequence == "sobol":
+        per_replication = 1 << (per_replication - 1).bit_length()
+    rng = np.random.default_rng(seed)
+    blocks = []
+    for _ in range(replications):
+        if sequence == "sobol":
+            engine = qmc.Sobol(d=dims, scramble=True, seed=rng)
+        elif sequence == "halton":
+            engine = qmc.Halton(d=dims, scramble=True, seed=rng)
+        else:
+            raise ValueError("sequence must be 'sobol' or 'halton'")
+        U = engine.random(per_replication)
+        blocks.append(ndtri(np.clip(U, 1e-12, 1 - 1e-12)))
+    return np.stack(blocks)  # (replications, per_replication, dims)
+
+
+def brownian_bridge(Z, T):
+    # Construit W(t_1..t_m) en remplissant d'abord W(T) puis les milieux successifs :
+    # les premières coordonnées (les mieux réparties en QMC) portent la plus grande variance
+    n, m = Z.shape
+    times = T * np.arange(1, m + 1) / m
+    W = np.empty((n, m))
+    W[:, m - 1] = math.sqrt(T) * Z[:, 0]
+    k = 1
+    intervals = [(-1, m - 1)]
+    while intervals:
+        refined = []
+        for left, right in intervals:
+            mid = (left + right) // 2
+            if mid == left:
+                continue
+            t_left = 0.0 if left < 0 else times[left]
+            W_left = 0.0 if left < 0 else W[:, left]
+            t_mid, t_right = times[mid], times[right]
+            mean = ((t_right - t_mid) * W_left + (t_mid - t_left) * W[:, right]) / (t_right - t_left)
+            std = math.sqrt((t_mid - t_left) * (t_right - t_mid) / (t_right - t_left))
+            W[:, mid] = mean + std * Z[:, k]
+            k += 1
+            refined += [(left, mid), (mid, right)]
+        intervals = refined
+    return W
+
+
+def pathwise_samples(Z, S, K, T, r, sigma, is_call):
+    # Contributions par trajectoire : prix, puis estimateurs pathwise (delta, vega, rho, theta)
+    # et LR-pathwise (gamma), dans l'ordre de GREEK_NAMES. Les paramètres peuvent être des
+    # tableaux (k, 1) : chaque ligne est alors un scénario ou contrat évalué sur les mêmes tirages Z.
+    sqrt_T = np.sqrt(T)
+    ST = S * np.exp((r - 0.5 * sigma**2) * T + sigma * sqrt_T * Z)
+    discount = np.exp(-r * T)
+    sign = np.where(is_call, 1.0, -1.0)
+    payoffs = discount * np.maximum(sign * (ST - K), 0)
+    dpayoff = discount * sign * (sign * (ST - K) > 0)
+
+    dST_dT = ST * (r - 0.5 * sigma**2 + sigma * Z / (2 * sqrt_T))
+    return np.stack(np.broadcast_arrays(
+        payoffs,
+        dpayoff * ST / S,
+        dpayoff * K * Z / (S**2 * sigma * sqrt_T),
+        dpayoff * ST * (sqrt_T * Z - sigma * T) / 100,
+        (r * payoffs - dpayoff * dST_dT) / 365,
+        dpayoff * K * T / 100,
+    ))
+
+
+def monte_carlo_batch(S, K, T, r, sigma, is_call=True, simulations=10000, seed=None, max_elements=2_000_000):
+    # Prix et Greeks pathwise d'un lot de contrats européens sur un même jeu de tirages
+    S, K, T, r, sigma, is_call = (np.ravel(x) for x in np.broadcast_arrays(S, K, T, r, sigma, np.asarray(is_call, dtype=bool)))
+    Z = np.random.default_rng(seed).standard_normal(simulations)
+    instrumentation.count("monte_carlo.paths", simulations)
+    means = np.empty((len(GREEK_NAMES), len(S)))
+    block = max(1, max_elements // simulations)
+    for start in range(0, len(S), block):
+        rows = slice(start, start + block)
+        column = lambda x: np.asarray(x[rows], dtype=np.float64)[:, None]
+        samples = pathwise_samples(Z, column(S), column(K), column(T), column(r), column(sigma), is_call[rows][:, None])
+        means[:, rows] = samples.mean(axis=-1)
+    return {name: means[i] for i, name in enumerate(GREEK_NAMES)}
+
 
 class MonteCarlo:
-    def __init__(self, S, K, T, r, sigma, simulations=10000, option_type="call"):
+    def __init__(self, S, K, T, r, sigma, simulations=10000, option_type="call", greek_method="pathwise", variance_reduction=None, qmc_replications=16, seed=None,
+                 american=False, exercise_dates=50, basis_degree=3):
         self.S = S
         self.K = K
         self.T = T
@@ -10,96 +144,357 @@ class MonteCarlo:
         self.sigma = sigma
         self.simulations = simulations
         self.option_type = option_type.lower()
+        self.greek_method = greek_method
+        if variance_reduction not in VARIANCE_REDUCTION_MODES:
+            raise ValueError(f"variance_reduction must be one of {VARIANCE_REDUCTION_MODES}")
+        self.variance_reduction = variance_reduction
+        self.qmc_replications = qmc_replications
+        # seed=None conserve l'état global np.random pour les tirages normaux (QMC et Longstaff-Schwartz
+        # partent d'une entropie fraîche) ; sinon un Generator dédié (reproductible)
+        self.seed = seed
+        self._rng = None if seed is None else np.random.default_rng(seed)
+        self._Z = None
+        self._greeks = None
+        # Américaine : Longstaff-Schwartz, avec une graine fixe pour que les scénarios bumpés partagent les tirages
+        self.american = american
+        self.exercise_dates = exercise_dates
+        self.basis_degree = basis_degree
+        self._lsm_seed = None
+
+    def _draw_normals(self, n, replications=None):
+        replications = self.qmc_replications if replications is None else replications
+        rng = np.random if self._rng is None else self._rng
+        instrumentation.count("monte_carlo.paths", n)
+        if self.variance_reduction == "antithetic":
+            half = rng.standard_normal(math.ceil(n / 2))
+            return np.concatenate([half, -half])
+        if self.variance_reduction in ("sobol", "halton"):
+            # Sans graine : entropie fraîche du système (randint(2**32) déborde en int32 sous Windows)
+            seed = np.random.SeedSequence().entropy if self._rng is None else rng.integers(2**32)
+            return quasi_normals(n, 1, self.variance_reduction, replications, seed).reshape(-1)
+        return rng.standard_normal(n)
+
+    def normals(self):
+        # Tirages effectués une seule fois puis réutilisés (nombres aléatoires communs)
+        if self._Z is None:
+            self._Z = self._draw_normals(self.simulations)
+        return self._Z
 
-    def simulate_ST(self):
-        Z = np.random.standard_normal(self.simulations)
-        ST = self.S * np.exp((self.r - 0.5 * self.sigma**2) * self.T + self.sigma * math.sqrt(self.T) * Z)
+    def simulate_ST(self, S=None, T=None, r=None, sigma=None):
+        S = self.S if S is None else S
+        T = self.T if T is None else T
+        r = self.r if r is None else r
+        sigma = self.sigma if sigma is None else sigma
+        Z = self.normals()
+        ST = S * np.exp((r - 0.5 * sigma**2) * T + sigma * math.sqrt(T) * Z)
         return ST
 
-    def price(self):
-        ST = self.simulate_ST()
+    def _payoffs(self, ST):
         if self.option_type == "call":
-            payoffs = np.maximum(ST - self.K, 0)
+            return np.maximum(ST - self.K, 0)
         elif self.option_type == "put":
-            payoffs = np.maximum(self.K - ST, 0)
+            return np.maximum(self.K - ST, 0)
         else:
             raise ValueError("option_type must be 'call' or 'put'")
-        return math.exp(-self.r * self.T) * np.mean(payoffs)
 
-    def delta(self):
-        bump = 0.01 * self.S  # Petit déplacement de 1%
-        S_up = self.S + bump
-        S_down = self.S - bump
+    def _price_samples(self, ST, S, T, r, sigma):
+        # Échantillons i.i.d. dont la moyenne est le prix : l'erreur standard s'en déduit
+        discounted = math.exp(-r * T) * self._payoffs(ST)
+        if self.variance_reduction == "antithetic":
+            half = len(discounted) // 2
+            return 0.5 * (discounted[:half] + discounted[half:])
+        if self.variance_reduction in ("sobol", "halton"):
+            return discounted.reshape(self.qmc_replications, -1).mean(axis=1)
+        if self.variance_reduction == "control_variate":
+            return self._control_variate(discounted, ST, S, T, r, sigma)
+        return discounted
 
-        mc_up = MonteCarlo(S=S_up, K=self.K, T=self.T, r=self.r, sigma=self.sigma, simulations=self.simulations, option_type=self.option_type)
-        mc_down = MonteCarlo(S=S_down, K=self.K, T=self.T, r=self.r, sigma=self.sigma, simulations=self.simulations, option_type=self.option_type)
+    def _control_variate(self, discounted, ST, S, T, r, sigma):
+        # Contrôle : sous-jacent actualisé e^{-rT} S_T, d'espérance connue S (martingale). Corrélé au
+        # payoff sans lui être identique : le coefficient beta est estimé sur les tirages.
+        control = math.exp(-r * T) * ST
+        cov = np.cov(discounted, control)
+        beta = cov[0, 1] / cov[1, 1] if cov[1, 1] > 0 else 0.0
+        return discounted - beta * (control - S)
 
-        price_up = mc_up.price()
-        price_down = mc_down.price()
+    def _price_at(self, S=None, T=None, r=None, sigma=None):
+        S = self.S if S is None else S
+        T = self.T if T is None else T
+        r = self.r if r is None else r
+        sigma = self.sigma if sigma is None else sigma
+        if self.american:
+            return float(self._longstaff_schwartz(S, T, r, sigma, np.atleast_1d(self.K))[0][0])
+        ST = self.simulate_ST(S=S, T=T, r=r, sigma=sigma)
+        return float(np.mean(self._price_samples(ST, S, T, r, sigma)))
 
-        return (price_up - price_down) / (2 * bump)
+    def _lsm_seed_value(self):
+        if self._lsm_seed is None:
+            self._lsm_seed = self.seed if self.seed is not None else np.random.SeedSequence().entropy
+        return self._lsm_seed
 
-    def gamma(self):
-        bump = 0.01 * self.S
-        S_up = self.S + bump
-        S_down = self.S - bump
+    def _lsm_generator(self):
+        return np.random.default_rng(self._lsm_seed_value())
 
-        mc_up = MonteCarlo(S=S_up, K=self.K, T=self.T, r=self.r, sigma=self.sigma, simulations=self.simulations, option_type=self.option_type)
-        mc_down = MonteCarlo(S=S_down, K=self.K, T=self.T, r=self.r, sigma=self.sigma, simulations=self.simulations, option_type=self.option_type)
-        mc_mid = MonteCarlo(S=self.S, K=self.K, T=self.T, r=self.r, sigma=self.sigma, simulations=self.simulations, option_type=self.option_type)
+    @instrumentation.timed("monte_carlo.longstaff_schwartz")
+    def _longstaff_schwartz(self, S, T, r, sigma, strikes):
+        # Trajectoires générées à rebours par pont brownien depuis W(T) : seuls le spot courant
+        # et le vecteur de cash-flows (un par strike) sont conservés, jamais la matrice des chemins
+        if self.option_type not in ("call", "put"):
+            raise ValueError("option_type must be 'call' or 'put'")
+        rng = self._lsm_generator()
+        n = self.simulations
+        instrumentation.count("monte_carlo.paths", n)
+        M = self.exercise_dates
+        dt = T / M
+        disc = math.exp(-r * dt)
+        sign = 1.0 if self.option_type == "call" else -1.0
+        strikes = np.asarray(strikes, dtype=np.float64)[:, None]
 
-        price_up = mc_up.price()
-        price_mid = mc_mid.price()
-        price_down = mc_down.price()
+        W = math.sqrt(T) * rng.standard_normal(n)
+        S_t = S * np.exp((r - 0.5 * sigma**2) * T + sigma * W)
+        cashflows = np.maximum(sign * (S_t - strikes), 0)
 
-        return (price_up - 2 * price_mid + price_down) / (bump ** 2)
+        for k in range(M - 1, 0, -1):
+            t, t_next = k * dt, (k + 1) * dt
+            W = W * (t / t_next) + math.sqrt(t * dt / t_next) * rng.standard_normal(n)
+            S_t = S * np.exp((r - 0.5 * sigma**2) * t + sigma * W)
+            cashflows *= disc
 
-    def vega(self):
-        bump = 0.01  # +1% de volatilité
-        sigma_up = self.sigma + bump
-        sigma_down = self.sigma - bump
+            exercise = np.maximum(sign * (S_t - strikes), 0)
+            itm = exercise > 0
+            # Base polynomiale en S/S0 commune à tous les strikes : équations normales résolues en lot
+            basis = np.vander(S_t / S, self.basis_degree + 1, increasing=True)
+            weights = itm.astype(np.float64)
+            A = np.swapaxes(weights[:, :, None] * basis, 1, 2) @ basis
+            b = (weights * cashflows) @ basis
+            A += 1e-10 * np.eye(self.basis_degree + 1)
+            coefficients = np.linalg.solve(A, b[..., None])[..., 0]
+            continuation = coefficients @ basis.T
+            exercise_now = itm & (exercise > continuation)
+            cashflows = np.where(exercise_now, exercise, cashflows)
 
-        mc_up = MonteCarlo(S=self.S, K=self.K, T=self.T, r=self.r, sigma=sigma_up, simulations=self.simulations, option_type=self.option_type)
-        mc_down = MonteCarlo(S=self.S, K=self.K, T=self.T, r=self.r, sigma=sigma_down, simulations=self.simulations, option_type=self.option_type)
+        discounted = disc * cashflows
+        prices = discounted.mean(axis=1)
+        errors = discounted.std(axis=1, ddof=1) / math.sqrt(n)
+        intrinsic = np.maximum(sign * (S - strikes[:, 0]), 0)
+        return np.maximum(prices, intrinsic), errors
 
-        price_up = mc_up.price()
-        price_down = mc_down.price()
+    def price_american(self, strikes=None):
+        # Plusieurs strikes évalués sur les mêmes trajectoires simulées
+        if strikes is None:
+            return float(self._longstaff_schwartz(self.S, self.T, self.r, self.sigma, np.atleast_1d(self.K))[0][0])
+        return self._longstaff_schwartz(self.S, self.T, self.r, self.sigma, np.atleast_1d(strikes))[0]
 
-        vega_raw = (price_up - price_down) / (2 * bump)
-        return vega_raw / 100  # Normalisé par 1% de volatilité
+    def price_with_error(self):
+        if self.american:
+            prices, errors = self._longstaff_schwartz(self.S, self.T, self.r, self.sigma, np.atleast_1d(self.K))
+            return float(prices[0]), float(errors[0])
+        samples = self._price_samples(self.simulate_ST(), self.S, self.T, self.r, self.sigma)
+        standard_error = np.std(samples, ddof=1) / math.sqrt(len(samples)) if len(samples) > 1 else float("nan")
+        return float(np.mean(samples)), float(standard_error)
+
+    def standard_error(self):
+        return self.price_with_error()[1]
+
+    def price(self):
+        if self._greeks is not None:
+            return self._greeks["price"]
+        return self._price_at()
+
+    def _pathwise_samples(self, Z, S=None, T=None, r=None, sigma=None):
+        if self.option_type not in ("call", "put"):
+            raise ValueError("option_type must be 'call' or 'put'")
+        return pathwise_samples(Z, self.S if S is None else S, self.K, self.T if T is None else T,
+                                self.r if r is None else r, self.sigma if sigma is None else sigma,
+                                self.option_type == "call")
+
+    @classmethod
+    def evaluate_book(cls, book, simulations=10000, seed=None):
+        # Book en colonnes (contracts.ContractBook) : européennes sur un jeu de tirages commun,
+        # américaines par Longstaff-Schwartz contrat par contrat
+        from contracts import price_contracts
+        return price_contracts(book, "monte_carlo", paths=simulations, seed=seed)
+
+    def evaluate_grid(self, S=None, sigma=None, T=None, max_elements=2_000_000):
+        # Prix et Greeks sur une grille broadcastable, tous les points partageant les mêmes tirages
+        # (courbes lisses). La variable de contrôle n'est pas appliquée sur la grille.
+        S, sigma, T = np.broadcast_arrays(*(np.asarray(default if x is None else x, dtype=np.float64)
+                                            for x, default in ((S, self.S), (sigma, self.sigma), (T, self.T))))
+        points = np.stack([S.ravel(), sigma.ravel(), T.ravel()], axis=1)
+        means = np.empty((len(GREEK_NAMES), len(points)))
+        if self.american:
+            for k, (S_k, sigma_k, T_k) in enumerate(points):
+                clone = MonteCarlo(S=S_k, K=self.K, T=T_k, r=self.r, sigma=sigma_k, simulations=self.simulations,
+                                   option_type=self.option_type, american=True, exercise_dates=self.exercise_dates,
+                                   basis_degree=self.basis_degree, seed=self._lsm_seed_value())
+                greeks = clone.greeks()
+                means[:, k] = [greeks[name] for name in GREEK_NAMES]
+        else:
+            Z = self.normals()
+            block = max(1, max_elements // len(Z))
+            for start in range(0, len(points), block):
+                chunk = points[start:start + block]
+                samples = self._pathwise_samples(Z, S=chunk[:, :1], T=chunk[:, 2:3], sigma=chunk[:, 1:2])
+                means[:, start:start + block] = samples.mean(axis=-1)
+        return {name: means[i].reshape(S.shape) for i, name in enumerate(GREEK_NAMES)}
+
+    def _pathwise_greeks(self):
+        means = self._pathwise_samples(self.normals()).mean(axis=1)
+        greeks = dict(zip(GREEK_NAMES, means))
+        greeks["price"] = self._price_at()
+        # theta dépend du prix (-r V) : on le recale sur le prix éventuellement réduit en variance
+        greeks["theta"] += self.r * (greeks["price"] - means[0]) / 365
+        return greeks
+
+    def price_streaming(self, chunk_size=100000, target_error=None, time_budget=None, max_paths=None):
+        # Trajectoires générées par blocs de taille fixe : mémoire constante quel que soit le nombre de chemins.
+        # S'arrête dès que l'erreur standard du prix atteint target_error ou que time_budget (s) est écoulé.
+        if self.variance_reduction == "control_variate":
+            raise ValueError("control_variate is not supported in streaming mode")
+        if self.american:
+            # Longstaff-Schwartz régresse sur toutes les trajectoires à la fois : pas de découpage en blocs
+            raise ValueError("american options are not supported in streaming mode, use price() (Longstaff-Schwartz)")
+        if max_paths is None:
+            max_paths = self.simulations if target_error is None and time_budget is None else math.inf
+        moments = RunningMoments(len(GREEK_NAMES))
+        min_observations = MIN_QMC_REPLICATIONS if self.variance_reduction in ("sobol", "halton") else 2
+        start = time.perf_counter()
+        paths = 0
+        while paths < max_paths:
+            n = int(min(chunk_size, max_paths - paths)) if max_paths != math.inf else chunk_size
+            chunk_paths, samples = self._chunk_samples(n)
+            paths += chunk_paths
+            moments.update(samples)
+
+            if target_error is not None and moments.count >= min_observations and moments.standard_error()[0] <= target_error:
+                break
+            if time_budget is not None and time.perf_counter() - start >= time_budget:
+                break
+
+        return _moments_result(moments, paths, time.perf_counter() - start)
+
+    def _chunk_samples(self, n):
+        Z = self._draw_normals(n, replications=1)
+        samples = self._pathwise_samples(Z)
+        if self.variance_reduction in ("sobol", "halton"):
+            # Chaque bloc est une réplication brouillée indépendante : une observation par bloc
+            samples = samples.mean(axis=1, keepdims=True)
+        elif self.variance_reduction == "antithetic":
+            half = samples.shape[1] // 2
+            samples = 0.5 * (samples[:, :half] + samples[:, half:])
+        return len(Z), samples
+
+    def price_parallel(self, workers=None, chunk_size=100000, seed=None):
+        # Le budget est découpé en blocs fixes, chacun avec son flux issu de SeedSequence.spawn.
+        # Le découpage et l'ordre de fusion ne dépendent pas du nombre de workers : résultat identique au bit près.
+        if self.variance_reduction == "control_variate":
+            raise ValueError("control_variate is not supported in parallel mode")
+        if self.american:
+            # Longstaff-Schwartz régresse sur toutes les trajectoires à la fois : pas de découpage en blocs
+            raise ValueError("american options are not supported in parallel mode, use price() (Longstaff-Schwartz)")
+        seed = self.seed if seed is None else seed
+        n_chunks = math.ceil(self.simulations / chunk_size)
+        sizes = [min(chunk_size, self.simulations - i * chunk_size) for i in range(n_chunks)]
+        params = dict(S=self.S, K=self.K, T=self.T, r=self.r, sigma=self.sigma, option_type=self.option_type,
+                      variance_reduction=self.variance_reduction)
+        tasks = [(params, n, child) for n, child in zip(sizes, np.random.SeedSequence(seed).spawn(n_chunks))]
+
+        workers = os.cpu_count() if workers is None else workers
+        start = time.perf_counter()
+        if workers <= 1:
+            partials = [_simulate_chunk(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                partials = list(pool.map(_simulate_chunk, tasks))
+            # Les compteurs des processus fils sont perdus : comptés ici
+            instrumentation.count("monte_carlo.paths", sum(chunk_paths for chunk_paths, _ in partials))
+
+        moments = RunningMoments(len(GREEK_NAMES))
+        paths = 0
+        for chunk_paths, partial in partials:
+            moments.merge(partial)
+            paths += chunk_paths
+        return _moments_result(moments, paths, time.perf_counter() - start)
+
+    def _bump_greeks(self):
+        # Différences finies avec les mêmes tirages pour chaque scénario bumpé
+        bump = 0.01 * self.S  # Petit déplacement de 1%
+        price = self._price_at()
+        price_up = self._price_at(S=self.S + bump)
+        price_down = self._price_at(S=self.S - bump)
+
+        sigma_bump = 0.01  # +1% de volatilité
+        vega_raw = (self._price_at(sigma=self.sigma + sigma_bump) - self._price_at(sigma=self.sigma - sigma_bump)) / (2 * sigma_bump)
 
-    def theta(self):
         epsilon = 1/365  # 1 jour en années
         T_minus = self.T - epsilon
         if T_minus <= 0:
             T_minus = 1/365  # éviter T=0
+        theta_annual = (self._price_at(T=T_minus) - price) / epsilon
+
+        r_bump = 0.01  # +1% taux sans risque
+        rho_raw = (self._price_at(r=self.r + r_bump) - self._price_at(r=self.r - r_bump)) / (2 * r_bump)
+
+        return {
+            "price": price,
+            "delta": (price_up - price_down) / (2 * bump),
+            "gamma": (price_up - 2 * price + price_down) / (bump ** 2),
+            "vega": vega_raw / 100,  # Normalisé par 1% de volatilité
+            "theta": theta_annual / 365,  # Normalisé par jour
+            "rho": rho_raw / 100,  # Normalisé par 1% de taux
+        }
 
-        mc_minus = MonteCarlo(S=self.S, K=self.K, T=T_minus, r=self.r, sigma=self.sigma, simulations=self.simulations, option_type=self.option_type)
-        price_now = self.price()
-        price_minus = mc_minus.price()
+    def greeks(self):
+        if self._greeks is None:
+            if self.american:
+                # Pas d'estimateur pathwise simple pour l'exercice anticipé : bumps sur les mêmes tirages
+                self._greeks = self._bump_greeks()
+            elif self.greek_method == "pathwise":
+                self._greeks = self._pathwise_greeks()
+            elif self.greek_method == "bump":
+                self._greeks = self._bump_greeks()
+            else:
+                raise ValueError("greek_method must be 'pathwise' or 'bump'")
+            self._greeks = {k: float(v) for k, v in self._greeks.items()}
+        return self._greeks
 
-        theta_annual = (price_minus - price_now) / epsilon
-        return theta_annual / 365  # Normalisé par jour
+    def delta(self):
+        return self.greeks()["delta"]
+
+    def gamma(self):
+        return self.greeks()["gamma"]
+
+    def vega(self):
+        return self.greeks()["vega"]
+
+    def theta(self):
+        return self.greeks()["theta"]
 
     def rho(self):
-        bump = 0.01  # +1% taux sans risque
-        r_up = self.r + bump
-        r_down = self.r - bump
+        return self.greeks()["rho"]
 
-        mc_up = MonteCarlo(S=self.S, K=self.K, T=self.T, r=r_up, sigma=self.sigma, simulations=self.simulations, option_type=self.option_type)
-        mc_down = MonteCarlo(S=self.S, K=self.K, T=self.T, r=r_down, sigma=self.sigma, simulations=self.simulations, option_type=self.option_type)
+def _simulate_chunk(task):
+    params, n, seed_sequence = task
+    mc = MonteCarlo(simulations=n, seed=seed_sequence, **params)
+    chunk_paths, samples = mc._chunk_samples(n)
+    moments = RunningMoments(len(GREEK_NAMES))
+    moments.update(samples)
+    return chunk_paths, moments
 
-        price_up = mc_up.price()
-        price_down = mc_down.price()
 
-        rho_raw = (price_up - price_down) / (2 * bump)
-        return rho_raw / 100  # Normalisé par 1% de taux
+def _moments_result(moments, paths, elapsed):
+    result = dict(zip(GREEK_NAMES, (float(x) for x in moments.mean)))
+    result["standard_errors"] = dict(zip(GREEK_NAMES, (float(x) for x in moments.standard_error())))
+    result["paths"] = paths
+    result["elapsed"] = elapsed
+    return result
 
-mc = MonteCarlo(S=100, K=100, T=1, r=0.05, sigma=0.2, simulations=100000, option_type="call")
+if __name__ == "__main__":
+    mc = MonteCarlo(S=100, K=100, T=1, r=0.05, sigma=0.2, simulations=100000, option_type="call")
 
-print(f"Price: {mc.price():.4f}")
-print(f"Delta: {mc.delta():.4f}")
-print(f"Gamma: {mc.gamma():.6f}")
-print(f"Vega: {mc.vega():.4f}")
-print(f"Theta: {mc.theta():.4f}")
-print(f"Rho: {mc.rho():.4f}")
+    print(f"Price: {mc.price():.4f}")
+    print(f"Delta: {mc.delta():.4f}")
+    print(f"Gamma: {mc.gamma():.6f}")
+    print(f"Vega: {mc.vega():.4f}")
+    print(f"Theta: {mc.theta():.4f}")
+    print(f"Rho: {mc.rho():.4f}")
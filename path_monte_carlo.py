@@ -0,0 +1,261 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+import instrumentation
+from heston import QEScheme
+from monte_carlo import RunningMoments, brownian_bridge, quasi_normals
+
+
+class AsianPayoff:
+    # Option asiatique à moyenne arithmétique (prix observés à chaque pas)
+    def __init__(self, K, option_type="call"):
+        self.K = K
+        self.option_type = option_type.lower()
+        if self.option_type not in ("call", "put"):
+            raise ValueError("option_type must be 'call' or 'put'")
+
+    def initial_state(self, S0, n):
+        return {"total": np.zeros(n), "count": 0}
+
+    def update(self, state, S):
+        state["total"] += S
+        state["count"] += 1
+
+    def payoff(self, state, ST):
+        average = state["total"] / state["count"]
+        if self.option_type == "call":
+            return np.maximum(average - self.K, 0)
+        return np.maximum(self.K - average, 0)
+
+
+class BarrierPayoff:
+    # Barrière knock-in / knock-out surveillée à chaque pas de temps (surveillance discrète)
+    KINDS = ("up-and-out", "up-and-in", "down-and-out", "down-and-in")
+
+    def __init__(self, K, barrier, kind="up-and-out", option_type="call", rebate=0.0):
+        if kind not in self.KINDS:
+            raise ValueError(f"kind must be one of {self.KINDS}")
+        self.K = K
+        self.barrier = barrier
+        self.kind = kind
+        self.option_type = option_type.lower()
+        if self.option_type not in ("call", "put"):
+            raise ValueError("option_type must be 'call' or 'put'")
+        self.rebate = rebate
+
+    def _crossed(self, S):
+        return S >= self.barrier if self.kind.startswith("up") else S <= self.barrier
+
+    def initial_state(self, S0, n):
+        return {"hit": np.broadcast_to(self._crossed(np.asarray(S0, dtype=np.float64)), (n,)).copy()}
+
+    def update(self, state, S):
+        state["hit"] |= self._crossed(S)
+
+    def payoff(self, state, ST):
+        if self.option_type == "call":
+            vanilla = np.maximum(ST - self.K, 0)
+        else:
+            vanilla = np.maximum(self.K - ST, 0)
+        alive = ~state["hit"] if self.kind.endswith("out") else state["hit"]
+        return np.where(alive, vanilla, self.rebate)
+
+
+class LookbackPayoff:
+    # Lookback à strike flottant (K=None) ou fixe sur le min/max du chemin
+    def __init__(self, K=None, option_type="call"):
+        self.K = K
+        self.option_type = option_type.lower()
+        if self.option_type not in ("call", "put"):
+            raise ValueError("option_type must be 'call' or 'put'")
+
+    def initial_state(self, S0, n):
+        return {"min": np.full(n, S0, dtype=np.float64), "max": np.full(n, S0, dtype=np.float64)}
+
+    def update(self, state, S):
+        np.minimum(state["min"], S, out=state["min"])
+        np.maximum(state["max"], S, out=state["max"])
+
+    def payoff(self, state, ST):
+        if self.K is None:
+            if self.option_type == "call":
+                return ST - state["min"]
+            return state["max"] - ST
+        if self.option_type == "call":
+            return np.maximum(state["max"] - self.K, 0)
+        return np.maximum(self.K - state["min"], 0)
+
+
+VARIANCE_REDUCTION_MODES = (None, "antithetic", "sobol", "halton")
+
+
+class PathMonteCarlo:
+    def __init__(self, S, T, r, sigma, payoff, steps=252, simulations=10000, variance_reduction=None, seed=None,
+                 heston=None, qmc_replications=16):
+        self.S = S
+        self.T = T
+        self.r = r
+        self.sigma = sigma
+        self.payoff = payoff
+        self.steps = steps
+        self.simulations = simulations
+        if variance_reduction not in VARIANCE_REDUCTION_MODES:
+            raise ValueError(f"variance_reduction must be one of {VARIANCE_REDUCTION_MODES}")
+        if variance_reduction in ("sobol", "halton") and heston is not None:
+            raise ValueError("quasi-random paths are only supported for the Black-Scholes dynamics")
+        self.variance_reduction = variance_reduction
+        self.qmc_replications = qmc_replications
+        self.seed = seed
+        self._rng = None if seed is None else np.random.default_rng(seed)
+
+        # Même discrétisation GBM exacte que MonteCarlo, appliquée pas à pas.
+        # heston = {"v0", "kappa", "theta", "xi", "rho"} : volatilité stochastique simulée par le schéma QE
+        # (sigma est alors ignoré)
+        self.heston = heston
+        self.dt = T / steps
+        if heston is None:
+            self.drift = (r - 0.5 * sigma**2) * self.dt
+            self.vol = sigma * math.sqrt(self.dt)
+
+    def _simulate_payoffs(self, n):
+        # Seules les statistiques courantes du chemin sont conservées : mémoire O(trajectoires)
+        rng = np.random if self._rng is None else self._rng
+        if self.variance_reduction in ("sobol", "halton"):
+            return self._quasi_payoffs(rng, n)
+        antithetic = self.variance_reduction == "antithetic"
+        half = math.ceil(n / 2) if antithetic else n
+        width = 2 * half if antithetic else n
+        instrumentation.count("path_monte_carlo.paths", width)
+
+        S = np.full(width, float(self.S))
+        state = self.payoff.initial_state(self.S, width)
+        if self.heston is not None:
+            self._heston_steps(rng, half, antithetic, S, state)
+        else:
+            increment = np.empty(width)
+            for _ in range(self.steps):
+                Z = rng.standard_normal(half)
+                if antithetic:
+                    increment[:half] = Z
+                    increment[half:] = -Z
+                else:
+                    increment[:] = Z
+                increment *= self.vol
+                increment += self.drift
+                np.exp(increment, out=increment)
+                S *= increment
+                self.payoff.update(state, S)
+
+        discounted = math.exp(-self.r * self.T) * self.payoff.payoff(state, S)
+        if antithetic:
+            discounted = 0.5 * (discounted[:half] + discounted[half:])
+        return width, discounted
+
+    def _quasi_payoffs(self, rng, n):
+        # Une dimension quasi-aléatoire par pas, affectée par pont brownien : W(T) puis les milieux
+        # successifs prennent les premières coordonnées, les mieux réparties. Le pont construit tout le
+        # chemin d'un coup : mémoire O(trajectoires x pas). Une observation par réplication brouillée.
+        seed = np.random.SeedSequence().entropy if self._rng is None else rng.integers(2**32)
+        Z = quasi_normals(n, self.steps, self.variance_reduction, self.qmc_replications, seed)
+        width = Z.shape[0] * Z.shape[1]
+        instrumentation.count("path_monte_carlo.paths", width)
+        W = brownian_bridge(Z.reshape(width, self.steps), self.T)
+        times = self.T * np.arange(1, self.steps + 1) / self.steps
+        drift = (self.r - 0.5 * self.sigma**2) * times
+        state = self.payoff.initial_state(self.S, width)
+        for k in range(self.steps):
+            S = self.S * np.exp(drift[k] + self.sigma * W[:, k])
+            self.payoff.update(state, S)
+        discounted = math.exp(-self.r * self.T) * self.payoff.payoff(state, S)
+        return width, discounted.reshape(self.qmc_replications, -1).mean(axis=1)
+
+    def _heston_steps(self, rng, half, antithetic, S, state):
+        # Antithétique : gaussiennes opposées et uniforme 1 - U pour la branche exponentielle
+        heston = self.heston
+        scheme = QEScheme(self.dt, self.r, heston["kappa"], heston["theta"], heston["xi"], heston["rho"])
+        V = np.full(len(S), float(heston["v0"]))
+        mirror = lambda draws, reflect: np.concatenate([draws, reflect(draws)]) if antithetic else draws
+        for _ in range(self.steps):
+            Z_variance = mirror(rng.standard_normal(half), np.negative)
+            U = mirror(rng.random(half), lambda u: 1 - u)
+            Z_spot = mirror(rng.standard_normal(half), np.negative)
+            V, increment = scheme.step(V, Z_variance, U, Z_spot)
+            S *= np.exp(increment)
+            self.payoff.update(state, S)
+
+    def price_with_error(self):
+        _, samples = self._simulate_payoffs(self.simulations)
+        standard_error = np.std(samples, ddof=1) / math.sqrt(len(samples)) if len(samples) > 1 else float("nan")
+        return float(np.mean(samples)), float(standard_error)
+
+    def price(self):
+        return self.price_with_error()[0]
+
+    def standard_error(self):
+        return self.price_with_error()[1]
+
+    def price_streaming(self, chunk_size=100000, target_error=None, time_budget=None, max_paths=None):
+        if max_paths is None:
+            max_paths = self.simulations if target_error is None and time_budget is None else math.inf
+        moments = RunningMoments(1)
+        start = time.perf_counter()
+        paths = 0
+        while paths < max_paths:
+            n = int(min(chunk_size, max_paths - paths)) if max_paths != math.inf else chunk_size
+            chunk_paths, samples = self._simulate_payoffs(n)
+            paths += chunk_paths
+            moments.update(samples[None, :])
+
+            if target_error is not None and moments.count > 1 and moments.standard_error()[0] <= target_error:
+                break
+            if time_budget is not None and time.perf_counter() - start >= time_budget:
+                break
+
+        return _path_result(moments, paths, time.perf_counter() - start)
+
+    def price_parallel(self, workers=None, chunk_size=100000, seed=None):
+        # Même schéma que MonteCarlo.price_parallel : blocs fixes, flux SeedSequence.spawn, fusion ordonnée
+        seed = self.seed if seed is None else seed
+        n_chunks = math.ceil(self.simulations / chunk_size)
+        sizes = [min(chunk_size, self.simulations - i * chunk_size) for i in range(n_chunks)]
+        params = dict(S=self.S, T=self.T, r=self.r, sigma=self.sigma, payoff=self.payoff, steps=self.steps,
+                      variance_reduction=self.variance_reduction, heston=self.heston,
+                      qmc_replications=self.qmc_replications)
+        tasks = [(params, n, child) for n, child in zip(sizes, np.random.SeedSequence(seed).spawn(n_chunks))]
+
+        workers = os.cpu_count() if workers is None else workers
+        start = time.perf_counter()
+        if workers <= 1:
+            partials = [_simulate_path_chunk(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                partials = list(pool.map(_simulate_path_chunk, tasks))
+            instrumentation.count("path_monte_carlo.paths", sum(chunk_paths for chunk_paths, _ in partials))
+
+        moments = RunningMoments(1)
+        paths = 0
+        for chunk_paths, partial in partials:
+            moments.merge(partial)
+            paths += chunk_paths
+        return _path_result(moments, paths, time.perf_counter() - start)
+
+
+def _simulate_path_chunk(task):
+    params, n, seed_sequence = task
+    engine = PathMonteCarlo(simulations=n, seed=seed_sequence, **params)
+    chunk_paths, samples = engine._simulate_payoffs(n)
+    moments = RunningMoments(1)
+    moments.update(samples[None, :])
+    return chunk_paths, moments
+
+
+def _path_result(moments, paths, elapsed):
+    return {
+        "price": float(moments.mean[0]),
+        "standard_error": float(moments.standard_error()[0]),
+        "paths": paths,
+        "elapsed": elapsed,
+    }
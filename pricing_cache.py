@@ -0,0 +1,197 @@
+import atexit
+import dbm
+import logging
+import pickle
+import shelve
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+GREEKS = ("price", "delta", "gamma", "vega", "theta", "rho")
+
+
+# Attributs des moteurs qui changent le résultat (au-delà du contrat) : pas, trajectoires, graine,
+# réduction de variance, méthode des Greeks, exercice américain, schémas d'arbre et de grille
+ENGINE_OPTIONS = ("N", "simulations", "seed", "variance_reduction", "greek_method", "qmc_replications",
+                  "exercise_dates", "basis_degree", "method", "richardson", "space_steps", "time_steps",
+                  "rannacher_steps")
+
+
+def model_key(model, *extra):
+    # (moteur, type, style d'exercice, S, K, T, r, sigma) + (nom, valeur) des options présentes sur le moteur
+    return (
+        type(model).__name__,
+        model.option_type,
+        bool(getattr(model, "american", False)),
+        float(model.S), float(model.K), float(model.T), float(model.r), float(model.sigma),
+    ) + tuple((name, getattr(model, name)) for name in ENGINE_OPTIONS if hasattr(model, name)) + tuple(extra)
+
+
+class PricingCache:
+    # Cache LRU borné en mémoire, avec un second niveau optionnel sur disque (shelve)
+    def __init__(self, maxsize=1024, disk_path=None, name="pricing"):
+        self.name = name
+        self.maxsize = maxsize
+        self.disk_path = disk_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Shelf ouvert une seule fois (réouvert si disk_path change), tous les accès sous ce verrou :
+        # dbm ne supporte pas les accès concurrents depuis plusieurs threads
+        self._disk_lock = threading.Lock()
+        self._disk = None
+        self._disk_opened = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                instrumentation.count(f"cache.{self.name}.hits")
+                return self._entries[key]
+        if self.disk_path is not None:
+            stored = self._disk_call(lambda disk: disk.get(repr(key)))
+            if stored is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                instrumentation.count(f"cache.{self.name}.disk_hits")
+                self._store(key, stored)
+                return stored
+        with self._lock:
+            self.misses += 1
+        instrumentation.count(f"cache.{self.name}.misses")
+        return default
+
+    def put(self, key, value):
+        self._store(key, value)
+        if self.disk_path is not None:
+            def write(disk):
+                disk[repr(key)] = value
+                disk.sync()
+            self._disk_call(write)
+
+    def _disk_call(self, operation):
+        # Erreur disque (fichier corrompu, verrouillé, valeur non picklable) : journalisée, le cache
+        # mémoire continue de servir
+        with self._disk_lock:
+            try:
+                if self._disk is None or self._disk_opened != self.disk_path:
+                    self._close_disk()
+                    self._disk = shelve.open(self.disk_path)
+                    self._disk_opened = self.disk_path
+                return operation(self._disk)
+            except (*dbm.error, OSError, pickle.PickleError) as exc:
+                logger.warning("disk cache %s unavailable: %s", self.disk_path, exc)
+                self._close_disk()
+                return None
+
+    def _close_disk(self):
+        if self._disk is not None:
+            try:
+                self._disk.close()
+            except (*dbm.error, OSError) as exc:
+                logger.warning("closing disk cache %s failed: %s", self._disk_opened, exc)
+            self._disk = None
+
+    def close(self):
+        with self._disk_lock:
+            self._close_disk()
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def price_and_greeks(self, model):
+        return self.get_or_compute(model_key(model), lambda: {g: getattr(model, g)() for g in GREEKS})
+
+    def evaluate_grid(self, model, S=None, sigma=None, T=None):
+        axes = tuple(None if x is None else (np.shape(x),) + tuple(np.asarray(x, dtype=float).ravel()) for x in (S, sigma, T))
+        return self.get_or_compute(model_key(model, "grid", *axes), lambda: model.evaluate_grid(S=S, sigma=sigma, T=T))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+
+class TTLCache:
+    # Cache à durée de vie pour les données de marché (spots, chaînes d'options)
+    def __init__(self, ttl=60.0, maxsize=256, name="market_data"):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                instrumentation.count(f"cache.{self.name}.hits")
+                return entry[1]
+            self._entries.pop(key, None)
+            self.misses += 1
+        instrumentation.count(f"cache.{self.name}.misses")
+        return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute, cache_if=lambda value: True):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            if cache_if(value):
+                self.put(key, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+# Instances partagées : le module reste importé entre deux reruns Streamlit
+pricing_cache = PricingCache(maxsize=2048)
+atexit.register(pricing_cache.close)
+market_data_cache = TTLCache(ttl=60.0)
@@ -0,0 +1,382 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from batch_pricer import DEFAULTS, ENGINES, GREEKS, price_chunk
+from black_scholes import black_scholes_batch
+
+REQUIRED = ("S", "K", "T", "r", "sigma")
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+def validate(payload):
+    # Contrôlé à l'entrée : une requête invalide reçoit son 400 sans faire échouer le lot où elle aurait atterri
+    if not isinstance(payload, dict):
+        raise ValueError("contract must be a JSON object")
+    missing = [field for field in REQUIRED if field not in payload]
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(missing)}")
+    row = {field: float(payload[field]) for field in REQUIRED}
+    if not all(math.isfinite(value) for value in row.values()):
+        raise ValueError("S, K, T, r and sigma must be finite numbers")
+    if min(row["S"], row["K"], row["T"], row["sigma"]) <= 0:
+        raise ValueError("S, K, T and sigma must be positive")
+    row["option_type"] = str(payload.get("option_type", "call")).lower()
+    if row["option_type"] not in ("call", "put"):
+        raise ValueError("option_type must be 'call' or 'put'")
+    for column, default in DEFAULTS.items():
+        row[column] = payload.get(column, default)
+    row["engine"] = str(row["engine"]).lower()
+    row["exercise"] = str(row["exercise"]).lower()
+    if row["engine"] not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    if row["exercise"] not in ("european", "american"):
+        raise ValueError("exercise must be 'european' or 'american'")
+    return row
+
+
+def price_records(records, steps, paths, seed):
+    # Exécuté dans le pool de processus : le lot passe par les mêmes moteurs vectorisés que batch_pricer
+    priced = price_chunk(pd.DataFrame.from_records(records), steps=steps, paths=paths, seed=seed)
+    return priced[list(GREEKS)].to_dict("records")
+
+
+def price_black_scholes(rows):
+    # Black-Scholes européen directement sur les colonnes empilées : pas de DataFrame dans la boucle
+    S, K, T, r, sigma = (np.fromiter((row[field] for row in rows), np.float64, len(rows)) for field in REQUIRED)
+    is_call = np.fromiter((row["option_type"] == "call" for row in rows), bool, len(rows))
+    results = black_scholes_batch(S, K, T, r, sigma, is_call)
+    columns = [results[g].tolist() for g in GREEKS]
+    return [dict(zip(GREEKS, values)) for values in zip(*columns)]
+
+
+class MicroBatcher:
+    # Les requêtes arrivées pendant `window` secondes (ou tant que tous les workers sont occupés)
+    # forment un seul lot ; au plus `slots` lots sont évalués simultanément.
+    def __init__(self, pool=None, window=0.002, max_batch=512, slots=1, steps=200, paths=10000, seed=None):
+        self.pool = pool
+        self.window = window
+        self.max_batch = max_batch
+        self.steps = steps
+        self.paths = paths
+        self.seed = seed
+        self.queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(slots)
+        self.latencies = deque(maxlen=10000)
+        self.batch_sizes = deque(maxlen=1000)
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self._tasks = set()
+
+    async def submit(self, row):
+        future = asyncio.get_running_loop().create_future()
+        start = time.perf_counter()
+        self.queue.put_nowait((row, future))
+        try:
+            return await future
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    async def run(self):
+        while True:
+            # Le créneau est réservé avant de collecter : pendant que les workers calculent,
+            # les requêtes s'accumulent et le lot suivant est plus gros
+            await self._slots.acquire()
+            first = await self.queue.get()
+            if self.queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.window)
+            batch = [first] + [self.queue.get_nowait() for _ in range(min(self.queue.qsize(), self.max_batch - 1))]
+            task = asyncio.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch):
+        rows = [row for row, _ in batch]
+        self.in_flight += len(rows)
+        self.batch_sizes.append(len(rows))
+        try:
+            # Black-Scholes européen : une évaluation vectorisée sub-milliseconde, faite dans la boucle
+            light = all(row["engine"] == "black_scholes" and row["exercise"] == "european" for row in rows)
+            if light:
+                results = price_black_scholes(rows)
+            else:
+                # Sans pool de processus (workers=0), l'exécuteur de threads par défaut : un lot arbre ou
+                # Monte Carlo ne bloque jamais la boucle, ni les autres requêtes ni /stats
+                results = await asyncio.get_running_loop().run_in_executor(
+                    self.pool, price_records, rows, self.steps, self.paths, self.seed)
+        except Exception as exc:
+            self.errors += len(rows)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            self.requests += len(rows)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.in_flight -= len(rows)
+            self._slots.release()
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000
+        sizes = np.array(self.batch_sizes)
+        percentiles = {}
+        if len(latencies):
+            percentiles = {f"p{q}": float(np.percentile(latencies, q)) for q in (50, 90, 99)}
+            percentiles["max"] = float(latencies.max())
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "queue_depth": self.queue.qsize(),
+            "in_flight": self.in_flight,
+            "batches": len(sizes),
+            "mean_batch_size": float(sizes.mean()) if len(sizes) else 0.0,
+            "max_batch_size": int(sizes.max()) if len(sizes) else 0,
+            "latency_ms": percentiles,
+        }
+
+
+class PricingService:
+    # Service HTTP/1.1 minimal (JSON, connexions keep-alive) : POST /price, GET /stats, GET /health
+    def __init__(self, host="127.0.0.1", port=8765, workers=None, window=0.002, max_batch=512, steps=200,
+                 paths=10000, seed=None):
+        self.host = host
+        self.port = port
+        self.workers = os.cpu_count() if workers is None else workers
+        self.batcher_options = dict(window=window, max_batch=max_batch, steps=steps, paths=paths, seed=seed)
+        self.pool = None
+        self.batcher = None
+        self._server = None
+        self._collector = None
+        self._connections = {}
+
+    async def start(self):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 0 else None
+        self.batcher = MicroBatcher(self.pool, slots=max(self.workers, 1), **self.batcher_options)
+        self._collector = asyncio.create_task(self.batcher.run())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+        # Fermer les connexions keep-alive ouvertes : leurs handlers lisent EOF et se terminent proprement
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self._collector.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError as exc:
+                    # Flux désynchronisé après une requête illisible : réponse 400 puis fermeture
+                    _write_response(writer, 400, {"error": str(exc)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def _route(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if method == "GET" and path == "/stats":
+            return 200, self.batcher.stats()
+        if method != "POST" or path != "/price":
+            return 404, {"error": f"no route for {method} {path}"}
+        try:
+            payload = json.loads(body or b"null")
+            contracts = payload if isinstance(payload, list) else [payload]
+            rows = [validate(contract) for contract in contracts]
+        except (ValueError, TypeError) as exc:
+            return 400, {"error": str(exc)}
+        try:
+            results = await asyncio.gather(*(self.batcher.submit(row) for row in rows))
+        except Exception as exc:
+            return 500, {"error": repr(exc)}
+        return 200, results if isinstance(payload, list) else results[0]
+
+
+async def _read_request(reader):
+    # Ligne de requête ou en-têtes mal formés : ValueError, converti en 400 par le handler
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError("malformed request line")
+    method, path, _ = parts
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise ValueError("invalid Content-Length") from None
+    if length < 0:
+        raise ValueError("invalid Content-Length")
+    body = await reader.readexactly(length)
+    return method, path, headers, body
+
+
+def _write_response(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload).encode()
+    writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                 .encode() + body)
+
+
+class Client:
+    # Client keep-alive minimal, pour les tests sur localhost et le générateur de charge
+    def __init__(self, host="127.0.0.1", port=8765):
+        self.host = host
+        self.port = port
+        self._reader = self._writer = None
+
+    async def request(self, method, path, payload=None):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self._writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                           f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await self._writer.drain()
+        status_line = await self._reader.readline()
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        data = await self._reader.readexactly(int(headers.get("content-length", 0)))
+        return status, json.loads(data)
+
+    async def price(self, contract):
+        return await self.request("POST", "/price", contract)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+
+
+async def load_test(host, port, requests=2000, concurrency=64, engine="black_scholes", exercise="european", seed=0):
+    # `concurrency` connexions envoient chacune leurs requêtes en série ; contrats tirés autour de l'ATM
+    rng = np.random.default_rng(seed)
+    contracts = [{"S": 100.0, "K": float(K), "T": float(T), "r": 0.05, "sigma": float(sigma),
+                  "option_type": option_type, "engine": engine, "exercise": exercise}
+                 for K, T, sigma, option_type in zip(rng.uniform(80, 120, requests), rng.uniform(0.1, 2, requests),
+                                                     rng.uniform(0.1, 0.5, requests),
+                                                     rng.choice(["call", "put"], requests))]
+    latencies = []
+
+    async def worker(share):
+        client = Client(host, port)
+        try:
+            for contract in share:
+                start = time.perf_counter()
+                status, _ = await client.price(contract)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    raise RuntimeError(f"pricing request failed with status {status}")
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(contracts[i::concurrency]) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    client = Client(host, port)
+    _, server_stats = await client.request("GET", "/stats")
+    await client.close()
+    latencies = np.array(latencies) * 1000
+    return {"requests": requests, "elapsed": elapsed, "throughput": requests / elapsed,
+            "client_latency_ms": {f"p{q}": float(np.percentile(latencies, q)) for q in (50, 90, 99)},
+            "server": server_stats}
+
+
+async def _serve(args):
+    service = await PricingService(args.host, args.port, workers=args.workers, window=args.window_ms / 1000,
+                                   max_batch=args.max_batch, steps=args.steps, paths=args.paths, seed=args.seed).start()
+    print(f"Service de pricing sur http://{service.host}:{service.port} (POST /price, GET /stats, GET /health)")
+    try:
+        await service.serve_forever()
+    finally:
+        await service.stop()
+
+
+async def _demo(args):
+    # Serveur et générateur de charge dans le même processus, sur un port libre de localhost
+    service = await PricingService(args.host, 0, workers=args.workers, window=args.window_ms / 1000,
+                                   max_batch=args.max_batch, steps=args.steps, paths=args.paths, seed=args.seed).start()
+    try:
+        report = await load_test(service.host, service.port, args.requests, args.concurrency, args.engine, args.exercise)
+    finally:
+        await service.stop()
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service de pricing asynchrone avec micro-batching")
+    parser.add_argument("command", choices=("serve", "load", "demo"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="Processus pour l'arbre et Monte Carlo (0 : aucun)")
+    parser.add_argument("--window-ms", type=float, default=2.0, help="Fenêtre de regroupement des requêtes")
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--steps", type=int, default=200, help="Nombre de pas de l'arbre binomial")
+    parser.add_argument("--paths", type=int, default=10000, help="Nombre de trajectoires Monte Carlo")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--requests", type=int, default=2000, help="load/demo : nombre de requêtes")
+    parser.add_argument("--concurrency", type=int, default=64, help="load/demo : connexions simultanées")
+    parser.add_argument("--engine", choices=ENGINES, default="black_scholes", help="load/demo : moteur demandé")
+    parser.add_argument("--exercise", choices=("european", "american"), default="european")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        asyncio.run(_serve(args))
+    elif args.command == "load":
+        print(json.dumps(asyncio.run(load_test(args.host, args.port, args.requests, args.concurrency, args.engine,
+                                               args.exercise)), indent=2))
+    else:
+        asyncio.run(_demo(args))
+
+
+if __name__ == "__main__":
+    main()
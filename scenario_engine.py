@@ -0,0 +1,188 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from black_scholes import black_scholes_batch
+from binomial_tree import BinomialLattice
+from batch_pricer import DEFAULTS, ENGINES, read_positions
+from contracts import ContractBook
+import instrumentation
+
+SIGMA_FLOOR = 1e-4
+DEFAULT_SPOT_SHOCKS = np.linspace(-0.2, 0.2, 9)
+DEFAULT_VOL_SHOCKS = np.array([-0.1, -0.05, 0.0, 0.05, 0.1])
+DEFAULT_RATE_SHOCKS = np.array([-0.01, 0.0, 0.01])
+
+
+def black_scholes_scenarios(S, K, T, r, sigma, is_call, spot_shocks, vol_shocks, rate_shocks):
+    # Une seule évaluation broadcastée : (positions, chocs spot, chocs vol, chocs taux)
+    column = lambda x: np.asarray(x, dtype=np.float64)[:, None, None, None]
+    return black_scholes_batch(column(S) * (1 + spot_shocks)[:, None, None], column(K), column(T),
+                               column(r) + rate_shocks, np.maximum(column(sigma) + vol_shocks[:, None], SIGMA_FLOOR),
+                               np.asarray(is_call)[:, None, None, None])["price"]
+
+
+def binomial_scenarios(S, K, T, r, sigma, is_call, american, spot_shocks, vol_shocks, rate_shocks, N=200):
+    # L'arbre CRR est homogène en S : V(S, K) = S * V(1, K / S). Un seul arbre normalisé par
+    # (T, sigma choquée, r choqué) évalue toutes les positions du groupe et tous les chocs spot,
+    # chaque couple (position, choc spot) devenant un strike K / S'.
+    values = np.empty((len(S), len(spot_shocks), len(vol_shocks), len(rate_shocks)))
+    spots = S[:, None] * (1 + spot_shocks)
+    groups = pd.DataFrame({"T": T, "r": r, "sigma": sigma}).groupby(["T", "r", "sigma"]).indices
+    for (T_value, r_value, sigma_value), rows in groups.items():
+        strikes = K[rows, None] / spots[rows]
+        for j, vol_shock in enumerate(vol_shocks):
+            for k, rate_shock in enumerate(rate_shocks):
+                lattice = BinomialLattice(1.0, T_value, r_value + rate_shock, max(sigma_value + vol_shock, SIGMA_FLOOR), N)
+                for option_type, style in (("call", False), ("call", True), ("put", False), ("put", True)):
+                    subset = (is_call[rows] == (option_type == "call")) & (american[rows] == style)
+                    if subset.any():
+                        prices = lattice.price(strikes[subset].ravel(), option_type, american=style)[option_type]
+                        values[rows[subset], :, j, k] = spots[rows[subset]] * prices.reshape(-1, len(spot_shocks))
+    return values
+
+
+def monte_carlo_scenarios(S, K, T, r, sigma, is_call, spot_shocks, vol_shocks, rate_shocks, simulations=10000,
+                          seed=None):
+    # Les mêmes tirages normaux pour toutes les positions et tous les scénarios (nombres aléatoires
+    # communs) : le P&L entre scénarios ne contient pas de bruit de tirage. Comme pour l'arbre, le
+    # payoff est homogène en S : par (T, r, sigma) et par choc vol x taux, les facteurs S_T / S sont
+    # triés une fois, puis chaque couple (position, choc spot) devient un strike K / S' lu par
+    # recherche dichotomique dans les sommes cumulées. Aucune boucle sur les positions.
+    Z = np.random.default_rng(seed).standard_normal(simulations)
+    instrumentation.count("monte_carlo.paths", simulations)
+    values = np.empty((len(S), len(spot_shocks), len(vol_shocks), len(rate_shocks)))
+    spots = S[:, None] * (1 + spot_shocks)
+    groups = pd.DataFrame({"T": T, "r": r, "sigma": sigma}).groupby(["T", "r", "sigma"]).indices
+    for (T_value, r_value, sigma_value), rows in groups.items():
+        strikes = K[rows, None] / spots[rows]
+        calls = is_call[rows, None]
+        for j, vol_shock in enumerate(vol_shocks):
+            vol = max(sigma_value + vol_shock, SIGMA_FLOOR)
+            for k, rate_shock in enumerate(rate_shocks):
+                rate = r_value + rate_shock
+                growth = np.sort(np.exp((rate - 0.5 * vol ** 2) * T_value + vol * np.sqrt(T_value) * Z))
+                partial = np.concatenate(([0.0], np.cumsum(growth)))
+                below = np.searchsorted(growth, strikes, side="right")
+                call = partial[-1] - partial[below] - strikes * (simulations - below)
+                put = strikes * below - partial[below]
+                values[rows, :, j, k] = np.exp(-rate * T_value) * spots[rows] * np.where(calls, call, put) / simulations
+    return values
+
+
+def _engine_values(engine, book, spot_shocks, vol_shocks, rate_shocks, steps, paths, seed):
+    S, K, T, r, sigma = (book[c] for c in ("S", "K", "T", "r", "sigma"))
+    if engine == "black_scholes":
+        return black_scholes_scenarios(S, K, T, r, sigma, book["is_call"], spot_shocks, vol_shocks, rate_shocks)
+    if engine == "binomial":
+        return binomial_scenarios(S, K, T, r, sigma, book["is_call"], book["american"], spot_shocks, vol_shocks,
+                                  rate_shocks, N=steps)
+    return monte_carlo_scenarios(S, K, T, r, sigma, book["is_call"], spot_shocks, vol_shocks, rate_shocks,
+                                 simulations=paths, seed=seed)
+
+
+def stress_grid(positions, spot_shocks=DEFAULT_SPOT_SHOCKS, vol_shocks=DEFAULT_VOL_SHOCKS,
+                rate_shocks=DEFAULT_RATE_SHOCKS, steps=200, paths=10000, seed=None, by_position=False, block=20000,
+                engine=DEFAULTS["engine"]):
+    # P&L du book sur la grille spot (relatif) x vol (absolu) x taux (absolu). La valeur de base est
+    # calculée par le même moteur, avec le même arbre ou les mêmes tirages : P&L nul au choc nul.
+    # Les positions américaines sont évaluées par l'arbre, y compris celles marquées monte_carlo
+    # (Longstaff-Schwartz par scénario serait hors de prix) ou black_scholes. Les positions
+    # finite_difference passent aussi par l'arbre : une résolution Crank-Nicolson par position et par
+    # scénario coûterait des ordres de grandeur de plus pour le même prix limite.
+    spot_shocks, vol_shocks, rate_shocks = (np.atleast_1d(np.asarray(x, dtype=np.float64))
+                                            for x in (spot_shocks, vol_shocks, rate_shocks))
+    # Une graine concrète pour tout l'appel : base et scénarios de tous les blocs partagent les tirages
+    seed = np.random.SeedSequence().entropy if seed is None else seed
+    if isinstance(positions, ContractBook):
+        # Un ContractBook ne porte pas de colonne engine : engine s'applique à tout le book
+        book = positions
+        engine = np.full(len(book), engine)
+    else:
+        frame = positions.copy() if isinstance(positions, pd.DataFrame) else pd.DataFrame(positions)
+        for column, default in DEFAULTS.items():
+            if column not in frame:
+                frame[column] = default
+        book = ContractBook.from_frame(frame)
+        engine = frame["engine"].str.lower().to_numpy()
+    unknown = set(np.unique(engine)) - set(ENGINES)
+    if unknown:
+        raise ValueError(f"engine must be one of {ENGINES}, got {sorted(unknown)}")
+    american = np.asarray(book.american)
+    engine = np.where(american | (engine == "finite_difference"), "binomial", engine)
+    quantity = np.asarray(book.quantity)
+    columns = {c: np.asarray(values) for c, values in book.arrays().items()}
+    columns["american"] = american
+
+    shape = (len(spot_shocks), len(vol_shocks), len(rate_shocks))
+    zero = np.zeros(1)
+    pnl = np.zeros(shape)
+    by_engine = {}
+    base_value = 0.0
+    per_position = np.zeros((len(book),) + shape, dtype=np.float32) if by_position else None
+    start = time.perf_counter()
+    for name in ENGINES:
+        rows = np.flatnonzero(engine == name)
+        for first in range(0, len(rows), block):
+            chunk = rows[first:first + block]
+            subset = {c: column[chunk] for c, column in columns.items()}
+            values = _engine_values(name, subset, spot_shocks, vol_shocks, rate_shocks, steps, paths, seed)
+            base = _engine_values(name, subset, zero, zero, zero, steps, paths, seed)[:, 0, 0, 0]
+            position_pnl = quantity[chunk, None, None, None] * (values - base[:, None, None, None])
+            cube = position_pnl.sum(axis=0)
+            by_engine[name] = by_engine.get(name, 0.0) + cube
+            pnl += cube
+            base_value += float(quantity[chunk] @ base)
+            if by_position:
+                per_position[chunk] = position_pnl
+    result = {
+        "spot_shocks": spot_shocks,
+        "vol_shocks": vol_shocks,
+        "rate_shocks": rate_shocks,
+        "pnl": pnl,
+        "by_engine": by_engine,
+        "base_value": base_value,
+        "elapsed": time.perf_counter() - start,
+    }
+    if by_position:
+        result["by_position"] = per_position
+    return result
+
+
+def worst_scenarios(result, count=5):
+    order = np.argsort(result["pnl"], axis=None)[:count]
+    return [{"spot_shock": float(result["spot_shocks"][i]), "vol_shock": float(result["vol_shocks"][j]),
+             "rate_shock": float(result["rate_shocks"][k]), "pnl": float(result["pnl"][i, j, k])}
+            for i, j, k in zip(*np.unravel_index(order, result["pnl"].shape))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grille de stress spot x vol x taux d'un book d'options")
+    parser.add_argument("input", help="Fichier de positions (.csv ou .parquet), mêmes colonnes que batch_pricer")
+    parser.add_argument("output", help="Cube de P&L compressé (.npz)")
+    parser.add_argument("--spot-shocks", type=float, nargs="+", default=list(DEFAULT_SPOT_SHOCKS))
+    parser.add_argument("--vol-shocks", type=float, nargs="+", default=list(DEFAULT_VOL_SHOCKS))
+    parser.add_argument("--rate-shocks", type=float, nargs="+", default=list(DEFAULT_RATE_SHOCKS))
+    parser.add_argument("--steps", type=int, default=200, help="Nombre de pas de l'arbre binomial")
+    parser.add_argument("--paths", type=int, default=10000, help="Nombre de trajectoires Monte Carlo")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--by-position", action="store_true", help="Conserve aussi le cube par position (float32)")
+    args = parser.parse_args()
+
+    positions = pd.concat(read_positions(args.input, 100000), ignore_index=True)
+    result = stress_grid(positions, args.spot_shocks, args.vol_shocks, args.rate_shocks, steps=args.steps,
+                         paths=args.paths, seed=args.seed, by_position=args.by_position)
+    arrays = {k: v for k, v in result.items() if isinstance(v, np.ndarray)}
+    arrays.update({f"pnl_{engine}": cube for engine, cube in result["by_engine"].items()})
+    np.savez_compressed(args.output, base_value=result["base_value"], **arrays)
+    print(f"{len(positions)} positions, {result['pnl'].size} scénarios en {result['elapsed']:.2f} s "
+          f"(valeur de base {result['base_value']:.2f})")
+    print("Pires scénarios :")
+    for scenario in worst_scenarios(result):
+        print(f"  spot {scenario['spot_shock']:+.1%}, vol {scenario['vol_shock']:+.2f}, taux {scenario['rate_shock']:+.3f} : "
+              f"{scenario['pnl']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+import pandas as pd
+import pytest
+
+from batch_pricer import price_chunk
+from black_scholes import BlackScholes
+
+
+@pytest.mark.parametrize("engine", ["binomial", "finite_difference"])
+def test_every_contract_engine_is_accepted(engine):
+    chunk = pd.DataFrame({"S": [100.0], "K": [105.0], "T": [0.5], "r": [0.05], "sigma": [0.2], "option_type": ["call"],
+                          "engine": [engine]})
+    priced = price_chunk(chunk)
+    assert priced["price"].iloc[0] == pytest.approx(BlackScholes(100.0, 105.0, 0.5, 0.05, 0.2).price(), abs=2e-2)
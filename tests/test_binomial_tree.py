@@ -0,0 +1,91 @@
+import pytest
+
+from binomial_tree import BinomialTree
+from black_scholes import BlackScholes
+
+S, K, T, R, SIGMA = 100.0, 105.0, 0.5, 0.05, 0.2
+
+
+@pytest.mark.parametrize("method", ["crr", "leisen_reimer"])
+@pytest.mark.parametrize("option_type", ["call", "put"])
+def test_lattice_theta_matches_black_scholes(method, option_type):
+    # Leisen-Reimer : u * d != 1, le noeud central du pas 2 n'est pas au spot
+    tree = BinomialTree(S, K, T, R, SIGMA, N=201, option_type=option_type, method=method)
+    assert tree.theta() == pytest.approx(BlackScholes(S, K, T, R, SIGMA, option_type).theta(), abs=1e-4)
+
+
+@pytest.mark.parametrize("option_type", ["call", "put"])
+def test_leisen_reimer_converges_to_black_scholes(option_type):
+    tree = BinomialTree(S, K, T, R, SIGMA, N=201, option_type=option_type, method="leisen_reimer")
+    assert tree.price() == pytest.approx(BlackScholes(S, K, T, R, SIGMA, option_type).price(), abs=1e-4)
+
+
+def test_shared_lattice_matches_single_trees():
+    import numpy as np
+    from binomial_tree import BinomialLattice
+
+    strikes = np.array([90.0, 100.0, 110.0])
+    lattice = BinomialLattice(S, T, R, SIGMA, 200).price(strikes, ("call", "put"), american=True)
+    for option_type, prices in lattice.items():
+        expected = [BinomialTree(S, k, T, R, SIGMA, N=200, option_type=option_type, american=True).price() for k in strikes]
+        np.testing.assert_allclose(prices, expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("method", ["crr", "bbs"])
+@pytest.mark.parametrize("N", [200, 201, 202, 203])
+def test_richardson_improves_on_odd_and_even_steps(method, N):
+    # Le pas grossier garde la parité de N : même branche d'oscillation que l'arbre fin
+    exact = BlackScholes(100.0, 100.0, 1.0, R, SIGMA).price()
+    plain = BinomialTree(100.0, 100.0, 1.0, R, SIGMA, N=N, method=method).price()
+    extrapolated = BinomialTree(100.0, 100.0, 1.0, R, SIGMA, N=N, method=method, richardson=True).price()
+    assert abs(extrapolated - exact) < abs(plain - exact)
+    assert extrapolated == pytest.approx(exact, abs=1e-4)
+
+
+def test_in_place_roll_back_converges_to_black_scholes():
+    import numpy as np
+    from binomial_tree import roll_back
+
+    strikes = np.array([90.0, 100.0, 110.0])
+    is_call = np.array([True, False, True])
+    rolled = roll_back(S, strikes, T / 1000, R, SIGMA, is_call, 1000)
+    expected = [BlackScholes(S, k, T, R, SIGMA, "call" if c else "put").price() for k, c in zip(strikes, is_call)]
+    np.testing.assert_allclose(rolled, expected, atol=2e-3)
+    # Chaque ligne du lot est l'arbre qu'on obtiendrait seul
+    single = [roll_back(S, k, T / 1000, R, SIGMA, c, 1000)[0] for k, c in zip(strikes, is_call)]
+    np.testing.assert_allclose(rolled, single, rtol=1e-13)
+
+
+def test_american_put_is_worth_at_least_the_european_put():
+    european = BinomialTree(S, K, T, R, SIGMA, N=500, option_type="put").price()
+    american = BinomialTree(S, K, T, R, SIGMA, N=500, option_type="put", american=True).price()
+    assert american > european
+    assert american >= K - S
+
+
+@pytest.mark.parametrize("option_type", ["call", "put"])
+def test_lattice_greeks_match_black_scholes(option_type):
+    # Delta, gamma et theta lus sur les noeuds d'une seule induction
+    tree = BinomialTree(S, K, T, R, SIGMA, N=500, option_type=option_type)
+    model = BlackScholes(S, K, T, R, SIGMA, option_type)
+    assert tree.delta() == pytest.approx(model.delta(), abs=5e-4)
+    assert tree.gamma() == pytest.approx(model.gamma(), abs=1e-4)
+    assert tree.theta() == pytest.approx(model.theta(), abs=5e-5)
+    assert tree.vega() == pytest.approx(model.vega(), abs=2e-3)
+    assert tree.rho() == pytest.approx(model.rho(), abs=2e-3)
+
+
+GRID_TOLERANCES = dict(price=1e-2, delta=2e-3, gamma=2e-3, vega=1e-2, theta=2e-4, rho=5e-3)
+
+
+def test_evaluate_grid_matches_pointwise_trees():
+    # Arbre étendu partagé puis interpolation en log(S) : proche d'un arbre par point
+    import numpy as np
+
+    tree = BinomialTree(100.0, 100.0, 0.5, R, SIGMA, N=200, option_type="put", american=True)
+    spots, vols = np.linspace(80.0, 120.0, 9), np.array([0.15, 0.25])
+    grid = tree.evaluate_grid(S=spots[:, None], sigma=vols[None, :])
+    for greek, tolerance in GRID_TOLERANCES.items():
+        expected = [[getattr(BinomialTree(s, 100.0, 0.5, R, v, N=200, option_type="put", american=True), greek)()
+                     for v in vols] for s in spots]
+        np.testing.assert_allclose(grid[greek], expected, atol=tolerance, err_msg=greek)
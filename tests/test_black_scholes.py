@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from black_scholes import BlackScholes, black_scholes_batch
+
+
+@pytest.mark.parametrize("K", [80.0, 100.0, 125.0])
+def test_put_call_parity(K):
+    S, T, r, sigma = 100.0, 0.75, 0.03, 0.25
+    call = BlackScholes(S, K, T, r, sigma, "call").price()
+    put = BlackScholes(S, K, T, r, sigma, "put").price()
+    assert call - put == pytest.approx(S - K * np.exp(-r * T), abs=1e-10)
+
+
+def test_batch_matches_scalar_model():
+    K = np.array([90.0, 100.0, 110.0])
+    batch = black_scholes_batch(100.0, K, 0.5, 0.05, 0.2, np.array([True, False, True]))["price"]
+    scalar = [BlackScholes(100.0, k, 0.5, 0.05, 0.2, t).price() for k, t in zip(K, ("call", "put", "call"))]
+    np.testing.assert_allclose(batch, scalar, rtol=1e-12)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from binomial_tree import BinomialTree
+from black_scholes import BlackScholes
+from contracts import GREEKS, ContractBook
+from finite_difference import FiniteDifference
+from monte_carlo import MonteCarlo
+
+
+def _book():
+    return ContractBook(100.0, [90.0, 100.0, 110.0], 0.5, 0.03, 0.25, option_type=["call", "put", "put"],
+                        american=[False, False, True])
+
+
+def _single(view, engine, options):
+    contract = dict(S=view.S, K=view.K, T=view.T, r=view.r, sigma=view.sigma, option_type=view.option_type)
+    if engine is BlackScholes and not view.american:
+        return BlackScholes(**contract)
+    if engine is BlackScholes:
+        # Black-Scholes n'exerce pas par anticipation : les lignes américaines passent par l'arbre
+        return BinomialTree(**contract, N=200, american=True)
+    return engine(**contract, american=view.american, **options)
+
+
+@pytest.mark.parametrize("engine, options", [
+    (BlackScholes, {}),
+    (BinomialTree, dict(N=100)),
+    (MonteCarlo, dict(simulations=2000, seed=5)),
+    (FiniteDifference, {}),
+])
+def test_engines_accept_a_book(engine, options):
+    book = _book()
+    results = engine.evaluate_book(book, **options)
+    for i, view in enumerate(book):
+        model = _single(view, engine, options)
+        for greek in GREEKS:
+            assert results[greek][i] == pytest.approx(getattr(model, greek)(), rel=1e-9, abs=1e-12), (i, greek)
+
+
+def test_saved_book_is_memory_mapped_per_column(tmp_path):
+    book = _book()
+    loaded = ContractBook.load(book.save(str(tmp_path / "book")))
+    assert isinstance(loaded.K, np.memmap)
+    assert len(loaded) == 3 and loaded.nbytes == book.nbytes == 3 * 50
+    assert loaded[2].american and loaded[1].option_type == "put"
+    np.testing.assert_array_equal(loaded.to_frame(), book.to_frame())
+
+
+def test_mismatched_columns_are_rejected():
+    columns = dict(_book().columns, K=np.ones(2))
+    with pytest.raises(ValueError):
+        ContractBook.from_columns(columns)
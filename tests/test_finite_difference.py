@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from black_scholes import BlackScholes
+from finite_difference import FiniteDifference
+
+S, K, T, R, SIGMA = 100.0, 105.0, 0.5, 0.05, 0.2
+
+
+@pytest.mark.parametrize("option_type", ["call", "put"])
+def test_crank_nicolson_matches_black_scholes(option_type):
+    model = FiniteDifference(S, K, T, R, SIGMA, option_type=option_type)
+    assert model.price() == pytest.approx(BlackScholes(S, K, T, R, SIGMA, option_type).price(), abs=1e-3)
+
+
+def test_american_grid_prices_never_fall_below_intrinsic():
+    model = FiniteDifference(S, K, T, R, SIGMA, option_type="put", american=True, space_steps=60, time_steps=50)
+    spots = np.linspace(40.0, 160.0, 301)
+    prices = model.evaluate_grid(S=spots)["price"]
+    assert np.all(prices >= np.maximum(K - spots, 0.0))
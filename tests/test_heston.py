@@ -0,0 +1,14 @@
+import numpy as np
+import pytest
+
+from black_scholes import black_scholes_batch
+from heston import cos_prices
+
+
+@pytest.mark.parametrize("is_call", [True, False])
+def test_cos_reduces_to_black_scholes_without_vol_of_vol(is_call):
+    # xi -> 0 et v0 = theta : variance constante, le modèle de Heston redevient Black-Scholes
+    S, T, r, sigma = 100.0, 0.5, 0.05, 0.2
+    strikes = np.array([80.0, 95.0, 105.0, 120.0])
+    heston = cos_prices(S, strikes, T, r, sigma ** 2, 1.0, sigma ** 2, 1e-5, -0.5, is_call=is_call)
+    np.testing.assert_allclose(heston, black_scholes_batch(S, strikes, T, r, sigma, is_call)["price"], atol=1e-4)
@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from binomial_tree import BinomialTree
+from implied_volatility import american_implied_volatility
+
+K = np.linspace(80.0, 120.0, 9)
+VOLS = np.linspace(0.15, 0.45, 9)
+
+
+@pytest.mark.parametrize("option_type", ["call", "put"])
+def test_american_implied_volatility_inverts_the_tree(option_type):
+    prices = [BinomialTree(100.0, k, 0.5, 0.05, v, N=200, option_type=option_type, american=True).price()
+              for k, v in zip(K, VOLS)]
+    np.testing.assert_allclose(american_implied_volatility(prices, 100.0, K, 0.5, 0.05, option_type), VOLS, atol=1e-5)
+
+
+def test_unreachable_quotes_are_nan():
+    vols = american_implied_volatility([0.0, 200.0, 5.0], 100.0, 100.0, 0.5, 0.05, "put")
+    assert np.isnan(vols[:2]).all() and np.isfinite(vols[2])
@@ -0,0 +1,16 @@
+import numpy as np
+
+from black_scholes import BlackScholes
+from incremental_pricer import IncrementalBook
+
+
+def test_add_many_matches_repeated_add():
+    models = [BlackScholes(100.0, K, 0.5, 0.03, 0.2, option_type) for K in range(80, 121, 5) for option_type in ("call", "put")]
+    one_by_one, bulk = IncrementalBook(clock=lambda: 0.0), IncrementalBook(clock=lambda: 0.0)
+    for i, model in enumerate(models):
+        one_by_one.add(i, model, quantity=i, underlying="XYZ")
+    bulk.add_many(range(len(models)), models, quantities=range(len(models)), underlyings=["XYZ"] * len(models))
+    assert np.array_equal(one_by_one.greeks, bulk.greeks)
+    market = {"XYZ": {"S": 101.0, "sigma": 0.21}}
+    assert np.allclose(one_by_one.revalue(market, now=10.0)["price"], bulk.revalue(market, now=10.0)["price"])
+    assert len(bulk.quantity) == len(models)
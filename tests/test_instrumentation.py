@@ -0,0 +1,41 @@
+import threading
+
+import instrumentation
+
+
+def _session(results, name, reset_midway=None):
+    collector = instrumentation.Collector(enabled=True)
+    instrumentation.use(collector)
+    instrumentation.count(name)
+    if reset_midway is not None:
+        reset_midway.wait()
+    instrumentation.count(name)
+    results[name] = instrumentation.snapshot()["counters"]
+
+
+def test_sessions_do_not_share_state():
+    results, barrier = {}, threading.Barrier(2)
+    threads = [threading.Thread(target=_session, args=(results, name, barrier)) for name in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {"a": {"a": 2}, "b": {"b": 2}}
+
+
+def test_concurrent_profiling_is_serialised():
+    first = instrumentation.capture(profile=True).start()
+    second = instrumentation.capture(profile=True).start()
+    assert "capture_skipped" in second.stop()
+    assert "profile" in first.stop()
+
+
+def test_interrupted_capture_releases_the_profiler():
+    # Un rerun Streamlit interrompu lève une exception au milieu du bloc profilé
+    try:
+        with instrumentation.capture(profile=True, memory=True):
+            raise RuntimeError("rerun")
+    except RuntimeError:
+        pass
+    follower = instrumentation.capture(profile=True).start()
+    assert "profile" in follower.stop()
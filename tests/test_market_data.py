@@ -0,0 +1,15 @@
+from market_data import FakeProvider, MarketDataLoader
+
+
+def test_snapshot_keeps_spot_and_expiry_errors_apart():
+    snapshot = MarketDataLoader(FakeProvider(spots={"AAPL": 190.0}), max_workers=2).snapshot(["AAPL", "NOPE"])
+    assert snapshot.spots == {"AAPL": 190.0}
+    assert set(snapshot.errors) == {("NOPE", "spot"), ("NOPE", "expiries")}
+    assert set(snapshot.chains["ticker"]) == {"AAPL"}
+    assert snapshot.rates == {"risk_free": 0.05}
+
+
+def test_chain_errors_are_keyed_by_expiry():
+    provider = FakeProvider(spots={"AAPL": 190.0})
+    _, errors = MarketDataLoader(provider).fetch_chains(["AAPL", "NOPE"], expiries=provider._expiries[:1])
+    assert list(errors) == [("NOPE", provider._expiries[0])]
@@ -0,0 +1,70 @@
+import pytest
+
+from black_scholes import BlackScholes
+from monte_carlo import MonteCarlo
+
+S, K, T, R, SIGMA = 100.0, 100.0, 1.0, 0.05, 0.2
+
+
+@pytest.mark.parametrize("option_type", ["call", "put"])
+def test_control_variate_reduces_error_without_collapsing(option_type):
+    plain = MonteCarlo(S, K, T, R, SIGMA, simulations=50000, option_type=option_type, seed=1).price_with_error()
+    price, error = MonteCarlo(S, K, T, R, SIGMA, simulations=50000, option_type=option_type,
+                              variance_reduction="control_variate", seed=1).price_with_error()
+    assert 0 < error < plain[1]
+    assert price == pytest.approx(BlackScholes(S, K, T, R, SIGMA, option_type).price(), abs=4 * error)
+
+
+@pytest.mark.parametrize("sequence", ["sobol", "halton"])
+def test_qmc_streaming_waits_for_enough_replications(sequence):
+    from monte_carlo import MIN_QMC_REPLICATIONS
+
+    model = MonteCarlo(S, K, T, R, SIGMA, variance_reduction=sequence, seed=3)
+    result = model.price_streaming(chunk_size=1024, target_error=10.0)
+    assert result["paths"] >= MIN_QMC_REPLICATIONS * 1024
+
+
+def test_unseeded_qmc_and_lsm_draw_valid_seeds():
+    sobol = MonteCarlo(S, K, T, R, SIGMA, simulations=4096, variance_reduction="sobol").price()
+    american = MonteCarlo(S, K, T, R, SIGMA, simulations=4000, option_type="put", american=True)
+    assert sobol == pytest.approx(BlackScholes(S, K, T, R, SIGMA).price(), abs=0.1)
+    assert american.price() > BlackScholes(S, K, T, R, SIGMA, "put").price() - 0.2
+    assert american._lsm_seed_value() == american._lsm_seed_value()
+
+
+@pytest.mark.parametrize("method", ["price_streaming", "price_parallel"])
+def test_chunked_modes_refuse_american_options(method):
+    model = MonteCarlo(S, K, T, R, SIGMA, simulations=1000, option_type="put", american=True, seed=1)
+    with pytest.raises(ValueError):
+        getattr(model, method)()
+
+
+TOLERANCES = dict(price=0.05, delta=3e-3, gamma=5e-4, vega=3e-3, theta=3e-4, rho=3e-3)
+
+
+@pytest.mark.parametrize("greek_method", ["pathwise", "bump"])
+@pytest.mark.parametrize("option_type", ["call", "put"])
+def test_greeks_match_closed_form(greek_method, option_type):
+    # Pathwise (delta, vega, rho, theta) et vraisemblance (gamma), ou bumps sur les mêmes tirages
+    greeks = MonteCarlo(S, 105.0, 0.5, R, SIGMA, simulations=200_000, option_type=option_type,
+                        greek_method=greek_method, seed=11).greeks()
+    model = BlackScholes(S, 105.0, 0.5, R, SIGMA, option_type)
+    for greek, tolerance in TOLERANCES.items():
+        assert greeks[greek] == pytest.approx(getattr(model, greek)(), abs=tolerance), greek
+
+
+def test_bumped_scenarios_share_the_cached_draws():
+    model = MonteCarlo(S, K, T, R, SIGMA, simulations=10_000, greek_method="bump")
+    draws = model.normals()
+    model.greeks()
+    assert model.normals() is draws
+
+
+def test_parallel_result_does_not_depend_on_worker_count():
+    model = MonteCarlo(S, K, T, R, SIGMA, simulations=40_000, seed=21)
+    results = [model.price_parallel(workers=workers, chunk_size=10_000) for workers in (1, 2, 3)]
+    for result in results[1:]:
+        assert result["price"] == results[0]["price"]
+        assert result["standard_errors"] == results[0]["standard_errors"]
+    assert results[0]["paths"] == 40_000
+    assert results[0]["price"] == pytest.approx(BlackScholes(S, K, T, R, SIGMA).price(), abs=4 * results[0]["standard_errors"]["price"])
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from monte_carlo import brownian_bridge
+from path_monte_carlo import AsianPayoff, PathMonteCarlo
+
+
+def test_brownian_bridge_has_brownian_covariance():
+    T, steps = 2.0, 8
+    W = brownian_bridge(np.random.default_rng(0).standard_normal((200_000, steps)), T)
+    times = T * np.arange(1, steps + 1) / steps
+    np.testing.assert_allclose(np.cov(W, rowvar=False), np.minimum.outer(times, times), atol=0.03)
+
+
+@pytest.mark.parametrize("sequence", ["sobol", "halton"])
+def test_quasi_random_paths_agree_with_plain_monte_carlo(sequence):
+    plain = PathMonteCarlo(100.0, 1.0, 0.05, 0.2, AsianPayoff(100.0), steps=32, simulations=50_000, seed=1)
+    quasi = PathMonteCarlo(100.0, 1.0, 0.05, 0.2, AsianPayoff(100.0), steps=32, simulations=16_384,
+                           variance_reduction=sequence, seed=1)
+    price, error = plain.price_with_error()
+    quasi_price, quasi_error = quasi.price_with_error()
+    assert quasi_price == pytest.approx(price, abs=4 * error)
+    assert quasi_error < error / 3
+
+
+def test_parallel_paths_do_not_depend_on_worker_count():
+    model = PathMonteCarlo(100.0, 1.0, 0.05, 0.2, AsianPayoff(100.0), steps=16, simulations=20_000, seed=4)
+    results = [model.price_parallel(workers=workers, chunk_size=5_000) for workers in (1, 2)]
+    assert results[0]["price"] == results[1]["price"]
+    assert results[0]["standard_error"] == results[1]["standard_error"]
+
+
+def _vanilla(K=100.0):
+    from black_scholes import BlackScholes
+    return BlackScholes(100.0, K, 1.0, 0.05, 0.2).price()
+
+
+def _engine(payoff, steps=1, seed=3):
+    return PathMonteCarlo(100.0, 1.0, 0.05, 0.2, payoff, steps=steps, simulations=200_000, seed=seed)
+
+
+def test_single_step_asian_is_european():
+    price, error = _engine(AsianPayoff(100.0)).price_with_error()
+    assert price == pytest.approx(_vanilla(), abs=4 * error)
+
+
+def test_single_step_floating_lookback_is_at_the_money_call():
+    # max(S_T - min(S_0, S_T), 0) = max(S_T - S_0, 0)
+    from path_monte_carlo import LookbackPayoff
+
+    price, error = _engine(LookbackPayoff()).price_with_error()
+    assert price == pytest.approx(_vanilla(100.0), abs=4 * error)
+
+
+def test_unreachable_barrier_leaves_the_vanilla_and_in_plus_out_is_vanilla():
+    from path_monte_carlo import BarrierPayoff
+
+    out_price, error = _engine(BarrierPayoff(100.0, 1e9, "up-and-out"), steps=12).price_with_error()
+    assert out_price == pytest.approx(_vanilla(), abs=4 * error)
+    # Mêmes tirages : knock-in + knock-out = vanille, trajectoire par trajectoire
+    knock_in = _engine(BarrierPayoff(100.0, 120.0, "up-and-in"), steps=12).price()
+    knock_out = _engine(BarrierPayoff(100.0, 120.0, "up-and-out"), steps=12).price()
+    vanilla = _engine(BarrierPayoff(100.0, 1e9, "up-and-out"), steps=12).price()
+    assert knock_in + knock_out == pytest.approx(vanilla, rel=1e-12)
@@ -0,0 +1,30 @@
+import pytest
+
+from monte_carlo import MonteCarlo
+from pricing_cache import model_key
+
+BASE = dict(S=100.0, K=100.0, T=1.0, r=0.05, sigma=0.2, simulations=1000, seed=1)
+
+
+@pytest.mark.parametrize("option", [dict(greek_method="bump"), dict(qmc_replications=8), dict(variance_reduction="sobol"),
+                                    dict(american=True, basis_degree=2), dict(american=True, exercise_dates=10)])
+def test_result_affecting_options_change_the_key(option):
+    reference = dict(BASE, american=option.get("american", False))
+    assert model_key(MonteCarlo(**reference)) != model_key(MonteCarlo(**BASE, **option))
+
+
+def test_identical_models_share_a_key():
+    assert model_key(MonteCarlo(**BASE)) == model_key(MonteCarlo(**BASE))
+
+
+def test_disk_tier_is_thread_safe(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from pricing_cache import PricingCache
+
+    cache = PricingCache(maxsize=4, disk_path=str(tmp_path / "cache"))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: cache.put(("key", i), i), range(200)))
+        values = list(pool.map(lambda i: cache.get(("key", i)), range(200)))
+    cache.close()
+    assert values == list(range(200))
+    assert PricingCache(maxsize=4, disk_path=str(tmp_path / "cache")).get(("key", 0)) == 0
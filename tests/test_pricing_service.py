@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+import pytest
+
+from pricing_service import PricingService, validate
+
+
+def test_validate_rejects_non_finite_inputs():
+    with pytest.raises(ValueError):
+        validate({"S": float("nan"), "K": 100, "T": 1, "r": 0.05, "sigma": 0.2})
+    with pytest.raises(ValueError):
+        validate({"S": 100, "K": 100, "T": 1, "r": float("inf"), "sigma": 0.2})
+
+
+async def _raw(port, data):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+NAN_BODY = b'{"S": NaN, "K": 100, "T": 1, "r": 0.05, "sigma": 0.2}'
+
+
+@pytest.mark.parametrize("data", [b"GARBAGE\r\n\r\n",
+                                  b"POST /price HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+                                  b"POST /price HTTP/1.1\r\nConnection: close\r\nContent-Length: %d\r\n\r\n%s"
+                                  % (len(NAN_BODY), NAN_BODY)])
+def test_bad_requests_get_400(data):
+    async def scenario():
+        service = await PricingService(port=0, workers=0).start()
+        try:
+            return await _raw(service.port, data)
+        finally:
+            await service.stop()
+    response = asyncio.run(asyncio.wait_for(scenario(), 10))
+    assert response.startswith(b"HTTP/1.1 400")
+    json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+def test_heavy_batches_do_not_block_the_event_loop_without_workers():
+    from pricing_service import MicroBatcher
+
+    async def scenario():
+        batcher = MicroBatcher(None, steps=4000)
+        runner = asyncio.create_task(batcher.run())
+        row = validate({"S": 100, "K": 100, "T": 1, "r": 0.05, "sigma": 0.2, "option_type": "put",
+                        "engine": "binomial", "exercise": "american"})
+        heavy = asyncio.create_task(batcher.submit(row))
+        ticks = 0
+        while not heavy.done():
+            await asyncio.sleep(0.005)
+            ticks += 1
+        runner.cancel()
+        return heavy.result(), ticks
+    result, ticks = asyncio.run(asyncio.wait_for(scenario(), 30))
+    assert result["price"] > 0
+    # La boucle a continué à tourner pendant le calcul de l'arbre
+    assert ticks > 5
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from contracts import ContractBook
+from scenario_engine import stress_grid
+
+SHOCKS = dict(spot_shocks=[-0.1, 0.0, 0.1], vol_shocks=[-0.05, 0.0, 0.05], rate_shocks=[0.0, 0.01])
+
+
+def _book():
+    rng = np.random.default_rng(0)
+    n = 60
+    return pd.DataFrame({"S": 100.0, "K": rng.uniform(80, 120, n).round(), "T": rng.choice([0.25, 1.0], n),
+                         "r": 0.03, "sigma": rng.choice([0.2, 0.3], n), "option_type": rng.choice(["call", "put"], n),
+                         "engine": rng.choice(["black_scholes", "binomial", "finite_difference", "monte_carlo"], n),
+                         "exercise": rng.choice(["european", "american"], n), "quantity": rng.integers(-3, 4, n)})
+
+
+@pytest.mark.parametrize("seed", [None, 7])
+def test_zero_shock_pnl_is_zero(seed):
+    result = stress_grid(_book(), paths=2000, seed=seed, block=20, **SHOCKS)
+    assert result["pnl"][1, 1, 0] == pytest.approx(0.0, abs=1e-9)
+    for cube in result["by_engine"].values():
+        assert cube[1, 1, 0] == pytest.approx(0.0, abs=1e-9)
+
+
+def test_contract_book_matches_frame():
+    frame = _book()
+    frame["engine"] = "black_scholes"
+    from_frame = stress_grid(frame, **SHOCKS)["pnl"]
+    assert np.allclose(stress_grid(ContractBook.from_frame(frame), **SHOCKS)["pnl"], from_frame)
+
+
+def test_finite_difference_positions_are_stressed_on_the_tree():
+    frame = _book()
+    frame["engine"] = "finite_difference"
+    as_tree = frame.assign(engine="binomial")
+    assert np.allclose(stress_grid(frame, **SHOCKS)["pnl"], stress_grid(as_tree, **SHOCKS)["pnl"])
+
+
+def test_monte_carlo_scenarios_match_direct_path_averages():
+    from scenario_engine import monte_carlo_scenarios
+
+    S, K, T = np.array([100.0, 95.0, 105.0]), np.array([100.0, 90.0, 110.0]), np.array([0.5, 0.5, 1.0])
+    r, sigma, is_call = np.full(3, 0.03), np.array([0.2, 0.2, 0.3]), np.array([True, False, True])
+    spot_shocks, vol_shocks, rate_shocks = (np.asarray(SHOCKS[name]) for name in ("spot_shocks", "vol_shocks", "rate_shocks"))
+    values = monte_carlo_scenarios(S, K, T, r, sigma, is_call, spot_shocks, vol_shocks, rate_shocks,
+                                   simulations=5000, seed=3)
+    Z = np.random.default_rng(3).standard_normal(5000)
+    for i in range(3):
+        for a, spot_shock in enumerate(spot_shocks):
+            for b, vol_shock in enumerate(vol_shocks):
+                for c, rate_shock in enumerate(rate_shocks):
+                    vol, rate = sigma[i] + vol_shock, r[i] + rate_shock
+                    ST = S[i] * (1 + spot_shock) * np.exp((rate - 0.5 * vol ** 2) * T[i] + vol * np.sqrt(T[i]) * Z)
+                    payoff = np.maximum(ST - K[i], 0.0) if is_call[i] else np.maximum(K[i] - ST, 0.0)
+                    assert values[i, a, b, c] == pytest.approx(np.exp(-rate * T[i]) * payoff.mean(), rel=1e-10)